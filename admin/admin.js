@@ -7,6 +7,14 @@ const CONFIG = {
     repo: 'daam-website',
     branch: 'main',
     password: 'admin123',
+    // Point at a local stand-in of the API for testing:
+    //   localStorage.setItem('daam_admin_api', 'http://127.0.0.1:8900')
+    apiBase: localStorage.getItem('daam_admin_api') || 'https://api.github.com',
+    // Editable pages, prefetched into the page cache (see pagecache.js)
+    pages: [
+        'index.html', 'about.html', 'programs.html', 'participate.html', 'contact.html',
+        'en/index.html', 'en/about.html', 'en/programs.html', 'en/participate.html', 'en/contact.html',
+    ],
     // Pre-configured access key (obfuscated)
     _tk: 'VXNTWnoxazkzNFUzZEdPZWlRcFdqdUU5Wm56ZkFIVlFVZlVWX3BoZw==',
 };
@@ -20,6 +28,7 @@ let state = {
     isEditMode: false,
     pendingImageData: null,
     pendingImageTarget: null,
+    pageCache: null,
 };
 
 // ═══════════════════════════════════════════
@@ -123,7 +132,7 @@ async function saveSetup() {
 
 async function validateToken() {
     try {
-        const res = await fetch(`https://api.github.com/repos/${CONFIG.owner}/${CONFIG.repo}`, {
+        const res = await fetch(`${CONFIG.apiBase}/repos/${CONFIG.owner}/${CONFIG.repo}`, {
             headers: { 'Authorization': `token ${state.token}` }
         });
         return res.ok;
@@ -163,7 +172,9 @@ document.addEventListener('DOMContentLoaded', () => {
 function startEditorSession() {
     document.getElementById('loginScreen').style.display = 'none';
     document.getElementById('editorView').style.display = 'flex';
-    loadPageInEditor('index.html');
+    state.pageCache = new PageCache(repoConfig(), localStorage);
+    // Once the first page is up, the others are cached so switching is instant
+    loadPageInEditor('index.html').then(() => state.pageCache.prefetch(CONFIG.pages));
 }
 
 async function loadPageInEditor(pagePath) {
@@ -184,20 +195,17 @@ async function loadPageInEditor(pagePath) {
     updateChangeUI();
 
     try {
-        // Fetch raw HTML from GitHub for the base save state
-        console.log('[Admin] Fetching from GitHub API: contents/' + pagePath);
-        const res = await fetch(`https://api.github.com/repos/${CONFIG.owner}/${CONFIG.repo}/contents/${pagePath}?ref=${CONFIG.branch}`, {
-            headers: { 'Authorization': `token ${state.token}` }
-        });
-
-        if (res.ok) {
-            const data = await res.json();
-            state.currentPageSha = data.sha;
-            state.originalHTML = decodeBase64(data.content);
-            console.log('[Admin] Fetched OK. SHA:', data.sha);
-        } else {
-            const errData = await res.json();
-            console.warn('[Admin] Could not fetch source from GitHub for', pagePath, errData);
+        // Raw HTML for the base save state, from the page cache when it
+        // is still current on GitHub
+        try {
+            const page = await state.pageCache.load(pagePath);
+            state.currentPageSha = page.sha;
+            state.originalHTML = page.html;
+            console.log('[Admin] Source of', pagePath, `(${page.source}). SHA:`, page.sha);
+        } catch (err) {
+            // Reported by the cache; without a source the page cannot be published
+            state.currentPageSha = null;
+            state.originalHTML = null;
         }
 
         // Load page in iframe using the live GitHub Pages URL
@@ -836,20 +844,20 @@ async function saveChanges() {
         const iframe = document.getElementById('editorFrame');
         const doc = iframe.contentDocument || iframe.contentWindow.document;
 
-        // 1. Handle Images
+        // Everything below goes out as one commit (see publish.js)
+        const batch = await PublishBatch.start(repoConfig());
+
+        // 1. Handle Images: uploads start now, in parallel; images the
+        // repo already has are linked instead of uploaded again
         const changedImages = doc.querySelectorAll('[data-ai-img-changed]');
         const imageMap = new Map();
+        const relPathPrefix = state.currentPage.includes('/') ? '../' : '';
         for (const img of changedImages) {
             const base64Data = img.dataset.newImageData.split(',')[1];
             const ext = img.dataset.newImageName.split('.').pop();
-            const safeName = `img_${Date.now()}.${ext}`;
-            const uploadPath = `assets/images/${safeName}`;
-            
-            console.log('[Admin] Uploading image:', uploadPath);
-            await githubCreateOrUpdateFile(uploadPath, base64Data, `Admin Upload: ${uploadPath}`);
-            
-            const relPathPrefix = state.currentPage.includes('/') ? '../' : '';
-            imageMap.set(img.dataset.originalSrc, `${relPathPrefix}assets/images/${safeName}`);
+            const uploadPath = await batch.addImage(base64Data, ext);
+            console.log('[Admin] Image:', uploadPath);
+            imageMap.set(img.dataset.originalSrc, `${relPathPrefix}${uploadPath}`);
         }
 
         // 2. Handle HTML text edits
@@ -885,20 +893,19 @@ async function saveChanges() {
             }
         }
 
-        // 5. Publish to GitHub
+        // 5. Publish to GitHub: the page and the images in one commit
         const apiPath = state.currentPage;
-        console.log('[Admin] Publishing to GitHub: contents/' + apiPath, 'SHA:', state.currentPageSha);
-        
-        // Re-fetch SHA right before saving to avoid conflicts
-        const freshSha = await getFreshSha(apiPath);
-        
-        const publishResult = await githubCreateOrUpdateFile(apiPath, encodeBase64(updatedHTML), `Admin Content Update: ${apiPath}`, freshSha);
-        
-        // Update SHA from GitHub response so subsequent publishes work
-        if (publishResult && publishResult.content && publishResult.content.sha) {
-            state.currentPageSha = publishResult.content.sha;
-            console.log('[Admin] Updated SHA to:', state.currentPageSha);
+        console.log('[Admin] Publishing to GitHub:', apiPath, 'SHA:', state.currentPageSha);
+        if (state.currentPageSha && batch.shaOf(apiPath) && batch.shaOf(apiPath) !== state.currentPageSha) {
+            console.warn('[Admin]', apiPath, 'changed on GitHub since it was opened; overwriting.');
         }
+        batch.addFile(apiPath, encodeBase64(updatedHTML));
+        const publishResult = await batch.commit(`Admin Content Update: ${apiPath}`);
+
+        // Update SHA from the new blob so subsequent publishes work
+        state.currentPageSha = publishResult.blobs.get(apiPath);
+        state.pageCache.published(apiPath, updatedHTML, state.currentPageSha);
+        console.log('[Admin] Updated SHA to:', state.currentPageSha);
         
         hideLoading();
         showToast('تم النشر بنجاح! ✅', 'success');
@@ -923,19 +930,6 @@ async function saveChanges() {
     }
 }
 
-async function getFreshSha(path) {
-    try {
-        const res = await fetch(`https://api.github.com/repos/${CONFIG.owner}/${CONFIG.repo}/contents/${path}?ref=${CONFIG.branch}`, {
-            headers: { 'Authorization': `token ${state.token}` }
-        });
-        if (res.ok) {
-            const data = await res.json();
-            return data.sha;
-        }
-    } catch(e) {}
-    return state.currentPageSha;
-}
-
 function cleanEditableHTML(html) {
     return html
         .replace(/\s*contenteditable="true"/g, '')
@@ -950,14 +944,6 @@ function escapeRegExp(string) {
     return string.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
 }
 
-function decodeBase64(encoded) {
-    const cleaned = encoded.replace(/\n/g, '');
-    const bytes = atob(cleaned);
-    const uint8Array = new Uint8Array(bytes.length);
-    for (let i = 0; i < bytes.length; i++) { uint8Array[i] = bytes.charCodeAt(i); }
-    return new TextDecoder('utf-8').decode(uint8Array);
-}
-
 function encodeBase64(str) {
     const uint8Array = new TextEncoder().encode(str);
     let binary = '';
@@ -965,25 +951,9 @@ function encodeBase64(str) {
     return btoa(binary);
 }
 
-async function githubCreateOrUpdateFile(path, base64Content, message, sha = null) {
-    const url = `https://api.github.com/repos/${CONFIG.owner}/${CONFIG.repo}/contents/${path}`;
-    const body = { message, content: base64Content, branch: CONFIG.branch };
-    if (sha) body.sha = sha;
-
-    console.log('[Admin] GitHub API PUT:', url, 'SHA:', sha ? sha : '(new file)');
-    
-    const res = await fetch(url, {
-        method: 'PUT',
-        headers: { 'Authorization': `token ${state.token}`, 'Content-Type': 'application/json' },
-        body: JSON.stringify(body)
-    });
-    
-    if (!res.ok) {
-        const errText = await res.text();
-        console.error('[Admin] GitHub API Error:', res.status, errText);
-        throw new Error(errText);
-    }
-    return await res.json();
+function repoConfig() {
+    return { apiBase: CONFIG.apiBase, owner: CONFIG.owner, repo: CONFIG.repo,
+             branch: CONFIG.branch, token: state.token };
 }
 
 function showToast(message, type = 'info') {
@@ -0,0 +1,133 @@
+/* ============================================
+   DAAM FOUNDATION — Page Source Cache
+   ============================================
+   Keeps every page's source and blob SHA in localStorage, so opening
+   or switching pages does not download and decode the page again.
+   Entries are revalidated with a conditional request (If-None-Match),
+   which GitHub answers with an empty 304 when the page is unchanged;
+   an entry checked within PAGE_CACHE_FRESH_MS is used without asking
+   at all.  Like publish.js, no DOM access, so it runs under Node
+   against a local stand-in of the contents API.
+   ============================================ */
+
+const PAGE_CACHE_PREFIX = 'daam_admin_page:';
+const PAGE_CACHE_FRESH_MS = 60 * 1000;      // GitHub's own max-age for contents
+const PAGE_PREFETCH_CONCURRENCY = 2;
+
+/**
+ * Page sources of one repo and branch.  repo is { apiBase, owner, repo,
+ * branch, token }, as for PublishBatch; storage is anything with
+ * getItem/setItem/removeItem (localStorage in the browser).
+ *
+ *     const cache = new PageCache(repoConfig(), localStorage);
+ *     const { html, sha } = await cache.load('index.html');
+ *     cache.prefetch(CONFIG.pages);
+ */
+class PageCache {
+    constructor(repo, storage) {
+        this.repo = repo;
+        this.storage = storage;
+        this.prefix = `${PAGE_CACHE_PREFIX}${repo.owner}/${repo.repo}@${repo.branch}:`;
+        this.inflight = new Map();      // path -> Promise, so a prefetch and a load share one request
+    }
+
+    /** The stored { html, sha, etag, checkedAt } for path, or null. */
+    entry(path) {
+        try {
+            return JSON.parse(this.storage.getItem(this.prefix + path));
+        } catch (e) {
+            return null;
+        }
+    }
+
+    store(path, entry) {
+        try {
+            this.storage.setItem(this.prefix + path, JSON.stringify(entry));
+        } catch (e) {
+            // Quota exceeded: the page still works, it just is not cached
+            console.warn('[Admin] Could not cache', path, e.message);
+        }
+    }
+
+    forget(path) {
+        this.storage.removeItem(this.prefix + path);
+    }
+
+    /**
+     * Resolves to { html, sha, source } for path, where source is 'cache'
+     * (fresh, no request), 'revalidated' (304) or 'network'.  Rejects
+     * with the API's error when the page cannot be fetched.
+     */
+    load(path) {
+        const cached = this.entry(path);
+        if (cached && Date.now() - cached.checkedAt < PAGE_CACHE_FRESH_MS) {
+            return Promise.resolve({ html: cached.html, sha: cached.sha, source: 'cache' });
+        }
+        if (!this.inflight.has(path)) {
+            const request = this.fetchPage(path, cached).finally(() => this.inflight.delete(path));
+            this.inflight.set(path, request);
+        }
+        return this.inflight.get(path);
+    }
+
+    async fetchPage(path, cached) {
+        const headers = { 'Authorization': `token ${this.repo.token}` };
+        if (cached && cached.etag) headers['If-None-Match'] = cached.etag;
+        const url = `${this.repo.apiBase}/repos/${this.repo.owner}/${this.repo.repo}/contents/${path}?ref=${this.repo.branch}`;
+        const res = await fetch(url, { headers });
+
+        if (res.status === 304 && cached) {
+            cached.checkedAt = Date.now();
+            this.store(path, cached);
+            return { html: cached.html, sha: cached.sha, source: 'revalidated' };
+        }
+        if (!res.ok) {
+            const errText = await res.text();
+            console.warn('[Admin] Could not fetch source from GitHub for', path, res.status, errText);
+            const err = new Error(errText);
+            err.status = res.status;
+            throw err;
+        }
+        const data = await res.json();
+        const html = decodeBase64(data.content);
+        this.store(path, { html, sha: data.sha, etag: res.headers.get('ETag'), checkedAt: Date.now() });
+        return { html, sha: data.sha, source: 'network' };
+    }
+
+    /**
+     * Records what was just published as path's source.  With no ETag
+     * for it yet, the next revalidation downloads it once more.
+     */
+    published(path, html, sha) {
+        this.store(path, { html, sha, etag: null, checkedAt: Date.now() });
+    }
+
+    /** Loads paths in the background, a few at a time; never rejects. */
+    async prefetch(paths) {
+        const queue = [...paths];
+        const worker = async () => {
+            while (queue.length) {
+                const path = queue.shift();
+                try {
+                    const { source } = await this.load(path);
+                    if (source !== 'cache') console.log('[Admin] Prefetched', path, `(${source})`);
+                } catch (e) {
+                    // Reported by fetchPage; the page is fetched again when opened
+                }
+            }
+        };
+        await Promise.all(Array.from({ length: PAGE_PREFETCH_CONCURRENCY }, worker));
+    }
+}
+
+/** Decodes the base64 content of a contents API response as UTF-8. */
+function decodeBase64(encoded) {
+    const bytes = atob(encoded.replace(/\n/g, ''));
+    const uint8Array = new Uint8Array(bytes.length);
+    for (let i = 0; i < bytes.length; i++) { uint8Array[i] = bytes.charCodeAt(i); }
+    return new TextDecoder('utf-8').decode(uint8Array);
+}
+
+if (typeof module !== 'undefined' && module.exports) {
+    module.exports = { PageCache, decodeBase64 };
+}
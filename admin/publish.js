@@ -0,0 +1,181 @@
+/* ============================================
+   DAAM FOUNDATION — Batched Publishing (Git Data API)
+   ============================================
+   A publish becomes one commit: every blob is uploaded concurrently,
+   then a single tree, commit and branch update follow.  So an edit
+   with five new images costs one commit and one Pages deployment,
+   not seven.  No DOM access here, so the same file runs under Node
+   against a local stand-in of the API.
+   ============================================ */
+
+const PUBLISH_CONCURRENCY = 4;
+const PUBLISH_RETRIES = 3;      // re-commits when the branch moved meanwhile
+
+// ═══════════════════════════════════════════
+//  ENCODING HELPERS
+// ═══════════════════════════════════════════
+
+function base64ToBytes(b64) {
+    const binary = atob(b64.replace(/\s/g, ''));
+    const bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) { bytes[i] = binary.charCodeAt(i); }
+    return bytes;
+}
+
+/**
+ * The SHA git gives a blob with these bytes: SHA-1 over "blob <size>\0" + bytes.
+ * Lets us tell, before uploading, whether the repo already holds a file.
+ */
+async function gitBlobSha(bytes) {
+    const header = new TextEncoder().encode(`blob ${bytes.length}\0`);
+    const data = new Uint8Array(header.length + bytes.length);
+    data.set(header);
+    data.set(bytes, header.length);
+    const digest = await crypto.subtle.digest('SHA-1', data);
+    return Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, '0')).join('');
+}
+
+// ═══════════════════════════════════════════
+//  API
+// ═══════════════════════════════════════════
+
+/**
+ * One call to the repo's REST API.  repo is
+ * { apiBase, owner, repo, branch, token }; path is relative to the repo.
+ */
+async function githubRequest(repo, method, path, body) {
+    const url = `${repo.apiBase}/repos/${repo.owner}/${repo.repo}/${path}`;
+    const res = await fetch(url, {
+        method,
+        headers: { 'Authorization': `token ${repo.token}`, 'Content-Type': 'application/json' },
+        body: body === undefined ? undefined : JSON.stringify(body)
+    });
+    if (!res.ok) {
+        const errText = await res.text();
+        console.error('[Admin] GitHub API Error:', method, path, res.status, errText);
+        const err = new Error(errText);
+        err.status = res.status;
+        throw err;
+    }
+    return await res.json();
+}
+
+/** Runs fn with at most `limit` calls in flight at once. */
+function limiter(limit) {
+    let active = 0;
+    const waiting = [];
+    const next = () => {
+        if (active >= limit || !waiting.length) return;
+        active++;
+        const { fn, resolve, reject } = waiting.shift();
+        fn().then(resolve, reject).finally(() => { active--; next(); });
+    };
+    return fn => new Promise((resolve, reject) => { waiting.push({ fn, resolve, reject }); next(); });
+}
+
+// ═══════════════════════════════════════════
+//  BATCH
+// ═══════════════════════════════════════════
+
+/**
+ * Collects files for one commit.  Blobs start uploading as soon as they
+ * are added; commit() waits for them and writes tree, commit and ref.
+ *
+ *     const batch = await PublishBatch.start(repo);
+ *     const path = await batch.addImage(base64, 'png');   // existing path if already in the repo
+ *     batch.addFile('index.html', base64Html);
+ *     const { commit } = await batch.commit('Admin Content Update: index.html');
+ */
+class PublishBatch {
+    constructor(repo, head, tree) {
+        this.repo = repo;
+        this.head = head;
+        this.baseTree = tree.sha;
+        this.existing = new Map();      // blob sha -> path, for every file in the head tree
+        this.treeShas = new Map();      // path -> blob sha in the head tree
+        for (const entry of tree.tree) {
+            if (entry.type !== 'blob') continue;
+            if (!this.existing.has(entry.sha)) this.existing.set(entry.sha, entry.path);
+            this.treeShas.set(entry.path, entry.sha);
+        }
+        this.files = new Map();         // path -> Promise of its uploaded blob sha
+        this.skipped = [];
+        this.queue = limiter(PUBLISH_CONCURRENCY);
+    }
+
+    /** Reads the branch head and its full file list. */
+    static async start(repo) {
+        const ref = await githubRequest(repo, 'GET', `git/ref/heads/${repo.branch}`);
+        const head = ref.object.sha;
+        const tree = await githubRequest(repo, 'GET', `git/trees/${head}?recursive=1`);
+        if (tree.truncated) console.warn('[Admin] Repo tree truncated; some existing images may be uploaded again.');
+        return new PublishBatch(repo, head, tree);
+    }
+
+    /** The head tree's blob sha for path, e.g. to detect edits made elsewhere. */
+    shaOf(path) {
+        return this.treeShas.get(path) || null;
+    }
+
+    /**
+     * Queues an image for upload under assets/images, named after its
+     * content.  Resolves to its repo path; an image whose bytes are
+     * already in the repo is not uploaded and resolves to that file.
+     */
+    async addImage(base64Content, ext) {
+        const sha = await gitBlobSha(base64ToBytes(base64Content));
+        if (this.existing.has(sha)) {
+            this.skipped.push(this.existing.get(sha));
+            return this.existing.get(sha);
+        }
+        const path = `assets/images/img_${sha.slice(0, 12)}.${(ext || 'png').toLowerCase()}`;
+        if (!this.files.has(path)) this.addFile(path, base64Content);
+        return path;
+    }
+
+    /** Queues path with the given base64 content; uploads start right away. */
+    addFile(path, base64Content) {
+        const upload = this.queue(() => githubRequest(this.repo, 'POST', 'git/blobs',
+            { content: base64Content, encoding: 'base64' }));
+        this.files.set(path, upload.then(blob => blob.sha));
+    }
+
+    /**
+     * Writes every queued file as one commit on the branch.  If someone
+     * else moved the branch meanwhile, the same files are committed again
+     * on top of the new head.  Resolves to { commit, blobs, skipped }.
+     */
+    async commit(message) {
+        const paths = [...this.files.keys()];
+        const shas = await Promise.all(paths.map(p => this.files.get(p)));
+        const blobs = new Map(paths.map((p, i) => [p, shas[i]]));
+        const entries = paths.map(p => ({ path: p, mode: '100644', type: 'blob', sha: blobs.get(p) }));
+
+        let parent = this.head;
+        let baseTree = this.baseTree;
+        for (let attempt = 1; ; attempt++) {
+            const tree = await githubRequest(this.repo, 'POST', 'git/trees',
+                { base_tree: baseTree, tree: entries });
+            const commit = await githubRequest(this.repo, 'POST', 'git/commits',
+                { message, tree: tree.sha, parents: [parent] });
+            try {
+                await githubRequest(this.repo, 'PATCH', `git/refs/heads/${this.repo.branch}`,
+                    { sha: commit.sha, force: false });
+                console.log('[Admin] Published', paths.length, 'file(s) as', commit.sha,
+                            this.skipped.length ? `(${this.skipped.length} image(s) already in the repo)` : '');
+                this.head = commit.sha;
+                this.baseTree = tree.sha;
+                return { commit: commit.sha, blobs, skipped: this.skipped };
+            } catch (err) {
+                if (err.status !== 422 || attempt >= PUBLISH_RETRIES) throw err;
+                console.warn('[Admin] Branch moved during publish; committing again on the new head.');
+                parent = (await githubRequest(this.repo, 'GET', `git/ref/heads/${this.repo.branch}`)).object.sha;
+                baseTree = (await githubRequest(this.repo, 'GET', `git/commits/${parent}`)).tree.sha;
+            }
+        }
+    }
+}
+
+if (typeof module !== 'undefined' && module.exports) {
+    module.exports = { PublishBatch, gitBlobSha, githubRequest, base64ToBytes };
+}
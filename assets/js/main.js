@@ -29,20 +29,19 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
 
-    // FAQ Accordion
-    const faqItems = document.querySelectorAll('.faq-item');
+    // FAQ Accordion (Event Delegation, so pages the SPA adds later work too)
+    document.body.addEventListener('click', (e) => {
+        const question = e.target.closest('.faq-question');
+        const item = question && question.closest('.faq-item');
+        if (!item) return;
 
-    faqItems.forEach(item => {
-        const question = item.querySelector('.faq-question');
-        question.addEventListener('click', () => {
-            // Close other items
-            faqItems.forEach(otherItem => {
-                if (otherItem !== item) {
-                    otherItem.classList.remove('active');
-                }
-            });
-            // Toggle current item
-            item.classList.toggle('active');
+        // Close other items
+        document.querySelectorAll('.faq-item').forEach(otherItem => {
+            if (otherItem !== item) {
+                otherItem.classList.remove('active');
+            }
         });
+        // Toggle current item
+        item.classList.toggle('active');
     });
 });
@@ -0,0 +1,2 @@
+"""The Da'am site build package: shared stages (daam_build.*) and the
+outputs built from them (daam_build.targets).  Run `python -m daam_build`."""
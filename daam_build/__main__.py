@@ -0,0 +1,43 @@
+"""Single entry point for every build target:
+
+    python -m daam_build standalone [options]   -> daam_standalone.html
+    python -m daam_build site [options]         -> daam_offline_site/
+    python -m daam_build spa [options]          -> daam_one_file_all_pages.html
+    python -m daam_build watch [options]        serve pages, rebuilt as you edit
+    python -m daam_build serve [folder]         serve a build with its precompressed variants
+    python -m daam_build budget <target>        size report and budget check of the last build
+    python -m daam_build refs                   broken references and unused asset files
+    python -m daam_build layout [options]       re-render page headers and footers from layout/
+    python -m daam_build fixes [rules]          site-wide HTML fixes (menu icons, sticky button)
+    python -m daam_build bench [options]        build benchmarks on a synthetic site
+
+Run a target with --help for its options.
+"""
+import sys
+import importlib
+
+TARGETS = {
+    'standalone': 'daam_build.targets.standalone',
+    'site': 'daam_build.targets.site',
+    'spa': 'daam_build.targets.spa',
+    'watch': 'daam_build.watch',
+    'serve': 'daam_build.serve',
+    'budget': 'daam_build.budget',
+    'refs': 'daam_build.refgraph',
+    'layout': 'daam_build.layout',
+    'fixes': 'daam_build.fixes',
+    'bench': 'daam_build.bench.__main__',
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in TARGETS:
+        print(__doc__.strip())
+        return 0 if argv and argv[0] in ('-h', '--help') else 2
+    target = importlib.import_module(TARGETS[argv[0]])
+    return target.main(argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
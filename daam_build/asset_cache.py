@@ -0,0 +1,299 @@
+import os
+import json
+import atexit
+import shutil
+import base64
+import hashlib
+import mimetypes
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from daam_build.tracing import span
+
+# Configuration
+CACHE_DIR = '.build_cache/base64'
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+MAX_MEMO_BYTES = 128 * 1024 * 1024   # data URIs kept in memory, per process
+PREFETCH_THREADS = 8
+STREAM_CHUNK = 3 * 256 * 1024   # multiple of 3, so chunks encode without padding
+INDEX_FILE = 'index.json'
+
+mimetypes.add_type('image/webp', '.webp')
+mimetypes.add_type('image/avif', '.avif')
+
+
+def file_digest(path):
+    """Returns the sha256 hex digest of a file, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def guess_mime(path):
+    mime_type, _ = mimetypes.guess_type(path)
+    return mime_type or 'application/octet-stream'
+
+
+class AssetCache:
+    """Content-addressed cache of base64 data URIs.
+
+    Lookups go through two layers:
+      1. an in-process memo of each path's data URI, valid for its size and
+         mtime, so a file that is referenced on every page is only encoded
+         once per run.  An edited file replaces its old entry, and the memo
+         is held to max_memo_bytes, least recently used first, so a
+         long-running watch does not keep every version of every image;
+      2. an on-disk store under CACHE_DIR.  The index maps path/size/mtime to
+         the content hash, and each encoded payload lives in <sha256>.b64, so
+         a touched-but-unchanged file (or a copy under another name) only
+         costs a hash pass, never a second base64 pass.
+
+    The disk store is trimmed to max_bytes, least recently used first.
+    A cache may be shared by threads (see prefetch) and by processes: new
+    index entries are kept in memory until save_index(), which merges them
+    with the copy on disk.  get_cache() saves at exit; worker processes,
+    which skip exit handlers, call save_index() themselves.
+
+    When an optimizer is set (see daam_build.images), raster images are
+    swapped for their smallest optimized variant before encoding.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, max_memo_bytes=MAX_MEMO_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_memo_bytes = max_memo_bytes
+        self._memo = OrderedDict()  # path -> (size, mtime_ns, uri), least recently used first
+        self._memo_bytes = 0
+        self._index = None
+        self._dirty = False
+        self._lock = threading.RLock()
+        self.optimizer = None
+        self.hits = 0
+        self.misses = 0
+
+    # -- index -------------------------------------------------------------
+
+    def _index_path(self):
+        return os.path.join(self.cache_dir, INDEX_FILE)
+
+    def _read_index(self):
+        try:
+            with open(self._index_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _load_index(self):
+        if self._index is None:
+            self._index = self._read_index()
+        return self._index
+
+    def save_index(self):
+        """Writes new index entries to disk, merged with what other processes saved."""
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(self.cache_dir, exist_ok=True)
+            merged = self._read_index()
+            merged.update(self._index)
+            self._index = merged
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(merged, f)
+            os.replace(tmp, self._index_path())
+            self._dirty = False
+
+    def _blob_path(self, digest):
+        return os.path.join(self.cache_dir, digest + '.b64')
+
+    # -- public API --------------------------------------------------------
+
+    def digest(self, path):
+        """Returns the content hash of path, using the index when stat matches."""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        with self._lock:
+            entry = self._load_index().get(path)
+        if entry and entry['size'] == st.st_size and entry['mtime'] == st.st_mtime_ns:
+            return entry['hash']
+        digest = file_digest(path)
+        with self._lock:
+            self._index[path] = {'size': st.st_size, 'mtime': st.st_mtime_ns, 'hash': digest}
+            self._dirty = True
+        return digest
+
+    def data_uri(self, path):
+        """Returns path as a data URI, or "" if it cannot be read."""
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return ""
+        with self._lock:
+            entry = self._memo.get(path)
+            if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+                self._memo.move_to_end(path)
+                self.hits += 1
+                return entry[2]
+
+        with span(os.path.basename(path), 'encode', path=path) as s:
+            source = self.source_for(path)
+            digest = self.digest(source)
+            blob = self._blob_path(digest)
+            try:
+                with open(blob, 'r', encoding='ascii') as f:
+                    encoded = f.read()
+                os.utime(blob)  # bump recency for eviction
+                self.hits += 1
+                s.set(cache='hit')
+            except OSError:
+                with open(source, 'rb') as f:
+                    encoded = base64.b64encode(f.read()).decode('ascii')
+                self._write_blob(blob, encoded)
+                self.misses += 1
+                s.set(cache='miss')
+
+        uri = f"data:{guess_mime(source)};base64,{encoded}"
+        self._remember(path, st, uri)
+        return uri
+
+    def _remember(self, path, st, uri):
+        """Memoises uri for path, dropping its stale entry and the least recently used."""
+        with self._lock:
+            old = self._memo.pop(path, None)
+            if old:
+                self._memo_bytes -= len(old[2])
+            if len(uri) > self.max_memo_bytes:
+                return
+            self._memo[path] = (st.st_size, st.st_mtime_ns, uri)
+            self._memo_bytes += len(uri)
+            while self._memo_bytes > self.max_memo_bytes:
+                _, (_, _, evicted) = self._memo.popitem(last=False)
+                self._memo_bytes -= len(evicted)
+
+    def source_for(self, path):
+        """The file actually embedded for path: its optimized variant, if any."""
+        if self.optimizer is not None:
+            return self.optimizer.smallest(path)
+        return path
+
+    def uri_length(self, path):
+        """Length of the data URI for path, without encoding it."""
+        source = self.source_for(path)
+        return len(f"data:{guess_mime(source)};base64,") + 4 * ((os.path.getsize(source) + 2) // 3)
+
+    def write_data_uri(self, path, out):
+        """Streams path as a data URI into the text file out.
+
+        Unlike data_uri, nothing is memoised: the payload is copied from the
+        disk cache, or encoded from the source STREAM_CHUNK bytes at a time
+        (and saved to the disk cache on the way), so memory use does not
+        grow with the size of the file.
+        """
+        source = self.source_for(os.path.abspath(path))
+        out.write(f"data:{guess_mime(source)};base64,")
+        blob = self._blob_path(self.digest(source))
+        try:
+            with open(blob, 'r', encoding='ascii') as f:
+                shutil.copyfileobj(f, out, STREAM_CHUNK)
+            os.utime(blob)
+            self.hits += 1
+            return
+        except OSError:
+            pass
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with span(os.path.basename(source), 'encode', path=source, cache='miss'), \
+                open(source, 'rb') as src, os.fdopen(fd, 'w', encoding='ascii') as tee:
+            for chunk in iter(lambda: src.read(STREAM_CHUNK), b''):
+                encoded = base64.b64encode(chunk).decode('ascii')
+                out.write(encoded)
+                tee.write(encoded)
+        os.replace(tmp, blob)
+        self.misses += 1
+        with self._lock:
+            self.evict()
+
+    def prefetch(self, paths, threads=PREFETCH_THREADS):
+        """Reads and encodes paths on a thread pool so later lookups hit the memo."""
+        paths = sorted({os.path.abspath(p) for p in paths if os.path.exists(p)})
+        if not paths:
+            return
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for _ in pool.map(self.data_uri, paths):
+                pass
+
+    def _write_blob(self, blob, encoded):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='ascii') as f:
+            f.write(encoded)
+        os.replace(tmp, blob)
+        with self._lock:
+            self.evict()
+
+    def evict(self):
+        """Deletes least recently used blobs until the store fits max_bytes."""
+        try:
+            names = [n for n in os.listdir(self.cache_dir) if n.endswith('.b64')]
+        except OSError:
+            return
+        blobs = []
+        total = 0
+        for name in names:
+            p = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            blobs.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, p in sorted(blobs):
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        self._memo.clear()
+        self._memo_bytes = 0
+        self._index = {}
+        self._dirty = False
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                os.remove(os.path.join(self.cache_dir, name))
+
+
+_default_cache = None
+
+
+def get_cache():
+    """Returns the process-wide AssetCache shared by all builders."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = AssetCache()
+        atexit.register(_default_cache.save_index)
+    return _default_cache
+
+
+def file_to_base64(path, referrer=None):
+    """Reads a file and converts it to a base64 data URI (cached)."""
+    if not os.path.exists(path):
+        where = f" (referenced in {referrer})" if referrer else ""
+        print(f"Warning: File not found: {path}{where}")
+        return ""
+    try:
+        return get_cache().data_uri(path)
+    except Exception as e:
+        print(f"Error reading {path}: {e}")
+        return ""
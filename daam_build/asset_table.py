@@ -0,0 +1,108 @@
+import os
+import json
+
+from daam_build.asset_cache import get_cache
+
+# Client-side half of the table: resolves keys to blob: URLs on first use,
+# points CSS custom properties at them, and fills in <img data-asset="...">.
+RUNTIME_SCRIPT = """
+(function () {
+    var table = window.DAAM_ASSETS || {};
+    var urls = {};
+
+    function assetUrl(key) {
+        if (urls[key]) return urls[key];
+        var uri = table[key];
+        if (!uri) return '';
+        // A --compress build has already made its files blob: URLs
+        if (uri.slice(0, 5) !== 'data:') return (urls[key] = uri);
+        var comma = uri.indexOf(',');
+        var mime = uri.slice(5, uri.indexOf(';'));
+        var bin = atob(uri.slice(comma + 1));
+        var bytes = new Uint8Array(bin.length);
+        for (var i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+        urls[key] = URL.createObjectURL(new Blob([bytes], { type: mime }));
+        return urls[key];
+    }
+
+    function hydrateAssets(root) {
+        (root || document).querySelectorAll('img[data-asset]').forEach(function (img) {
+            img.src = assetUrl(img.getAttribute('data-asset'));
+            img.removeAttribute('data-asset');
+        });
+    }
+
+    (window.DAAM_CSS_ASSETS || []).forEach(function (key) {
+        document.documentElement.style.setProperty('--asset-' + key, 'url("' + assetUrl(key) + '")');
+    });
+
+    window.daamAssetUrl = assetUrl;
+    window.daamHydrateAssets = hydrateAssets;
+})();
+"""
+
+
+class AssetTable:
+    """Stores every distinct embedded asset once, keyed by content hash.
+
+    Pages reference entries instead of carrying their own data URI:
+      - <img> tags get data-asset="KEY" and are filled in by the runtime;
+      - CSS url(...) becomes var(--asset-KEY), set once on :root.
+
+    data_uri is the function that produces each table entry; a streaming
+    build passes StreamWriter.asset_ref so entries are written out lazily.
+    """
+
+    KEY_LENGTH = 12
+
+    def __init__(self, cache=None, data_uri=None):
+        self.cache = cache or get_cache()
+        self.data_uri = data_uri or self.cache.data_uri
+        self.assets = {}        # key -> data URI (or stream placeholder)
+        self.sizes = {}         # key -> length of the data URI
+        self.css_keys = set()   # keys referenced from CSS
+        self.refs = 0
+        self.inline_bytes = 0   # what the references would cost as inline URIs
+
+    def add(self, path):
+        """Registers path and returns its key, or "" if it cannot be read."""
+        if not os.path.isfile(path):
+            return ""
+        key = self.cache.digest(path)[:self.KEY_LENGTH]
+        if key not in self.assets:
+            uri = self.data_uri(path)
+            if not uri:
+                return ""
+            self.assets[key] = uri
+            self.sizes[key] = self.cache.uri_length(path)
+        self.refs += 1
+        self.inline_bytes += self.sizes[key]
+        return key
+
+    def css_ref(self, path):
+        """Returns a CSS value referencing path, or "" if it cannot be read."""
+        key = self.add(path)
+        if not key:
+            return ""
+        self.css_keys.add(key)
+        return f'var(--asset-{key})'
+
+    def table_bytes(self):
+        return sum(self.sizes.values())
+
+    def saved_bytes(self):
+        return self.inline_bytes - self.table_bytes()
+
+    def render_script(self):
+        """Returns the <script> block holding the table and its runtime."""
+        return (
+            '<script>\n'
+            f'window.DAAM_ASSETS = {json.dumps(self.assets)};\n'
+            f'window.DAAM_CSS_ASSETS = {json.dumps(sorted(self.css_keys))};\n'
+            f'{RUNTIME_SCRIPT}'
+            '</script>'
+        )
+
+    def summary(self):
+        return (f"Asset table: {self.refs} references to {len(self.assets)} distinct assets, "
+                f"saved {self.saved_bytes() // 1024} KB")
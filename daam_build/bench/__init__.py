@@ -0,0 +1 @@
+"""Build benchmarks: a synthetic site generator, a runner and a baseline check."""
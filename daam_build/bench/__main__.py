@@ -0,0 +1,75 @@
+"""Build benchmarks on a synthetic site.
+
+    python -m daam_build bench                    run, compare with the baseline
+    python -m daam_build bench --save-baseline    run, store as the new baseline
+    python -m daam_build bench --check            exit 1 on any regression
+
+Everything runs offline: the site is generated locally, and each build
+runs in its own interpreter so peak RSS is measured per build.
+"""
+import sys
+import argparse
+import tempfile
+
+from daam_build.bench import runner, sitegen
+
+
+def size(text):
+    width, _, height = text.partition('x')
+    return int(width), int(height)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m daam_build bench', description=__doc__.split('\n')[0])
+    parser.add_argument('--pages', type=int, default=5, help="pages per language")
+    parser.add_argument('--images', type=int, default=10, help="distinct content images")
+    parser.add_argument('--image-size', type=size, default=(800, 600), help="WIDTHxHEIGHT of content images")
+    parser.add_argument('--backgrounds', type=int, default=4, help="CSS header background images")
+    parser.add_argument('--background-size', type=size, default=(1600, 400),
+                        help="WIDTHxHEIGHT of background images")
+    parser.add_argument('--css-rules', type=int, default=200, help="filler rules in style.css")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help="runs per benchmark; the best counts")
+    parser.add_argument('--only', action='append', choices=sorted(runner.BENCHMARKS),
+                        help="run just this benchmark (repeatable)")
+    parser.add_argument('--site-dir', help="generate the site here instead of a temp folder")
+    parser.add_argument('--baseline', default=runner.BASELINE_FILE, help="baseline file")
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the baseline")
+    parser.add_argument('--output', help="also write this run's results to a JSON file")
+    parser.add_argument('--check', action='store_true', help="exit with status 1 on a regression")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix='daam-bench-') as tmp:
+        site_dir = args.site_dir or tmp
+        print(f"Generating synthetic site in {site_dir}...")
+        site = sitegen.generate(site_dir, args.pages, args.images, args.image_size, args.backgrounds,
+                                args.background_size, args.css_rules, args.seed)
+        print("Running benchmarks...")
+        results = runner.run_benchmarks(site_dir, args.only, args.repeat)
+
+    report = {'site': site, 'machine': runner.machine(), 'results': results}
+    if args.output:
+        runner.save(args.output, report)
+    if args.save_baseline:
+        runner.save(args.baseline, report)
+        print(f"Baseline saved to {args.baseline}.")
+        return 0
+
+    baseline = runner.load(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+    print(f"\nCompared with {args.baseline}:")
+    regressions = runner.compare(report, baseline)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s).")
+        return 1 if args.check else 0
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import subprocess
+
+# Configuration
+BASELINE_FILE = '.build_cache/bench/baseline.json'
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# name -> (target, extra arguments, output file or folder)
+BENCHMARKS = {
+    'standalone': ('standalone', [], 'daam_standalone.html'),
+    'site': ('site', [], 'daam_offline_site'),
+    'site-jobs': ('site', ['-j', '0'], 'daam_offline_site'),
+    'spa': ('spa', [], 'daam_one_file_all_pages.html'),
+    'spa-dedupe': ('spa', ['--dedupe-assets'], 'daam_one_file_all_pages.html'),
+}
+
+# Relative increase over the baseline that counts as a regression
+THRESHOLDS = {'seconds': 0.10, 'peak_rss_kb': 0.10, 'output_bytes': 0.01}
+
+
+def output_bytes(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total
+
+
+def run_target(site_dir, target, args):
+    """Runs one build in a child process; returns (seconds, peak RSS in KB).
+
+    Each build is a fresh interpreter, so its peak RSS is its own, read
+    from os.wait4 rather than from getrusage, which would report the
+    largest child so far.
+    """
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    started = time.perf_counter()
+    child = subprocess.Popen([sys.executable, '-m', 'daam_build', target, *args],
+                             cwd=site_dir, env=env, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(child.pid, 0)
+    seconds = time.perf_counter() - started
+    child.returncode = os.waitstatus_to_exitcode(status)
+    if child.returncode:
+        raise RuntimeError(f"{target} {' '.join(args)} exited with {child.returncode}")
+    return seconds, usage.ru_maxrss
+
+
+def clean(site_dir):
+    """Removes build outputs and caches, so the next build starts cold."""
+    for name in ['.build_cache'] + [output for _, _, output in BENCHMARKS.values()]:
+        path = os.path.join(site_dir, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+
+def run_benchmarks(site_dir, names=None, repeat=3):
+    """Times each benchmark cold (empty cache) and warm (cache filled, --force).
+
+    Times are the best of repeat runs.  Returns {'<name>/<cold|warm>':
+    {'seconds', 'peak_rss_kb', 'output_bytes'}}.
+    """
+    results = {}
+    for name in names or BENCHMARKS:
+        target, args, output = BENCHMARKS[name]
+        force = ['--force'] if target != 'site' else ['--clean']
+        for mode in ('cold', 'warm'):
+            best = None
+            for _ in range(repeat):
+                if mode == 'cold':
+                    clean(site_dir)
+                seconds, rss = run_target(site_dir, target, args + force)
+                if best is None or seconds < best[0]:
+                    best = (seconds, rss)
+            results[f'{name}/{mode}'] = {
+                'seconds': round(best[0], 4),
+                'peak_rss_kb': best[1],
+                'output_bytes': output_bytes(os.path.join(site_dir, output)),
+            }
+            print(f"  {name + '/' + mode:<20} {best[0]:>8.2f} s {best[1] // 1024:>6} MB RSS")
+    return results
+
+
+def machine():
+    return {'python': platform.python_version(), 'machine': platform.machine(),
+            'cpus': os.cpu_count(), 'system': platform.system()}
+
+
+def save(path, report):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1, sort_keys=True)
+
+
+def load(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def compare(report, baseline, thresholds=THRESHOLDS):
+    """Prints each metric against the baseline; returns the regressions
+    as (benchmark, metric, old, new) tuples."""
+    if baseline['site'] != report['site']:
+        print("Warning: the baseline was measured on a different synthetic site.")
+    if baseline['machine'] != report['machine']:
+        print("Warning: the baseline was measured on a different machine.")
+
+    regressions = []
+    print(f"  {'benchmark':<20} {'metric':<13} {'baseline':>12} {'now':>12} {'change':>8}")
+    for name, metrics in sorted(report['results'].items()):
+        old_metrics = baseline['results'].get(name)
+        if old_metrics is None:
+            print(f"  {name:<20} (not in baseline)")
+            continue
+        for metric, new in metrics.items():
+            old = old_metrics.get(metric)
+            if not old:
+                continue
+            change = (new - old) / old
+            flag = ''
+            if change > thresholds[metric]:
+                regressions.append((name, metric, old, new))
+                flag = '  REGRESSION'
+            print(f"  {name:<20} {metric:<13} {old:>12} {new:>12} {change:>+8.1%}{flag}")
+    return regressions
@@ -0,0 +1,150 @@
+import os
+import zlib
+import random
+import struct
+
+# Configuration
+PAGE_NAMES = ['index.html', 'about.html', 'programs.html', 'participate.html', 'contact.html']
+LANGUAGES = {
+    '': {'lang': 'ar', 'dir': 'rtl', 'title': 'مؤسسة دعم', 'words': 'مؤسسة دعم للتنمية المجتمعية برامج تعليم شباب أسر مبادرات تطوع شراكة'},
+    'en': {'lang': 'en', 'dir': 'ltr', 'title': "Da'am Foundation", 'words': 'foundation community development programs education youth families initiatives volunteering partnership'},
+}
+
+
+def png_bytes(width, height, rng):
+    """A width x height RGB PNG of random noise: incompressible, so its size
+    on disk is close to width * height * 3, like a photo."""
+    row = width * 3
+    raw = b''.join(b'\x00' + rng.randbytes(row) for _ in range(height))
+
+    def chunk(kind, data):
+        return (struct.pack('>I', len(data)) + kind + data +
+                struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+    return (b'\x89PNG\r\n\x1a\n' +
+            chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)) +
+            chunk(b'IDAT', zlib.compress(raw, 1)) +
+            chunk(b'IEND', b''))
+
+
+def page_names(pages):
+    """The site's own page names first, then page_6.html, page_7.html, ..."""
+    return (PAGE_NAMES + [f'page_{n}.html' for n in range(len(PAGE_NAMES) + 1, pages + 1)])[:pages]
+
+
+def _paragraphs(words, rng, count):
+    words = words.split()
+    return '\n'.join(
+        f'            <p>{" ".join(rng.choice(words) for _ in range(40))}</p>' for _ in range(count))
+
+
+def _page(name, names, images, backgrounds, lang, rng):
+    prefix = '../' if lang['lang'] == 'en' else ''
+    links = '\n'.join(f'                <li><a href="{n}">{n[:-5]}</a></li>' for n in names)
+    picked = rng.sample(images, min(len(images), 4)) if images else []
+    imgs = '\n'.join(f'            <img src="{prefix}assets/images/{img}" alt="">' for img in picked)
+    header = f' ph-bg-{names.index(name) % backgrounds}' if backgrounds else ''
+    return f"""<!DOCTYPE html>
+<html lang="{lang['lang']}" dir="{lang['dir']}">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{lang['title']} - {name[:-5]}</title>
+    <link rel="stylesheet" href="{prefix}assets/css/style.css">
+    <link rel="icon" type="image/png" href="{prefix}assets/images/favicon.png">
+</head>
+<body>
+    <header class="navbar">
+        <img src="{prefix}assets/images/logo.png" alt="" class="logo">
+        <div class="mobile-toggle"><i class="fas fa-bars"></i></div>
+        <nav>
+            <ul class="nav-links">
+{links}
+            </ul>
+        </nav>
+    </header>
+    <section class="page-header{header}">
+        <h1>{lang['title']}</h1>
+    </section>
+    <main class="container">
+{_paragraphs(lang['words'], rng, 6)}
+        <div class="gallery">
+{imgs}
+        </div>
+        <div class="faq-item"><div class="faq-question">?</div><div class="faq-answer">{lang['title']}</div></div>
+    </main>
+    <script src="{prefix}assets/js/main.js"></script>
+</body>
+</html>
+"""
+
+
+def _stylesheet(backgrounds, rules, rng):
+    parts = [':root { --primary: #004aad; --accent: #ffae00; }',
+             'body { font-family: sans-serif; margin: 0; }',
+             '.navbar { display: flex; justify-content: space-between; }',
+             '.nav-links.active { display: block; }',
+             '.faq-item.active .faq-answer { display: block; }',
+             '.page-header { min-height: 300px; background-size: cover; }']
+    parts += [f'.ph-bg-{n} {{ background-image: url(\'../images/bg_{n}.png\'); }}' for n in range(backgrounds)]
+    # Filler rules, most of which match nothing, like a real theme's
+    for n in range(rules):
+        parts.append(f'.unused-{n} .child-{n}:hover {{ color: #{rng.randrange(0x1000000):06x}; '
+                     f'margin: {n % 40}px {n % 17}px; }}')
+    parts.append('@media (max-width: 768px) {\n    .nav-links { display: none; }\n}')
+    return '\n\n'.join(parts) + '\n'
+
+
+MAIN_JS = """document.addEventListener('DOMContentLoaded', () => {
+    document.body.addEventListener('click', (e) => {
+        const toggle = e.target.closest('.mobile-toggle');
+        if (toggle) toggle.closest('.navbar').querySelector('.nav-links').classList.toggle('active');
+        const question = e.target.closest('.faq-question');
+        if (question) question.closest('.faq-item').classList.toggle('active');
+    });
+});
+"""
+
+
+def generate(out_dir, pages=5, images=10, image_size=(800, 600), backgrounds=4,
+             background_size=(1600, 400), css_rules=200, seed=0):
+    """Writes a synthetic site shaped like this one into out_dir.
+
+    It has pages pages in Arabic and the same again under en/, sharing
+    images random images, a logo and a favicon, and a stylesheet with one
+    background image per backgrounds header variant.  The same arguments
+    always produce the same bytes.  Returns the parameters, for recording
+    alongside results.
+    """
+    rng = random.Random(seed)
+    image_dir = os.path.join(out_dir, 'assets', 'images')
+    os.makedirs(image_dir, exist_ok=True)
+    os.makedirs(os.path.join(out_dir, 'assets', 'css'), exist_ok=True)
+    os.makedirs(os.path.join(out_dir, 'assets', 'js'), exist_ok=True)
+
+    def write(rel_path, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        with open(os.path.join(out_dir, rel_path), 'wb') as f:
+            f.write(data)
+
+    image_names = [f'photo_{n}.png' for n in range(images)]
+    for name in image_names:
+        write(os.path.join('assets', 'images', name), png_bytes(*image_size, rng))
+    for n in range(backgrounds):
+        write(os.path.join('assets', 'images', f'bg_{n}.png'), png_bytes(*background_size, rng))
+    write(os.path.join('assets', 'images', 'logo.png'), png_bytes(200, 80, rng))
+    write(os.path.join('assets', 'images', 'favicon.png'), png_bytes(56, 56, rng))
+    write(os.path.join('assets', 'css', 'style.css'), _stylesheet(backgrounds, css_rules, rng))
+    write(os.path.join('assets', 'js', 'main.js'), MAIN_JS)
+
+    names = page_names(pages)
+    for subdir, lang in LANGUAGES.items():
+        if subdir:
+            os.makedirs(os.path.join(out_dir, subdir), exist_ok=True)
+        for name in names:
+            write(os.path.join(subdir, name), _page(name, names, image_names, backgrounds, lang, rng))
+
+    return {'pages': pages, 'images': images, 'image_size': list(image_size),
+            'backgrounds': backgrounds, 'background_size': list(background_size),
+            'css_rules': css_rules, 'seed': seed}
@@ -0,0 +1,404 @@
+"""Size report and budget gate for build outputs.
+
+    python -m daam_build budget spa              report on (and check) the last spa build
+    python -m daam_build budget site --top 20    with the 20 largest embeds
+
+Every target writes the same report after it builds; this reruns it
+without building.
+"""
+import os
+import re
+import sys
+import json
+import base64
+import hashlib
+import argparse
+import tempfile
+
+from daam_build.asset_cache import get_cache
+from daam_build.compress import PAYLOAD_ID, inflate_document
+
+# Configuration
+SOURCE_DIR = '.'
+REPORT_DIR = 'build_reports'
+BUDGET_FILE = 'budgets.json'
+# Each output's analysis, reused until the output changes
+ANALYSIS_CACHE = '.build_cache/size_report.json'
+TOP_N = 10
+ASSET_EXTS = {'.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.svg', '.ico',
+              '.woff', '.woff2', '.ttf', '.otf', '.eot', '.mp4', '.webm', '.pdf'}
+
+# What each target builds, for the CLI
+OUTPUTS = {
+    'standalone': 'daam_standalone.html',
+    'site': 'daam_offline_site',
+    'linked_site': 'daam_linked_site',
+    'spa': 'daam_one_file_all_pages.html',
+}
+
+DATA_URI_PATTERN = re.compile(r'data:([\w.+-]+/[\w.+-]+);base64,([A-Za-z0-9+/]+=*)')
+BLOCK_START_PATTERN = re.compile(r'<(style|script)\b[^>]*>', re.IGNORECASE)
+# The SPA brackets each page with these comments
+SPA_PAGE_PATTERN = re.compile(r'<!-- PAGE: (\S+) -->(.*?)<!-- /PAGE -->', re.DOTALL)
+PAYLOAD_PATTERN = re.compile(r'<script[^>]*id="%s"[^>]*data-format="(\w+)"[^>]*>([^<]*)</script>' % PAYLOAD_ID)
+
+
+def utf8_len(text):
+    return len(text.encode('utf-8'))
+
+
+class AssetNames:
+    """Names embedded assets after the source file with the same content.
+
+    Source files are hashed on first use, through the asset cache's
+    digest index, so a warm build costs a stat per file.
+    """
+
+    def __init__(self, source_dir=SOURCE_DIR):
+        self.source_dir = source_dir
+        self._names = None
+
+    def _scan(self):
+        cache = get_cache()
+        names = {}
+        for root, dirs, files in os.walk(self.source_dir):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d not in set(OUTPUTS.values()))
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() not in ASSET_EXTS:
+                    continue
+                path = os.path.join(root, name)
+                rel = os.path.relpath(path, self.source_dir).replace('\\', '/')
+                names.setdefault(cache.digest(os.path.abspath(path)), rel)
+                # An optimized variant is named after its original
+                if cache.optimizer is not None:
+                    source = cache.source_for(os.path.abspath(path))
+                    if source != os.path.abspath(path):
+                        names.setdefault(cache.digest(source), rel)
+        return names
+
+    def name(self, digest, mime):
+        if self._names is None:
+            self._names = self._scan()
+        return self._names.get(digest, f'({mime} {digest[:12]})')
+
+
+def inflate_payload(html):
+    """The document a --compress build unpacks to, or None for other builds."""
+    m = PAYLOAD_PATTERN.search(html)
+    if m is None:
+        return None
+    return inflate_document(base64.b64decode(m.group(2)), m.group(1))
+
+
+def _close_tag(html, tag, pos):
+    """(start, end) of the first </tag> at or after pos, or None."""
+    while True:
+        start = html.find('</', pos)
+        if start == -1:
+            return None
+        end = start + 2 + len(tag)
+        if html[start + 2:end].lower() == tag:
+            while end < len(html) and html[end].isspace():
+                end += 1
+            if html.startswith('>', end):
+                return start, end + 1
+        pos = start + 2
+
+
+def blocks(html):
+    """(start, end, 'css' or 'js') of the body of every <style> and <script>.
+
+    Closing tags are found with str.find, so a block costs a scan of its
+    own body once, however much base64 it holds.
+    """
+    found = []
+    pos = 0
+    while m := BLOCK_START_PATTERN.search(html, pos):
+        tag = m.group(1).lower()
+        close = _close_tag(html, tag, m.end())
+        if close is None:
+            break
+        found.append((m.end(), close[0], 'css' if tag == 'style' else 'js'))
+        pos = close[1]
+    return found
+
+
+def analyze(html):
+    """Splits a document's bytes into markup, CSS, JS and embedded assets.
+
+    An asset embedded in a <style> counts as an asset, not CSS, and the
+    same for scripts.  Returns (totals, embeds) with embeds a list of
+    (content sha256, mime type, bytes) in document order.
+    """
+    totals = {'bytes': utf8_len(html), 'markup': 0, 'css': 0, 'js': 0, 'assets': 0}
+    embeds = []
+    spans = blocks(html)
+    for start, end, kind in spans:
+        totals[kind] += utf8_len(html[start:end])
+
+    block = 0
+    for m in DATA_URI_PATTERN.finditer(html):
+        size = m.end() - m.start()
+        digest = hashlib.sha256(base64.b64decode(m.group(2))).hexdigest()
+        embeds.append((digest, m.group(1), size))
+        totals['assets'] += size
+        while block < len(spans) and spans[block][1] <= m.start():
+            block += 1
+        if block < len(spans) and spans[block][0] <= m.start():
+            totals[spans[block][2]] -= size
+    totals['markup'] = totals['bytes'] - totals['css'] - totals['js'] - totals['assets']
+    return totals, embeds
+
+
+def analyze_file(path):
+    """[(page, totals, embeds)] for an output file: one entry per page of
+    a single-file SPA, plus its shell, or a single entry with page None."""
+    with open(path, 'r', encoding='utf-8') as f:
+        html = f.read()
+    inflated = inflate_payload(html)
+    if inflated is not None:
+        html = inflated
+    pages = []
+    shell = []
+    pos = 0
+    for m in SPA_PAGE_PATTERN.finditer(html):
+        shell.append(html[pos:m.start()])
+        pages.append((m.group(1), *analyze(m.group(2))))
+        pos = m.end()
+    if pos:
+        shell.append(html[pos:])
+        pages.append(('(shell)', *analyze(''.join(shell))))
+    else:
+        pages.append((None, *analyze(html)))
+    return pages
+
+
+class AnalysisCache:
+    """analyze_file() results on disk, keyed by output path, size and mtime.
+
+    Decoding and hashing every embed is most of a report's cost, and an
+    incremental build leaves most outputs untouched, so they are only
+    analyzed again once they change.
+    """
+
+    def __init__(self, path=ANALYSIS_CACHE):
+        self.path = path
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+        self.dirty = False
+
+    def pages(self, path):
+        key = os.path.abspath(path)
+        st = os.stat(key)
+        entry = self.entries.get(key)
+        if entry is None or entry['size'] != st.st_size or entry['mtime'] != st.st_mtime_ns:
+            entry = {'size': st.st_size, 'mtime': st.st_mtime_ns, 'pages': analyze_file(path)}
+            self.entries[key] = entry
+            self.dirty = True
+        return entry['pages']
+
+    def save(self):
+        for key in [k for k in self.entries if not os.path.exists(k)]:
+            del self.entries[key]
+            self.dirty = True
+        if not self.dirty:
+            return
+        folder = os.path.dirname(self.path) or '.'
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+class SizeReport:
+    """Bytes per page and per asset for one build, checked against budgets.
+
+    A page is an output HTML file, or one page inside a single-file SPA,
+    whose shell (head, styles, scripts and shared asset table) is its own
+    entry.  Assets are counted once per copy: an image embedded on every
+    page of the offline site costs its size on every page.
+    """
+
+    def __init__(self, target, top=TOP_N, source_dir=SOURCE_DIR, cache=None):
+        self.target = target
+        self.top = top
+        self.names = AssetNames(source_dir)
+        self.cache = cache or AnalysisCache()
+        self.outputs = []
+        self.pages = {}
+        self.assets = {}        # name -> {'bytes', 'copies', 'pages'}
+        self.duplicates = []
+        self.embeds = []        # (bytes, name, page or linked file)
+        self.total_bytes = 0
+        self.violations = []
+
+    def add_page(self, page, totals, embeds):
+        """Adds one analyzed page; returns the names of the assets it embeds."""
+        totals = dict(totals)
+        embeds = [(self.names.name(digest, mime), size) for digest, mime, size in embeds]
+        for name, size in embeds:
+            entry = self.assets.setdefault(name, {'bytes': size, 'copies': 0, 'pages': []})
+            entry['copies'] += 1
+            if page not in entry['pages']:
+                entry['pages'].append(page)
+            self.embeds.append((size, name, page))
+        totals['embeds'] = len(embeds)
+        self.pages[page] = totals
+        return [name for name, _ in embeds]
+
+    def add_file(self, path, page):
+        """Adds an output file; a single-file SPA is split into its pages.
+
+        An asset embedded more than once in the same file is listed in
+        duplicates, with the bytes a shared copy would save.
+        """
+        self.outputs.append(path)
+        self.total_bytes += os.path.getsize(path)
+        embedded = []
+        for name, totals, embeds in self.cache.pages(path):
+            embedded += self.add_page(name or page, totals, embeds)
+
+        counts = {}
+        for name in embedded:
+            counts[name] = counts.get(name, 0) + 1
+        for name, copies in sorted(counts.items()):
+            if copies > 1:
+                self.duplicates.append({'asset': name, 'output': path, 'copies': copies,
+                                        'wasted_bytes': (copies - 1) * self.assets[name]['bytes']})
+
+    def add_tree(self, out_dir):
+        """Adds every HTML page under out_dir, and the linked asset files
+        listed in its asset-manifest.json, if any."""
+        for root, dirs, files in os.walk(out_dir):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith('.html'):
+                    path = os.path.join(root, name)
+                    self.add_file(path, os.path.relpath(path, out_dir).replace('\\', '/'))
+        try:
+            with open(os.path.join(out_dir, 'asset-manifest.json'), 'r', encoding='utf-8') as f:
+                linked = json.load(f)
+        except (OSError, ValueError):
+            return
+        linked_by = {}
+        for page, outs in linked.get('pages', {}).items():
+            for out in outs:
+                linked_by.setdefault(out, []).append(page)
+        for src, out in sorted(linked.get('assets', {}).items()):
+            path = os.path.join(out_dir, out)
+            if not os.path.exists(path):
+                continue
+            size = os.path.getsize(path)
+            self.assets[src] = {'bytes': size, 'copies': 1, 'pages': sorted(linked_by.get(out, []))}
+            self.embeds.append((size, src, out))
+            self.total_bytes += size
+
+    def largest(self):
+        return [{'asset': name, 'bytes': size, 'page': page}
+                for size, name, page in sorted(self.embeds, key=lambda e: (-e[0], e[1]))[:self.top]]
+
+    def check(self, budgets):
+        """Records every budget the build exceeds; returns the violations.
+
+        budgets holds total_kb, page_kb, asset_kb and pages ({page: kb}),
+        any of which may be missing; a "targets" entry overrides them per
+        target.
+        """
+        limits = {k: v for k, v in budgets.items() if k != 'targets'}
+        override = budgets.get('targets', {}).get(self.target, {})
+        limits.update({k: v for k, v in override.items() if k != 'pages'})
+        limits['pages'] = dict(budgets.get('pages', {}), **override.get('pages', {}))
+        self.limits = limits
+
+        def over(what, size, kb):
+            if kb is not None and size > kb * 1024:
+                self.violations.append({'what': what, 'bytes': size, 'budget_kb': kb})
+
+        over('total', self.total_bytes, limits.get('total_kb'))
+        for page, totals in self.pages.items():
+            over(f'page {page}', totals['bytes'], limits['pages'].get(page, limits.get('page_kb')))
+        for name, entry in sorted(self.assets.items()):
+            over(f'asset {name}', entry['bytes'], limits.get('asset_kb'))
+        return self.violations
+
+    def as_dict(self):
+        return {
+            'target': self.target,
+            'outputs': self.outputs,
+            'total_bytes': self.total_bytes,
+            'pages': self.pages,
+            'assets': self.assets,
+            'duplicates': self.duplicates,
+            'largest': self.largest(),
+            'budgets': getattr(self, 'limits', {}),
+            'violations': self.violations,
+        }
+
+    def save(self, report_dir=REPORT_DIR):
+        os.makedirs(report_dir, exist_ok=True)
+        path = os.path.join(report_dir, f'{self.target}.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.as_dict(), f, indent=1, ensure_ascii=False)
+        return path
+
+    def summary(self):
+        heaviest = max(self.pages.items(), key=lambda p: p[1]['bytes'], default=None)
+        lines = [f"Size report: {len(self.pages)} page(s), {self.total_bytes // 1024} KB total"
+                 + (f"; heaviest {heaviest[0]} ({heaviest[1]['bytes'] // 1024} KB)" if heaviest else "")
+                 + (f"; {len(self.duplicates)} duplicated embed(s)" if self.duplicates else "")]
+        for entry in self.largest()[:3]:
+            lines.append(f"  {entry['bytes'] // 1024:>7} KB  {entry['asset']} ({entry['page']})")
+        for v in self.violations:
+            lines.append(f"Over budget: {v['what']} is {v['bytes'] // 1024} KB (budget {v['budget_kb']} KB)")
+        return '\n'.join(lines)
+
+
+def load_budgets(path=BUDGET_FILE):
+    """The budgets in path, or {} (no limits) if it does not exist."""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def report_build(target, output, budget_file=BUDGET_FILE, top=TOP_N):
+    """Reports on a finished build and checks its budgets; prints a summary
+    and returns 1 if any budget is exceeded, else 0."""
+    report = SizeReport(target, top)
+    if os.path.isdir(output):
+        report.add_tree(output)
+    else:
+        report.add_file(output, os.path.basename(output))
+    report.check(load_budgets(budget_file))
+    report.cache.save()
+    path = report.save()
+    print(report.summary())
+    print(f"Size report written to {path}")
+    return 1 if report.violations else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m daam_build budget', description=__doc__.split('\n')[0])
+    parser.add_argument('target', choices=sorted(OUTPUTS))
+    parser.add_argument('output', nargs='?', help="output to report on (default: the target's)")
+    parser.add_argument('--budgets', default=BUDGET_FILE, help=f"budget file (default: {BUDGET_FILE})")
+    parser.add_argument('--top', type=int, default=TOP_N, help="largest embeds to list")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    output = args.output or OUTPUTS[args.target]
+    if not os.path.exists(output):
+        print(f"{output} not found; build it first.")
+        return 2
+    return report_build(args.target, output, args.budgets, args.top)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+import os
+import re
+import difflib
+import tempfile
+
+from daam_build.rewriter import HtmlRewriter
+
+# Backreferences, named groups and conditionals all depend on group names
+# or numbers, which change once a pattern is part of a larger one
+GROUP_DEPENDENT = re.compile(r'\\[1-9]|\\g<|\(\?P[<=]|\(\?\(')
+
+
+class PatternRule:
+    """Replaces every match of a regular expression.
+
+    replacement is a string (with \\1-style references to the rule's own
+    groups) or a function of the match, as for re.sub.
+    """
+
+    def __init__(self, name, pattern, replacement, flags=0):
+        self.name = name
+        self.regex = re.compile(pattern, flags)
+        self.replacement = replacement
+
+    def replace(self, m):
+        if callable(self.replacement):
+            return self.replacement(m)
+        return m.expand(self.replacement)
+
+
+class TagRule:
+    """Edits start tags through HtmlRewriter: fn(tag) may change the Tag in
+    place, or return a string that replaces the whole tag (or, for
+    <script>/<style>, the whole element)."""
+
+    def __init__(self, name, tag, fn):
+        self.name = name
+        self.tag = tag
+        self.fn = fn
+
+
+class Codemod:
+    r"""Applies a set of rules to a document in one pass per kind of rule.
+
+    Pattern rules are joined into one alternation, so the text is scanned
+    once however many rules there are.  At each position the first rule
+    (in order) that matches wins, and text a rule has replaced is not
+    scanned again.  Tag rules then share a single HtmlRewriter pass.
+
+    A pattern that refers to its own groups (\1, (?P=name), (?P<name>...),
+    (?(1)...)) would refer to the wrong ones inside the alternation, so
+    such a rule gets a pass of its own, between the rules before and after
+    it; only then can a later rule see its replacement.
+
+        >>> quotes = PatternRule('quotes', r'([\'"])(.*?)\1', r'«\2»')
+        >>> bold = PatternRule('bold', r'<b>(.*?)</b>', r'<strong>\1</strong>')
+        >>> Codemod([bold, quotes]).apply('<b>"hi"</b> \'x" y\'')
+        ('<strong>«hi»</strong> «x" y»', {'bold': 1, 'quotes': 2})
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.pattern_rules = [r for r in self.rules if isinstance(r, PatternRule)]
+        self.tag_rules = [r for r in self.rules if isinstance(r, TagRule)]
+        # Consecutive rules share a pass; each is wrapped in a named group,
+        # and the rule itself rematches at that spot, so its own group
+        # numbers stay valid in the replacement
+        self._passes = []           # (regex, rules it stands for)
+        shared = []
+        for rule in self.pattern_rules:
+            if not GROUP_DEPENDENT.search(rule.regex.pattern):
+                shared.append(rule)
+                continue
+            if shared:
+                self._passes.append((self._combine(shared), shared))
+                shared = []
+            self._passes.append((rule.regex, [rule]))
+        if shared:
+            self._passes.append((self._combine(shared), shared))
+
+    @classmethod
+    def _combine(cls, rules):
+        return re.compile('|'.join(f'(?P<r{n}>(?{cls._inline_flags(r.regex)}:{r.regex.pattern}))'
+                                   for n, r in enumerate(rules)))
+
+    @staticmethod
+    def _inline_flags(regex):
+        """The rule's flags as scoped inline flags, e.g. 'is' for (?is:...)."""
+        return ''.join(letter for flag, letter in ((re.IGNORECASE, 'i'), (re.DOTALL, 's'),
+                                                    (re.MULTILINE, 'm'), (re.VERBOSE, 'x'))
+                       if regex.flags & flag)
+
+    def apply(self, text):
+        """Returns (new_text, {rule name: number of changes})."""
+        counts = {r.name: 0 for r in self.rules}
+        for regex, rules in self._passes:
+            out = []
+            pos = 0
+            for m in regex.finditer(text):
+                if regex is rules[0].regex:
+                    rule, own = rules[0], m
+                else:
+                    rule = rules[int(m.lastgroup[1:])]
+                    own = rule.regex.match(text, m.start())
+                out.append(text[pos:m.start()])
+                out.append(rule.replace(own))
+                counts[rule.name] += 1
+                pos = m.end()
+            out.append(text[pos:])
+            text = ''.join(out)
+
+        if self.tag_rules:
+            handlers = {}
+            for rule in self.tag_rules:
+                handlers.setdefault(rule.tag, []).append(rule)
+
+            def handler_for(rules):
+                def handle(tag):
+                    for rule in rules:
+                        was_dirty = tag.dirty
+                        tag.dirty = False
+                        replacement = rule.fn(tag)
+                        if replacement is not None or tag.dirty:
+                            counts[rule.name] += 1
+                        tag.dirty = tag.dirty or was_dirty
+                        if replacement is not None:
+                            return replacement
+                    return None
+                return handle
+
+            text = HtmlRewriter({name: handler_for(rules) for name, rules in handlers.items()}).rewrite(text)
+        return text, counts
+
+
+def write_atomic(path, text):
+    """Replaces path with text in one step, keeping its permissions."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        if os.path.exists(path):
+            os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def apply_to_file(path, codemod, label=None, dry_run=False):
+    """Runs codemod over one file; returns (counts, unified diff or None).
+
+    The file is only rewritten when its content actually changed, so its
+    mtime, and every build cache keyed on it, is left alone otherwise.
+    """
+    label = label or path
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        text = f.read()
+    new_text, counts = codemod.apply(text)
+    if new_text == text:
+        return counts, None
+    diff = ''.join(difflib.unified_diff(text.splitlines(True), new_text.splitlines(True),
+                                        f'a/{label}', f'b/{label}'))
+    if not dry_run:
+        write_atomic(path, new_text)
+    return counts, diff
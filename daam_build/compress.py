@@ -0,0 +1,357 @@
+import os
+import json
+import time
+import zlib
+import base64
+import tempfile
+
+from daam_build.asset_cache import guess_mime
+from daam_build.stream import PLACEHOLDER, PLACEHOLDER_PATTERN, StreamWriter
+from daam_build.tracing import complete
+
+# Configuration
+FORMATS = {'gzip': 31, 'deflate': 15}   # zlib wbits for each container
+COMPRESS_LEVEL = 9
+PAYLOAD_ID = 'daam-payload'
+
+# Everything before the payload: a bare page that only holds the data
+BOOTSTRAP_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="UTF-8">
+<title>{title}</title>
+</head>
+<body>
+<noscript>This page needs JavaScript to unpack itself.</noscript>
+<script type="application/octet-stream" id="{payload_id}" data-format="{fmt}">"""
+
+# Everything after it: the loader.  DecompressionStream does the work where
+# the browser has it; otherwise a small bundled inflater takes over.  The
+# embedded files, stored raw after the document (see pack_payload), become
+# blob: URLs, and the document then replaces this one through
+# document.write, so its scripts run exactly as they would in an
+# uncompressed build.
+BOOTSTRAP_TAIL = """</script>
+<script>
+(function () {
+    var LBASE = [3,4,5,6,7,8,9,10,11,13,15,17,19,23,27,31,35,43,51,59,67,83,99,115,131,163,195,227,258];
+    var LEXT = [0,0,0,0,0,0,0,0,1,1,1,1,2,2,2,2,3,3,3,3,4,4,4,4,5,5,5,5,0];
+    var DBASE = [1,2,3,4,5,7,9,13,17,25,33,49,65,97,129,193,257,385,513,769,1025,1537,2049,3073,4097,6145,8193,12289,16385,24577];
+    var DEXT = [0,0,0,0,1,1,2,2,3,3,4,4,5,5,6,6,7,7,8,8,9,9,10,10,11,11,12,12,13,13];
+    var ORDER = [16,17,18,0,8,7,9,6,10,5,11,4,12,3,13,2,14,1,15];
+
+    function huffman(lengths) {
+        var count = new Uint16Array(16), offs = new Uint16Array(16);
+        var sym = new Uint16Array(lengths.length), i;
+        for (i = 0; i < lengths.length; i++) count[lengths[i]]++;
+        count[0] = 0;
+        for (i = 1; i < 16; i++) offs[i] = offs[i - 1] + count[i - 1];
+        for (i = 0; i < lengths.length; i++) if (lengths[i]) sym[offs[lengths[i]]++] = i;
+        return { count: count, sym: sym };
+    }
+
+    // Raw DEFLATE (RFC 1951), decoded one bit at a time like zlib's puff.c
+    function inflateRaw(src, pos) {
+        var out = new Uint8Array(src.length * 4), len = 0, buf = 0, cnt = 0;
+
+        function bits(n) {
+            while (cnt < n) { buf |= (src[pos++] | 0) << cnt; cnt += 8; }
+            var v = buf & ((1 << n) - 1);
+            buf >>>= n; cnt -= n;
+            return v;
+        }
+        function put(b) {
+            if (len === out.length) { var grown = new Uint8Array(len * 2); grown.set(out); out = grown; }
+            out[len++] = b;
+        }
+        function decode(h) {
+            var code = 0, first = 0, index = 0;
+            for (var l = 1; l < 16; l++) {
+                code |= bits(1);
+                var c = h.count[l];
+                if (code - c < first) return h.sym[index + (code - first)];
+                index += c; first = (first + c) << 1; code <<= 1;
+            }
+            throw new Error('Invalid deflate data');
+        }
+
+        var fixedLit = new Uint8Array(288), fixedDist = new Uint8Array(30).fill(5), i;
+        for (i = 0; i < 288; i++) fixedLit[i] = i < 144 ? 8 : i < 256 ? 9 : i < 280 ? 7 : 8;
+
+        var last;
+        do {
+            last = bits(1);
+            var type = bits(2);
+            if (type === 0) {
+                buf = 0; cnt = 0;
+                var n = src[pos] | (src[pos + 1] << 8);
+                pos += 4;
+                while (n--) put(src[pos++]);
+                continue;
+            }
+            var lit, dist;
+            if (type === 1) {
+                lit = huffman(fixedLit); dist = huffman(fixedDist);
+            } else {
+                var hlit = bits(5) + 257, hdist = bits(5) + 1, hclen = bits(4) + 4;
+                var cl = new Uint8Array(19);
+                for (i = 0; i < hclen; i++) cl[ORDER[i]] = bits(3);
+                var clh = huffman(cl), lens = new Uint8Array(hlit + hdist);
+                for (i = 0; i < hlit + hdist;) {
+                    var s = decode(clh);
+                    if (s < 16) { lens[i++] = s; continue; }
+                    var prev = 0, rep;
+                    if (s === 16) { prev = lens[i - 1]; rep = 3 + bits(2); }
+                    else if (s === 17) rep = 3 + bits(3);
+                    else rep = 11 + bits(7);
+                    while (rep--) lens[i++] = prev;
+                }
+                lit = huffman(lens.subarray(0, hlit)); dist = huffman(lens.subarray(hlit));
+            }
+            for (;;) {
+                var sym = decode(lit);
+                if (sym < 256) { put(sym); continue; }
+                if (sym === 256) break;
+                sym -= 257;
+                var length = LBASE[sym] + bits(LEXT[sym]);
+                var d = decode(dist);
+                var back = DBASE[d] + bits(DEXT[d]);
+                while (length--) put(out[len - back]);
+            }
+        } while (!last);
+        return out.subarray(0, len);
+    }
+
+    // Skips the gzip or zlib header; the trailing checksum is not verified
+    function inflate(bytes, format) {
+        if (format !== 'gzip') return inflateRaw(bytes, 2);
+        var flags = bytes[3], pos = 10;
+        if (flags & 4) pos += 2 + (bytes[pos] | (bytes[pos + 1] << 8));
+        if (flags & 8) while (bytes[pos++]);
+        if (flags & 16) while (bytes[pos++]);
+        if (flags & 2) pos += 2;
+        return inflateRaw(bytes, pos);
+    }
+
+    var el = document.getElementById('%(payload_id)s');
+    var format = el.getAttribute('data-format');
+    var bin = atob(el.textContent);
+    var bytes = new Uint8Array(bin.length);
+    for (var i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+    var started = performance.now();
+
+    // Document, raw files, JSON index, then the index's length (4 bytes, little-endian)
+    function show(data) {
+        var end = data.length - 4;
+        var n = (data[end] | (data[end + 1] << 8) | (data[end + 2] << 16) | (data[end + 3] << 24)) >>> 0;
+        var decoder = new TextDecoder('utf-8');
+        var index = JSON.parse(decoder.decode(data.subarray(end - n, end)));
+        var urls = {}, pos = index.text;
+        index.assets.forEach(function (a) {
+            urls[a[0]] = URL.createObjectURL(new Blob([data.subarray(pos, pos + a[2])], { type: a[1] }));
+            pos += a[2];
+        });
+        var html = decoder.decode(data.subarray(0, index.text)).replace(%(placeholder)s, function (m, id) {
+            return urls[id] || '';
+        });
+        console.log('Inflated ' + bytes.length + ' -> ' + data.length + ' bytes in ' +
+                    Math.round(performance.now() - started) + ' ms');
+        document.open();
+        document.write(html);
+        document.close();
+    }
+    function fallback() { show(inflate(bytes, format)); }
+
+    if (window.DecompressionStream) {
+        var stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream(format));
+        new Response(stream).arrayBuffer().then(function (buf) { show(new Uint8Array(buf)); }, fallback);
+    } else {
+        fallback();
+    }
+})();
+</script>
+</body>
+</html>"""
+
+
+def unpack_payload(data):
+    """Splits an inflated payload into (document, {id: (mime, bytes)}).
+
+    The document holds a StreamWriter placeholder for each embedded file;
+    the files follow it raw, in the order the index lists them.
+    """
+    end = len(data) - 4
+    n = int.from_bytes(data[end:], 'little')
+    index = json.loads(data[end - n:end])
+    assets = {}
+    pos = index['text']
+    for asset_id, mime, length in index['assets']:
+        assets[asset_id] = (mime, data[pos:pos + length])
+        pos += length
+    return data[:index['text']].decode('utf-8'), assets
+
+
+def inflate_document(data, fmt):
+    """The document a payload unpacks to, with data URIs for its files."""
+    html, assets = unpack_payload(zlib.decompress(data, FORMATS[fmt]))
+
+    def data_uri(m):
+        mime, raw = assets[int(m.group(1))]
+        return f"data:{mime};base64,{base64.b64encode(raw).decode('ascii')}"
+    return PLACEHOLDER_PATTERN.sub(data_uri, html)
+
+
+class DeflateSink:
+    """Text file-like object that compresses what is written to it.
+
+    Text is UTF-8 encoded and fed through one zlib stream, along with any
+    raw bytes from write_bytes(); the compressed bytes are base64-encoded
+    into out as they come, three bytes at a time, so the payload is never
+    held in memory whole.
+    """
+
+    def __init__(self, out, fmt='gzip', level=COMPRESS_LEVEL):
+        self._out = out
+        self._zlib = zlib.compressobj(level, zlib.DEFLATED, FORMATS[fmt])
+        self._pending = b''
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+
+    def _emit(self, data):
+        self.compressed_bytes += len(data)
+        data = self._pending + data
+        cut = len(data) - len(data) % 3
+        self._out.write(base64.b64encode(data[:cut]).decode('ascii'))
+        self._pending = data[cut:]
+
+    def write(self, text):
+        self.write_bytes(text.encode('utf-8'))
+
+    def write_bytes(self, data):
+        self.raw_bytes += len(data)
+        self._emit(self._zlib.compress(data))
+
+    def close(self):
+        self._emit(self._zlib.flush())
+        self._out.write(base64.b64encode(self._pending).decode('ascii'))
+        self._pending = b''
+
+
+class CompressedStreamWriter(StreamWriter):
+    """A StreamWriter whose output inflates itself in the browser.
+
+    Everything written goes through a DeflateSink into a base64 <script>
+    payload.  The file around it is a small bootstrap page that
+    decompresses the payload and replaces itself with the result.
+
+    Embedded files are not written as data URIs, whose base64 deflate
+    cannot shrink: the document keeps their placeholders, and each file's
+    raw bytes are stored once, after the document, so they are only
+    base64-encoded once, by the payload.  Should the result still not be
+    smaller than the plain document, it is rewritten uncompressed
+    (see fell_back).
+    """
+
+    def __init__(self, path, fmt='gzip', title="Da'am Foundation", cache=None, pipeline=None):
+        super().__init__(path, cache, pipeline)
+        self.fmt = fmt
+        self.title = title
+        self._raw = None
+        self._sink = None
+        self._span = None
+        self._packed = []           # ids of the files the document uses, in first-use order
+        self._text_bytes = 0
+        self.plain_bytes = 0        # what the uncompressed document would take
+        self.fell_back = False
+
+    def __enter__(self):
+        super().__enter__()
+        self._raw = self._file
+        self._raw.write(BOOTSTRAP_HEAD.format(title=self.title, payload_id=PAYLOAD_ID, fmt=self.fmt))
+        start = self._raw.tell()
+        self._sink = self._file = DeflateSink(self._raw, self.fmt)
+        self._span = (start, None)
+        return self
+
+    def write(self, text):
+        super().write(text)
+        size = len(text.encode('utf-8'))
+        self._text_bytes += size
+        self.plain_bytes += size
+
+    def _embed(self, path):
+        asset_id = self._ids[path]
+        if asset_id not in self._packed:
+            self._packed.append(asset_id)
+        placeholder = PLACEHOLDER.format(asset_id)
+        self._file.write(placeholder)
+        self.plain_bytes += self.cache.uri_length(path) - len(placeholder)
+        return 0.0
+
+    def _pack_assets(self):
+        """Appends the raw bytes of every file used, then the index."""
+        index = []
+        for asset_id in self._packed:
+            started = time.perf_counter()
+            source = self.cache.source_for(self.assets[asset_id])
+            length = 0
+            with open(source, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    self._sink.write_bytes(chunk)
+                    length += len(chunk)
+            index.append([asset_id, guess_mime(source), length])
+            seconds = time.perf_counter() - started
+            if self.pipeline is not None:
+                self.pipeline.record('embed', seconds, length, length)
+            complete(os.path.basename(source), 'embed', started, seconds, path=source)
+        data = json.dumps({'text': self._text_bytes, 'assets': index}).encode('utf-8')
+        self._sink.write_bytes(data + len(data).to_bytes(4, 'little'))
+
+    def __exit__(self, *exc):
+        self._pack_assets()
+        self._sink.close()
+        self._span = (self._span[0], self._raw.tell())
+        self._raw.write(BOOTSTRAP_TAIL % {'payload_id': PAYLOAD_ID,
+                                          'placeholder': PLACEHOLDER_PATTERN.pattern.join('//') + 'g'})
+        self._file = self._raw
+        super().__exit__(*exc)
+        if exc[0] is None and os.path.getsize(self.path) >= self.plain_bytes:
+            self._write_plain()
+
+    def _payload(self):
+        start, end = self._span
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            return base64.b64decode(f.read(end - start))
+
+    def _write_plain(self):
+        """Rewrites the output as the plain document, data URIs streamed in."""
+        html, _ = unpack_payload(zlib.decompress(self._payload(), FORMATS[self.fmt]))
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as out:
+            pos = 0
+            for m in PLACEHOLDER_PATTERN.finditer(html):
+                out.write(html[pos:m.start()])
+                self.cache.write_data_uri(self.assets[int(m.group(1))], out)
+                pos = m.end()
+            out.write(html[pos:])
+        os.replace(tmp, self.path)
+        self.fell_back = True
+
+    def inflate_seconds(self):
+        """Time to decode and inflate the written payload, as a cost estimate."""
+        payload = self._payload()
+        started = time.perf_counter()
+        zlib.decompress(payload, FORMATS[self.fmt])
+        return time.perf_counter() - started
+
+    def summary(self):
+        if self.fell_back:
+            return (f"Compressed payload ({self.fmt}) was not smaller than the plain document "
+                    f"({self.plain_bytes // 1024} KB); wrote it uncompressed.")
+        raw = self._sink.raw_bytes
+        packed = self._sink.compressed_bytes
+        ratio = packed / raw if raw else 0
+        return (f"Compressed payload ({self.fmt}): {raw // 1024} KB raw -> {packed // 1024} KB "
+                f"({ratio:.0%}), {4 * ((packed + 2) // 3) // 1024} KB as base64; "
+                f"inflates in {self.inflate_seconds() * 1000:.0f} ms here")
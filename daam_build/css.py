@@ -0,0 +1,223 @@
+import os
+import re
+
+# Configuration
+GROUP_AT_RULES = {'@media', '@supports', '@document', '@layer'}  # at-rules holding style rules
+ALWAYS_PRESENT = {'html', 'head', 'body'}
+
+STRING_OR_COMMENT = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|/\*.*?\*/''', re.DOTALL)
+PSEUDO_PATTERN = re.compile(r'::?[\w-]+(?:\((?:[^()]|\([^()]*\))*\))?')
+ATTR_SELECTOR_PATTERN = re.compile(r'\[[^\]]*\]')
+SIMPLE_SELECTOR_PATTERN = re.compile(r'([.#]?)(-?[_a-zA-Z][\w-]*)')
+
+HTML_TAG_PATTERN = re.compile(r'<([a-zA-Z][\w-]*)')
+HTML_CLASS_PATTERN = re.compile(r'\sclass\s*=\s*["\']([^"\']*)["\']', re.IGNORECASE)
+HTML_ID_PATTERN = re.compile(r'\sid\s*=\s*["\']([^"\']*)["\']', re.IGNORECASE)
+SCRIPT_SRC_PATTERN = re.compile(r'<script\s+[^>]*src=["\']([^"\']+)["\']', re.IGNORECASE)
+INLINE_SCRIPT_PATTERN = re.compile(r'<script\b[^>]*>(.*?)</script\s*>', re.DOTALL | re.IGNORECASE)
+JS_STRING_PATTERN = re.compile(r'''"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`''')
+WORD_PATTERN = re.compile(r'-?[_a-zA-Z][\w-]*')
+
+
+class Rule:
+    """A style rule: its selector list and its raw declaration block."""
+
+    def __init__(self, selectors, body):
+        self.selectors = selectors
+        self.body = body
+
+
+class AtRule:
+    """An at-rule: a statement (@import), a group of rules (@media) whose
+    children are parsed, or an opaque block (@keyframes, @font-face)."""
+
+    def __init__(self, prelude, children=None, body=None):
+        self.prelude = prelude
+        self.children = children
+        self.body = body
+
+    @property
+    def keyword(self):
+        return self.prelude.split(None, 1)[0].lower()
+
+
+def strip_comments(css):
+    return STRING_OR_COMMENT.sub(lambda m: m.group(1) or '', css)
+
+
+def _scan(css, i, stops):
+    """Returns the index of the first char in stops at or after i, skipping
+    strings and anything inside parentheses; len(css) if there is none."""
+    depth = 0
+    while i < len(css):
+        c = css[i]
+        if c in '"\'':
+            j = i + 1
+            while j < len(css) and css[j] != c:
+                j += 2 if css[j] == '\\' else 1
+            i = j + 1
+            continue
+        if c == '(':
+            depth += 1
+        elif c == ')':
+            depth = max(depth - 1, 0)
+        elif depth == 0 and c in stops:
+            return i
+        i += 1
+    return len(css)
+
+
+def _block_end(css, i):
+    """i is just past a '{'; returns the index of its matching '}'."""
+    depth = 1
+    while True:
+        i = _scan(css, i, '{}')
+        if i >= len(css):
+            return i
+        depth += 1 if css[i] == '{' else -1
+        if depth == 0:
+            return i
+        i += 1
+
+
+def _parse(css, i):
+    nodes = []
+    while True:
+        end = _scan(css, i, '{};')
+        prelude = css[i:end].strip()
+        if end >= len(css) or css[end] == '}':
+            return nodes, end + 1
+        if css[end] == ';':
+            if prelude.startswith('@'):
+                nodes.append(AtRule(prelude))
+            i = end + 1
+            continue
+        if prelude.startswith('@') and prelude.split(None, 1)[0].lower() in GROUP_AT_RULES:
+            children, i = _parse(css, end + 1)
+            nodes.append(AtRule(prelude, children=children))
+            continue
+        close = _block_end(css, end + 1)
+        body = css[end + 1:close]
+        if prelude.startswith('@'):
+            nodes.append(AtRule(prelude, body=body))
+        else:
+            nodes.append(Rule([s.strip() for s in prelude.split(',') if s.strip()], body))
+        i = close + 1
+
+
+def parse(css):
+    """Parses a stylesheet into a list of Rule and AtRule nodes."""
+    return _parse(strip_comments(css), 0)[0]
+
+
+class PageTokens:
+    """The tag names, classes and ids a page can contain.
+
+    Words inside the string literals of the page's scripts count as all
+    three, so a class that main.js adds later (e.g. 'active') is kept.
+    """
+
+    def __init__(self):
+        self.tags = set(ALWAYS_PRESENT)
+        self.classes = set()
+        self.ids = set()
+        self.script_words = set()
+
+    def add_html(self, html):
+        self.tags.update(t.lower() for t in HTML_TAG_PATTERN.findall(html))
+        for value in HTML_CLASS_PATTERN.findall(html):
+            self.classes.update(value.split())
+        self.ids.update(v.strip() for v in HTML_ID_PATTERN.findall(html))
+        for script in INLINE_SCRIPT_PATTERN.findall(html):
+            self.add_script(script)
+
+    def add_script(self, js):
+        for literal in JS_STRING_PATTERN.findall(js):
+            self.script_words.update(WORD_PATTERN.findall(literal[1:-1]))
+
+    def matches(self, selector):
+        """True unless some class, id or tag in selector cannot be on the page.
+
+        Pseudo-classes and attribute selectors are ignored, so the test errs
+        on the side of keeping a rule.
+        """
+        plain = PSEUDO_PATTERN.sub('', ATTR_SELECTOR_PATTERN.sub('', selector))
+        for prefix, name in SIMPLE_SELECTOR_PATTERN.findall(plain):
+            if name in self.script_words:
+                continue
+            if prefix == '.':
+                found = name in self.classes
+            elif prefix == '#':
+                found = name in self.ids
+            else:
+                found = name.lower() in self.tags
+            if not found:
+                return False
+        return True
+
+
+def page_tokens(html, base_dir):
+    """Collects the PageTokens of html, reading the local scripts it links."""
+    tokens = PageTokens()
+    tokens.add_html(html)
+    for src in SCRIPT_SRC_PATTERN.findall(html):
+        path = os.path.normpath(os.path.join(base_dir, src))
+        if not src.startswith(('http', 'data:', '//')) and os.path.isfile(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                tokens.add_script(f.read())
+    return tokens
+
+
+def prune(nodes, tokens):
+    """Drops the selectors tokens rules out, then rules and groups left empty."""
+    kept = []
+    for node in nodes:
+        if isinstance(node, Rule):
+            selectors = [s for s in node.selectors if tokens.matches(s)]
+            if selectors:
+                kept.append(Rule(selectors, node.body))
+        elif node.children is not None:
+            children = prune(node.children, tokens)
+            if children:
+                kept.append(AtRule(node.prelude, children=children))
+        else:
+            kept.append(node)
+    return kept
+
+
+def _squeeze(text, tight):
+    """Collapses whitespace outside strings and drops it around tight chars."""
+    parts = re.split(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')''', text)
+    for n in range(0, len(parts), 2):
+        part = re.sub(r'\s+', ' ', parts[n])
+        parts[n] = re.sub(r' ?([%s]) ?' % re.escape(tight), r'\1', part)
+    return ''.join(parts).strip()
+
+
+def _minify_block(body):
+    return _squeeze(body, '{};:,').replace(';}', '}').rstrip(';')
+
+
+def serialize(nodes):
+    """Renders nodes back to CSS, minified."""
+    out = []
+    for node in nodes:
+        if isinstance(node, Rule):
+            selectors = ','.join(_squeeze(s, '>+~') for s in node.selectors)
+            out.append(f'{selectors}{{{_minify_block(node.body)}}}')
+        elif node.children is not None:
+            out.append(f'{_squeeze(node.prelude, ",:")}{{{serialize(node.children)}}}')
+        elif node.body is not None:
+            out.append(f'{_squeeze(node.prelude, ",")}{{{_minify_block(node.body)}}}')
+        else:
+            out.append(f'{_squeeze(node.prelude, ",")};')
+    return ''.join(out)
+
+
+def minify(css):
+    return serialize(parse(css))
+
+
+def prune_css(css, tokens):
+    """Returns css minified, keeping only the rules that can match the page."""
+    return serialize(prune(parse(css), tokens))
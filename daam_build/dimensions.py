@@ -0,0 +1,160 @@
+import os
+import re
+import struct
+
+from daam_build.embed import local_path
+
+# Configuration
+HEADER_BYTES = 64 * 1024    # JPEG metadata can push the frame header this far in
+
+_memo = {}                  # path -> ((size, mtime_ns), (width, height) or None)
+
+
+def _png(head):
+    if head[:8] == b'\x89PNG\r\n\x1a\n' and head[12:16] == b'IHDR':
+        return struct.unpack('>II', head[16:24])
+    return None
+
+
+def _gif(head):
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return struct.unpack('<HH', head[6:10])
+    return None
+
+
+def _webp(head):
+    if head[:4] != b'RIFF' or head[8:12] != b'WEBP':
+        return None
+    chunk = head[12:16]
+    if chunk == b'VP8 ' and head[23:26] == b'\x9d\x01\x2a':
+        w, h = struct.unpack('<HH', head[26:30])
+        return w & 0x3fff, h & 0x3fff
+    if chunk == b'VP8L' and head[20:21] == b'\x2f':
+        bits = int.from_bytes(head[21:25], 'little')
+        return (bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1
+    if chunk == b'VP8X':
+        return (int.from_bytes(head[24:27], 'little') + 1,
+                int.from_bytes(head[27:30], 'little') + 1)
+    return None
+
+
+def _jpeg(head):
+    if head[:2] != b'\xff\xd8':
+        return None
+    pos = 2
+    while pos + 9 < len(head):
+        if head[pos] != 0xff:
+            return None
+        marker = head[pos + 1]
+        if marker == 0xff:          # fill byte
+            pos += 1
+            continue
+        if marker in (0xd8, 0x01) or 0xd0 <= marker <= 0xd7:
+            pos += 2
+            continue
+        length = struct.unpack('>H', head[pos + 2:pos + 4])[0]
+        # Any SOF marker except DHT (c4), JPG (c8) and DAC (cc)
+        if 0xc0 <= marker <= 0xcf and marker not in (0xc4, 0xc8, 0xcc):
+            h, w = struct.unpack('>HH', head[pos + 5:pos + 9])
+            return w, h
+        pos += 2 + length
+    return None
+
+
+SVG_ROOT = re.compile(rb'<svg\b[^>]*>', re.IGNORECASE)
+SVG_LENGTH = rb'\s*=\s*["\']\s*([0-9.]+)(?:px)?\s*["\']'
+
+
+def _svg(head):
+    m = SVG_ROOT.search(head)
+    if m is None:
+        return None
+    root = m.group(0)
+    w = re.search(rb'\swidth' + SVG_LENGTH, root)
+    h = re.search(rb'\sheight' + SVG_LENGTH, root)
+    if w and h:
+        return round(float(w.group(1))), round(float(h.group(1)))
+    box = re.search(rb'\sviewBox\s*=\s*["\']\s*[-0-9.]+[\s,]+[-0-9.]+[\s,]+([0-9.]+)[\s,]+([0-9.]+)', root)
+    if box:
+        return round(float(box.group(1))), round(float(box.group(2)))
+    return None
+
+
+def image_size(path):
+    """Returns (width, height) read from the file's header, or None.
+
+    Handles PNG, GIF, JPEG, WebP and SVG without decoding any pixels;
+    results are memoized by path, size and mtime.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    stamp = (st.st_size, st.st_mtime_ns)
+    entry = _memo.get(path)
+    if entry is None or entry[0] != stamp:
+        with open(path, 'rb') as f:
+            head = f.read(HEADER_BYTES)
+        size = None
+        for reader in (_png, _jpeg, _webp, _gif, _svg):
+            size = reader(head)
+            if size is not None:
+                break
+        entry = _memo[path] = (stamp, size if size and all(size) else None)
+    return entry[1]
+
+
+class ImageHints:
+    """Adds loading hints to a page's <img> tags, in document order.
+
+    Every local image gets its intrinsic width/height, so the layout is
+    reserved before it loads.  The first <section> is taken as the page's
+    hero (the slider or page header): images before it (the header logo)
+    and the first image inside it stay eager; every image after that
+    gets loading="lazy" and decoding="async".  With hero_priority the hero
+    image also gets fetchpriority="high".  Attributes already present in
+    the source are never overwritten.
+
+    Must see each <img> before its src is rewritten, and must be fed the
+    <section> tags too (see handlers()).
+    """
+
+    def __init__(self, base_dir, hero_priority=False):
+        self.base_dir = base_dir
+        self.hero_priority = hero_priority
+        self.sections = 0
+        self.below_hero = False
+        self.sized = 0
+        self.lazy = 0
+
+    def section(self, tag):
+        self.sections += 1
+        if self.sections > 1:
+            self.below_hero = True
+
+    def img(self, tag):
+        path = local_path(tag.get('src'), self.base_dir)
+        size = image_size(path) if path else None
+        if size and tag.get('width') is None and tag.get('height') is None:
+            tag.set('width', str(size[0]))
+            tag.set('height', str(size[1]))
+            self.sized += 1
+
+        if self.below_hero:
+            if tag.get('loading') is None:
+                tag.set('loading', 'lazy')
+                self.lazy += 1
+            if tag.get('decoding') is None:
+                tag.set('decoding', 'async')
+        elif self.sections:
+            # The first image in the hero section
+            if self.hero_priority and tag.get('fetchpriority') is None:
+                tag.set('fetchpriority', 'high')
+            self.below_hero = True
+
+    def handlers(self, embed_img=None):
+        """HtmlRewriter handlers; embed_img(tag), if given, runs after the hints."""
+        def img(tag):
+            self.img(tag)
+            return embed_img(tag) if embed_img else None
+        return {'img': img, 'section': self.section}
@@ -0,0 +1,134 @@
+import os
+from urllib.parse import unquote, urlsplit
+
+from daam_build.asset_cache import file_to_base64
+from daam_build.css import prune_css
+from daam_build.rewriter import HtmlRewriter, rewrite_css_urls
+
+# Configuration
+SOURCE_DIR = '.'                # what a root-relative url (/assets/...) is relative to
+
+# The embedding rules shared by every target.  to_data_uri turns a file
+# path into the value to embed: file_to_base64 for an in-memory build,
+# StreamWriter.asset_ref when streaming, or an AssetTable reference.
+
+
+def url_path(url):
+    """The file part of a local url, or None for remote, data and in-page urls."""
+    url = (url or '').strip()
+    if not url or url.startswith(('#', '//', 'data:', 'mailto:', 'tel:', 'javascript:')):
+        return None
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    return unquote(parts.path)
+
+
+def local_path(url, base_dir, root_dir=SOURCE_DIR):
+    """The file a local url refers to from base_dir, or None for remote urls.
+
+    Resolved as a browser would: the query and fragment are dropped,
+    %-escapes decoded, a directory means its index.html and a
+    root-relative url starts at root_dir.  The reference graph resolves
+    through here too, so what it reports missing is what builds miss.
+    """
+    path = url_path(url)
+    if path is None:
+        return None
+    if path.endswith('/'):
+        path += 'index.html'
+    if path.startswith('/'):
+        return os.path.normpath(os.path.join(root_dir, path.lstrip('/')))
+    return os.path.normpath(os.path.join(base_dir, path))
+
+
+def css_url_embedder(css_dir, to_data_uri=file_to_base64, table=None):
+    """Returns an on_url callback for rewrite_css_urls that embeds local
+    url()s, resolved against css_dir (or points them at table entries)."""
+    def on_url(url):
+        path = local_path(url, css_dir)
+        if path is None:
+            return None
+        if table is not None:
+            return table.css_ref(path) or None
+        data_uri = to_data_uri(path)
+        return f'url("{data_uri}")' if data_uri else None
+    return on_url
+
+
+def embed_image(tag, base_dir, to_data_uri=file_to_base64):
+    """Embeds an <img src="..."> image as base64."""
+    path = local_path(tag.get('src'), base_dir)
+    if path is None:
+        return
+    data_uri = to_data_uri(path)
+    if data_uri:
+        tag.set('src', data_uri)
+
+
+def read_stylesheet(path, tokens=None):
+    """Returns a local stylesheet's text, pruned and minified with tokens."""
+    with open(path, 'r', encoding='utf-8') as f:
+        css = f.read()
+    if tokens is not None:
+        css = prune_css(css, tokens)
+    return css
+
+
+def embed_stylesheet(tag, base_dir, to_data_uri=file_to_base64, tokens=None):
+    """Inlines an external CSS <link> and embeds images referenced inside it.
+
+    With tokens (see daam_build.css), rules that cannot match the page are
+    dropped and the rest minified first, so only the url()s of surviving
+    rules are embedded.
+    """
+    href = tag.get('href')
+    path = local_path(href, base_dir)
+    if (tag.get('rel') or '').lower() != 'stylesheet' or path is None or not os.path.exists(path):
+        return None
+    try:
+        css = read_stylesheet(path, tokens)
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Error reading CSS {path}: {e}")
+        return None
+    # CSS paths are relative to the CSS file, not the page
+    css = rewrite_css_urls(css, css_url_embedder(os.path.dirname(path), to_data_uri))
+    return f'<style>\n/* Inlined from {href} */\n{css}\n</style>'
+
+
+def embed_script(tag, base_dir):
+    """Inlines an external <script src="..."></script>."""
+    src = tag.get('src')
+    path = local_path(src, base_dir)
+    if path is None or tag.content.strip() or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            js = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Error reading JS {path}: {e}")
+        return None
+    return f'<script>\n/* Inlined from {src} */\n{js}\n</script>'
+
+
+def embed_all(html, base_dir, to_data_uri=file_to_base64, tokens=None, hints=None, icons=None,
+              placeholders=None):
+    """Inlines CSS and JS and embeds images, in a single pass over the page.
+
+    hints, an ImageHints (see daam_build.dimensions), sees each <img>
+    before it is embedded.  icons, a scanned IconSprite (see
+    daam_build.icons), replaces the Font Awesome webfont.  placeholders
+    (see daam_build.placeholders) gives large images a blurred preview.
+    """
+    handlers = {
+        'img': lambda tag: embed_image(tag, base_dir, to_data_uri),
+        'link': lambda tag: embed_stylesheet(tag, base_dir, to_data_uri, tokens),
+        'script': lambda tag: embed_script(tag, base_dir),
+    }
+    if hints is not None:
+        handlers.update(hints.handlers(handlers['img']))
+    if placeholders is not None:
+        handlers.update(placeholders.handlers(handlers['img']))
+    if icons is not None:
+        handlers.update(icons.handlers(handlers['link']))
+    return HtmlRewriter(handlers).rewrite(html)
@@ -0,0 +1,96 @@
+"""Site-wide HTML fixes, applied to every page in one pass per file.
+
+    python -m daam_build fixes                    every rule, every page
+    python -m daam_build fixes menu-icons         just these rules
+    python -m daam_build fixes --dry-run          show diffs, write nothing
+"""
+import os
+import re
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from daam_build.codemod import Codemod, PatternRule, apply_to_file
+from daam_build.pages import find_pages
+
+# Configuration
+SOURCE_DIR = '.'
+
+MENU_ICON_SVG = """            <div class="mobile-toggle" style="color:#fff;">
+                <svg width="28" height="28" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round">
+                    <line x1="3" y1="12" x2="21" y2="12"></line>
+                    <line x1="3" y1="6" x2="21" y2="6"></line>
+                    <line x1="3" y1="18" x2="21" y2="18"></line>
+                </svg>
+            </div>"""
+
+# Every fix, by name.  Rules are picklable by name only, so worker
+# processes look them up here.
+RULES = {
+    # The Font Awesome bars icon in the mobile toggle -> an inline SVG
+    'menu-icons': PatternRule(
+        'menu-icons',
+        r'<div\s+class=["\']mobile-toggle["\'][^>]*>\s*<i\s+class=["\']fas\s+fa-bars["\']>\s*</i>\s*</div>',
+        lambda m: MENU_ICON_SVG, re.IGNORECASE | re.DOTALL),
+    # The mobile sticky volunteer button and its comment
+    'remove-sticky-btn': PatternRule(
+        'remove-sticky-btn',
+        r'<!-- Sticky Volunteer Button \(Mobile\) -->\s*<a\s+[^>]*class=["\'][^"\']*sticky-volunteer-btn[^"\']*["\'][^>]*>.*?</a>',
+        '', re.IGNORECASE | re.DOTALL),
+}
+
+
+def process_file(path, rel_path, rule_names, dry_run=False):
+    """Applies the named rules to one page; returns (rel_path, counts, diff)."""
+    codemod = Codemod(RULES[name] for name in rule_names)
+    counts, diff = apply_to_file(path, codemod, rel_path.replace('\\', '/'), dry_run)
+    return rel_path, counts, diff
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m daam_build fixes', description=__doc__.split('\n')[0])
+    parser.add_argument('rules', nargs='*', metavar='RULE',
+                        help=f"rules to apply (default: all of {', '.join(sorted(RULES))})")
+    parser.add_argument('--dry-run', action='store_true', help="print diffs instead of writing")
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help="files to process in parallel (0 = one per CPU core)")
+    parser.add_argument('--path', action='append',
+                        help="only this page (repeatable; default: every page)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.rules if name not in RULES]
+    if unknown:
+        parser.error(f"unknown rule(s): {', '.join(unknown)}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rule_names = args.rules or sorted(RULES)
+    pages = find_pages(SOURCE_DIR)
+    if args.path:
+        wanted = {os.path.normpath(p) for p in args.path}
+        pages = [page for page in pages if os.path.normpath(page[1]) in wanted]
+
+    jobs = args.jobs or os.cpu_count() or 1
+    if jobs > 1 and len(pages) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pages))) as pool:
+            futures = [pool.submit(process_file, *page, rule_names, args.dry_run) for page in pages]
+            results = [future.result() for future in futures]
+    else:
+        results = [process_file(*page, rule_names, args.dry_run) for page in pages]
+
+    changed = 0
+    for rel_path, counts, diff in results:
+        if diff is None:
+            continue
+        changed += 1
+        applied = ', '.join(f'{name} x{n}' for name, n in counts.items() if n)
+        print(f"{'Would change' if args.dry_run else 'Changed'} {rel_path}: {applied}")
+        if args.dry_run:
+            print(diff)
+    print(f"{changed} of {len(pages)} page(s) {'would change' if args.dry_run else 'changed'}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+import re
+
+from daam_build.fa_icons import FA_ICONS
+
+# Configuration
+ICON_STYLES = {'fa', 'fas', 'fa-solid'}
+SYMBOL_PREFIX = 'fa-'
+# Stands in for the Font Awesome stylesheet: the <i> keeps its classes (the
+# site's CSS styles icons through them) and the SVG inside it takes the
+# font size and colour, as the glyph did.  After FA's svg-with-js.css.
+ICON_CSS = ('i.fa,i.fas,i.fa-solid{display:inline-block;font-style:normal;line-height:1}'
+            '.fa-2x{font-size:2em}'
+            'svg.fa-svg{height:1em;width:auto;overflow:visible;vertical-align:-.125em;fill:currentColor}')
+
+# Classes that size or animate an icon rather than name one
+MODIFIER_PATTERN = re.compile(r'fa-(\d+x|\d*x[sl]|sm|lg|fw|li|ul|spin|pulse|border|inverse|beat|fade|bounce|shake'
+                              r'|flip(-\w+)?|rotate-\w+|pull-\w+|stack(-\w+)?)$')
+ICON_TAG_PATTERN = re.compile(r'<i\b[^>]*?\sclass\s*=\s*["\']([^"\']*)["\']', re.IGNORECASE)
+
+
+def is_fa_stylesheet(tag):
+    """Whether a <link> tag loads Font Awesome (from a CDN or locally)."""
+    href = (tag.get('href') or '').lower()
+    return (tag.get('rel') or '').lower() == 'stylesheet' and ('font-awesome' in href or 'fontawesome' in href)
+
+
+def icon_name(classes):
+    """The icon an <i> class list shows, e.g. 'globe', or None."""
+    classes = classes.split()
+    if not ICON_STYLES.intersection(classes):
+        return None
+    for cls in classes:
+        if cls.startswith('fa-') and cls not in ICON_STYLES and not MODIFIER_PATTERN.match(cls):
+            return cls[3:]
+    return None
+
+
+class IconSprite:
+    """Swaps Font Awesome's webfont for inline SVG from one sprite.
+
+    Each <i class="fas fa-NAME"> gets an <svg><use href="#fa-NAME"> inside
+    it, the Font Awesome <link> becomes a few lines of CSS, and every icon
+    the document uses is defined once, as a <symbol> in sprite().  Icons
+    missing from FA_ICONS are left alone and listed in missing; a scanned
+    page that uses one keeps its Font Awesome <link> for them.
+
+    scan() a whole page first to have sprite() inserted right after its
+    <body> tag (see handlers()); otherwise write sprite() yourself once
+    every page has been rewritten.
+    """
+
+    def __init__(self):
+        self.used = {}          # name -> number of <i> tags showing it
+        self.missing = set()
+
+    def scan(self, html):
+        """Registers the icons html uses, so the sprite is complete up front."""
+        for m in ICON_TAG_PATTERN.finditer(html):
+            name = icon_name(m.group(1))
+            if name in FA_ICONS:
+                self.used.setdefault(name, 0)
+            elif name is not None:
+                self.missing.add(name)
+        return self
+
+    def icon(self, tag):
+        name = icon_name(tag.get('class') or '')
+        if name is None:
+            return None
+        if name not in FA_ICONS:
+            self.missing.add(name)
+            return None
+        self.used[name] = self.used.get(name, 0) + 1
+        width, height, _ = FA_ICONS[name]
+        return (f'{tag.render()}<svg class="fa-svg" viewBox="0 0 {width} {height}" aria-hidden="true">'
+                f'<use href="#{SYMBOL_PREFIX}{name}"></use></svg>')
+
+    def stylesheet(self, tag):
+        """The replacement for a Font Awesome <link>, or None for other links."""
+        if not is_fa_stylesheet(tag):
+            return None
+        css = f'<style>{ICON_CSS}</style>'
+        return css + tag.render() if self.missing else css
+
+    def sprite(self):
+        """An invisible <svg> defining a <symbol> per icon used, or ''."""
+        if not self.used:
+            return ''
+        symbols = ''.join(f'<symbol id="{SYMBOL_PREFIX}{name}" viewBox="0 0 {w} {h}"><path d="{path}"/></symbol>'
+                          for name in sorted(self.used) for w, h, path in [FA_ICONS[name]])
+        return ('<svg xmlns="http://www.w3.org/2000/svg" aria-hidden="true" '
+                f'style="position:absolute;width:0;height:0;overflow:hidden">{symbols}</svg>')
+
+    def handlers(self, link=None):
+        """HtmlRewriter handlers; link(tag), if given, handles every other <link>."""
+        def link_or_stylesheet(tag):
+            replacement = self.stylesheet(tag)
+            if replacement is None and link is not None:
+                return link(tag)
+            return replacement
+
+        def body(tag):
+            return tag.render() + self.sprite()
+        return {'i': self.icon, 'link': link_or_stylesheet, 'body': body}
+
+    def merge(self, used, missing):
+        """Adds another sprite's used counts and missing names (e.g. from a
+        worker process), so summary() covers a whole build."""
+        for name, count in used.items():
+            self.used[name] = self.used.get(name, 0) + count
+        self.missing.update(missing)
+        return self
+
+    def summary(self):
+        lines = [f"Icon sprite: {len(self.used)} icon(s), {len(self.sprite()) // 1024} KB, "
+                 f"replacing the Font Awesome webfont."]
+        if self.missing:
+            lines.append(f"Not in daam_build/fa_icons.py, still from the webfont: "
+                         f"{', '.join('fa-' + name for name in sorted(self.missing))}")
+        return '\n'.join(lines)
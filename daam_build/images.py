@@ -0,0 +1,140 @@
+import os
+import tempfile
+
+from daam_build.asset_cache import get_cache
+
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow is optional; without it images are embedded as-is
+    Image = None
+    features = None
+
+# Configuration
+CACHE_DIR = '.build_cache/images'
+RASTER_EXTS = {'.png', '.jpg', '.jpeg', '.webp'}
+MAX_WIDTH = 1600                    # widest the layout ever renders an image
+SRCSET_WIDTHS = (480, 960, 1600)    # variants offered to linked builds
+QUALITY = {'webp': 80, 'avif': 60}
+MIME_TYPES = {'webp': 'image/webp', 'avif': 'image/avif'}
+
+
+def available():
+    """True when Pillow is installed and can write WebP."""
+    return Image is not None and features.check('webp')
+
+
+def avif_available():
+    return Image is not None and bool(features.check('avif'))
+
+
+class ImageOptimizer:
+    """Downscales and re-encodes raster images, caching results by source hash.
+
+    Variants live in CACHE_DIR as <sha256>-w<width>-q<quality>.<fmt>, so an
+    unchanged source is never decoded twice, even across builds.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_width=MAX_WIDTH, formats=('webp',),
+                 quality=None):
+        if not available():
+            raise RuntimeError("Image optimization needs Pillow with WebP support "
+                               "(pip install Pillow)")
+        if 'avif' in formats and not avif_available():
+            print("Warning: this Pillow build cannot write AVIF, using WebP only.")
+            formats = tuple(f for f in formats if f != 'avif')
+        self.cache_dir = cache_dir
+        self.max_width = max_width
+        self.formats = formats
+        self.quality = dict(QUALITY, **(quality or {}))
+        self.savings = {}   # source path -> bytes saved by its embedded variant
+
+    @property
+    def saved_bytes(self):
+        return sum(self.savings.values())
+
+    def handles(self, path):
+        return os.path.splitext(path)[1].lower() in RASTER_EXTS
+
+    def variant(self, path, width, fmt):
+        """Returns the path of path re-encoded as fmt, at most width px wide."""
+        digest = get_cache().digest(path)
+        quality = self.quality[fmt]
+        out = os.path.join(self.cache_dir, f"{digest}-w{width}-q{quality}.{fmt}")
+        if os.path.exists(out):
+            return out
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with Image.open(path) as im:
+            im.load()
+            if im.width > width:
+                height = round(im.height * width / im.width)
+                im = im.resize((width, height), Image.LANCZOS)
+            if im.mode not in ('RGB', 'RGBA'):
+                has_alpha = 'A' in im.mode or 'transparency' in im.info
+                im = im.convert('RGBA' if has_alpha else 'RGB')
+            options = {'method': 6} if fmt == 'webp' else {}
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                im.save(f, format=fmt.upper(), quality=quality, **options)
+        os.replace(tmp, out)
+        return out
+
+    def smallest(self, path, max_width=None):
+        """Returns the smallest of path and its variants, for embedded builds.
+
+        Falls back to the original whenever it is already smaller, e.g. for
+        small logos and icons that PNG compresses well.
+        """
+        if not self.handles(path):
+            return path
+        width = min(max_width or self.max_width, self.max_width)
+        best = path
+        best_size = os.path.getsize(path)
+        for fmt in self.formats:
+            try:
+                candidate = self.variant(path, width, fmt)
+            except (OSError, ValueError) as e:
+                print(f"Warning: could not optimize {path}: {e}")
+                return path
+            size = os.path.getsize(candidate)
+            if size < best_size:
+                best, best_size = candidate, size
+        self.savings[os.path.abspath(path)] = os.path.getsize(path) - best_size
+        return best
+
+    def srcset_variants(self, path):
+        """Returns {fmt: [(variant_path, width), ...]} for linked builds."""
+        with Image.open(path) as im:
+            native = im.width
+        widths = sorted({min(w, native) for w in SRCSET_WIDTHS})
+        return {fmt: [(self.variant(path, w, fmt), w) for w in widths]
+                for fmt in self.formats}
+
+    def picture_sources(self, path, publish):
+        """The <source> tags of a <picture> offering path's srcset variants,
+        AVIF first, for linked builds.
+
+        publish(variant_path, width) puts a variant in the output and
+        returns its URL; the <img> inside the <picture> stays the fallback.
+        """
+        sources = []
+        variants = self.srcset_variants(path)
+        for fmt in sorted(variants, key=lambda fmt: fmt != 'avif'):
+            srcset = ', '.join(f"{publish(variant, width)} {width}w" for variant, width in variants[fmt])
+            sources.append(f'<source type="{MIME_TYPES[fmt]}" srcset="{srcset}" '
+                           f'sizes="(max-width: {self.max_width}px) 100vw, {self.max_width}px">')
+        return ''.join(sources)
+
+
+def enable_optimization(avif=False):
+    """Routes every embedded raster image through an ImageOptimizer.
+
+    Returns the optimizer, or None (with a warning) when Pillow is missing.
+    """
+    if not available():
+        print("Warning: Pillow with WebP support is not installed; "
+              "images will be embedded unoptimized.")
+        return None
+    optimizer = ImageOptimizer(formats=('webp', 'avif') if avif else ('webp',))
+    get_cache().optimizer = optimizer
+    return optimizer
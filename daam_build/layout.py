@@ -0,0 +1,265 @@
+"""Renders the shared chrome of every page from layout/.
+
+    python -m daam_build layout              re-render what changed
+    python -m daam_build layout --dry-run    show diffs, write nothing
+    python -m daam_build layout --force      re-render every page
+
+The header, footer, <html lang/dir>, <title> and meta description of
+each page come from the partials in layout/partials and the string
+table of its locale (layout/strings/<locale>.json).  Everything else in
+a page is its own content, edited in place as before (and by the admin
+panel); the chrome is rewritten around it.  A page is only touched when
+its rendered chrome differs from what was last written into it, so
+editing the English strings leaves the Arabic pages alone.
+"""
+import os
+import re
+import sys
+import json
+import html
+import hashlib
+import argparse
+
+from daam_build.codemod import Codemod, PatternRule, apply_to_file
+from daam_build.manifest import BuildManifest, toolchain_files
+
+# Configuration
+SOURCE_DIR = '.'
+LAYOUT_DIR = 'layout'
+# Locale -> folder its pages live in, relative to SOURCE_DIR
+LOCALES = {'ar': '', 'en': 'en'}
+# Every page, in navigation order; each exists once per locale
+PAGES = ['index', 'about', 'programs', 'participate', 'contact']
+FOOTER_PAGES = ['about', 'programs', 'participate', 'contact']
+
+HEADER_PATTERN = r'<header>.*?</header>'
+FOOTER_PATTERN = r'<footer>.*?</footer>'
+
+# Region name -> (what it replaces in a page, template rendering it)
+REGIONS = {
+    'html': (r'<html\b[^>]*>', '<html lang="{{lang}}" dir="{{dir}}">'),
+    'title': (r'<title>.*?</title>', '<title>{{title}}</title>'),
+    'description': (r'<meta\s+name="description"\s+content="[^"]*"\s*/?>',
+                    '<meta name="description"\n        content="{{description}}">'),
+    'header': (HEADER_PATTERN, '{{> header}}'),
+    'footer': (FOOTER_PATTERN, '{{> footer}}'),
+}
+
+TAG = re.compile(r'{{\s*([#^/>]?)\s*([\w.]+)\s*}}')
+# A section tag alone on its line renders no line of its own
+STANDALONE = re.compile(r'^[ \t]*({{\s*[#^/][^}]*}})[ \t]*\n', re.MULTILINE)
+
+
+class LayoutError(Exception):
+    pass
+
+
+def _escape(value):
+    return html.escape(str(value), quote=False).replace('"', '&quot;')
+
+
+def _parse(template):
+    """The template as a tree: text, ('var', name), ('partial', name) and
+    ('section', name, inverted, children) nodes."""
+    template = STANDALONE.sub(r'\1', template)
+    root = []
+    stack = [(None, root)]
+    pos = 0
+    for m in TAG.finditer(template):
+        nodes = stack[-1][1]
+        nodes.append(template[pos:m.start()])
+        pos = m.end()
+        kind, name = m.groups()
+        if kind in ('#', '^'):
+            children = []
+            nodes.append(('section', name, kind == '^', children))
+            stack.append((name, children))
+        elif kind == '/':
+            if stack[-1][0] != name:
+                raise LayoutError(f"{{{{/{name}}}}} closes {stack[-1][0] or 'nothing'}")
+            stack.pop()
+        else:
+            nodes.append(('partial' if kind == '>' else 'var', name))
+    if len(stack) > 1:
+        raise LayoutError(f"{{{{#{stack[-1][0]}}}}} is never closed")
+    root.append(template[pos:])
+    return root
+
+
+def _lookup(name, stack):
+    first, *rest = name.split('.')
+    for frame in reversed(stack):
+        if isinstance(frame, dict) and first in frame:
+            value = frame[first]
+            break
+    else:
+        raise LayoutError(f"{name} is not defined")
+    for part in rest:
+        if not isinstance(value, dict) or part not in value:
+            raise LayoutError(f"{name} is not defined")
+        value = value[part]
+    return value
+
+
+class Layout:
+    """The partials and string tables under layout_dir.
+
+    Templates are a small subset of Mustache: {{name}} (escaped, with
+    dotted lookups), {{#name}}...{{/name}} (repeated per list item, or
+    shown if truthy), {{^name}}...{{/name}} (shown if falsy) and
+    {{> partial}}.  Every name must be defined; a typo is an error, not
+    an empty string.
+    """
+
+    def __init__(self, layout_dir=LAYOUT_DIR):
+        self.layout_dir = layout_dir
+        self.strings = {}
+        for locale in LOCALES:
+            with open(os.path.join(layout_dir, 'strings', f'{locale}.json'), 'r', encoding='utf-8') as f:
+                self.strings[locale] = json.load(f)
+        self._partials = {}
+
+    def partial(self, name):
+        if name not in self._partials:
+            path = os.path.join(self.layout_dir, 'partials', f'{name}.html')
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._partials[name] = _parse(f.read().strip())
+            except OSError:
+                raise LayoutError(f"no partial {path}")
+        return self._partials[name]
+
+    def render(self, template, context):
+        nodes = _parse(template) if isinstance(template, str) else template
+        out = []
+        self._render(nodes, [context], out)
+        return ''.join(out)
+
+    def _render(self, nodes, stack, out):
+        for node in nodes:
+            if isinstance(node, str):
+                out.append(node)
+            elif node[0] == 'var':
+                out.append(_escape(_lookup(node[1], stack)))
+            elif node[0] == 'partial':
+                self._render(self.partial(node[1]), stack, out)
+            else:
+                _, name, inverted, children = node
+                value = _lookup(name, stack)
+                if inverted:
+                    if not value:
+                        self._render(children, stack, out)
+                elif isinstance(value, list):
+                    for item in value:
+                        self._render(children, stack + [item], out)
+                elif value:
+                    self._render(children, stack + [value], out)
+
+    # -- pages ---------------------------------------------------------------
+
+    def context(self, locale, page):
+        """What the templates of one page see: its locale's strings plus
+        links, nav items and language toggles resolved for that page."""
+        strings = self.strings[locale]
+        folder = LOCALES[locale]
+
+        def href(other_locale, name):
+            return os.path.relpath(os.path.join(LOCALES[other_locale] or '.', f'{name}.html'),
+                                   folder or '.').replace('\\', '/')
+
+        def nav(names):
+            return [{'href': href(locale, name), 'label': strings['pages'][name]['nav'],
+                     'active': name == page} for name in names]
+
+        context = dict(strings)
+        context.update(strings['pages'][page])
+        context.update({
+            'page': page,
+            'root': '../' * len([part for part in folder.split('/') if part]),
+            'links': {name: href(locale, name) for name in PAGES},
+            'nav': nav(PAGES),
+            'footer_nav': nav(FOOTER_PAGES),
+            'languages': [{'href': href(other, page), 'label': self.strings[other]['language_label']}
+                          for other in LOCALES if other != locale],
+        })
+        return context
+
+    def regions(self, locale, page):
+        """{region name: rendered markup} for one page."""
+        context = self.context(locale, page)
+        return {name: self.render(template, context) for name, (_, template) in REGIONS.items()}
+
+
+def page_path(locale, page, source_dir=SOURCE_DIR):
+    return os.path.join(source_dir, LOCALES[locale], f'{page}.html')
+
+
+def chrome_codemod(regions):
+    # Replacements are functions, so backslashes in strings stay literal
+    return Codemod(PatternRule(name, REGIONS[name][0], lambda m, text=text: text, re.DOTALL)
+                   for name, text in regions.items())
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m daam_build layout', description=__doc__.split('\n')[0])
+    parser.add_argument('--dry-run', action='store_true', help="print diffs instead of writing")
+    parser.add_argument('--force', action='store_true',
+                        help="re-render every page, even if its chrome did not change")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        layout = Layout()
+    except (OSError, ValueError) as e:
+        print(f"Could not load {LAYOUT_DIR}/: {e}")
+        return 1
+    manifest = BuildManifest('layout')
+    toolchain = toolchain_files(__file__)
+
+    changed = skipped = 0
+    failed = []
+    for locale in LOCALES:
+        for page in PAGES:
+            path = page_path(locale, page)
+            rel_path = os.path.relpath(path, SOURCE_DIR).replace('\\', '/')
+            if not os.path.exists(path):
+                print(f"Skipping {rel_path} (not found)")
+                continue
+            try:
+                regions = layout.regions(locale, page)
+            except LayoutError as e:
+                failed.append(rel_path)
+                print(f"Error: {rel_path}: {e}")
+                continue
+            # The rendered chrome is the fingerprint: a page is only
+            # redone when a partial or string it actually uses changed
+            options = {'chrome': hashlib.sha256(json.dumps(regions, sort_keys=True).encode('utf-8')).hexdigest()}
+            inputs = [path] + toolchain
+            if not args.force and manifest.is_fresh(path, inputs, options):
+                skipped += 1
+                continue
+
+            counts, diff = apply_to_file(path, chrome_codemod(regions), rel_path, args.dry_run)
+            missing = [name for name, n in counts.items() if n == 0]
+            if missing:
+                print(f"Warning: {rel_path} has no {', '.join(missing)} to replace")
+            if diff is not None:
+                changed += 1
+                print(f"{'Would change' if args.dry_run else 'Changed'} {rel_path}")
+                if args.dry_run:
+                    print(diff)
+            if not args.dry_run:
+                manifest.record(path, inputs, options)
+    if not args.dry_run:
+        manifest.save()
+
+    total = len(LOCALES) * len(PAGES)
+    print(f"{changed} of {total} page(s) {'would change' if args.dry_run else 'changed'}"
+          f"{f', {skipped} up to date' if skipped else ''}.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
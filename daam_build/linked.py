@@ -0,0 +1,156 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+
+from daam_build.asset_cache import get_cache
+
+# Configuration
+HASH_LENGTH = 8
+MANIFEST_FILE = 'asset-manifest.json'
+
+
+def _key(path, root):
+    return os.path.relpath(os.path.abspath(path), os.path.abspath(root)).replace('\\', '/')
+
+
+def hashed_name(path, digest):
+    """assets/images/logo.png -> assets/images/logo.<hash>.png"""
+    stem, ext = os.path.splitext(path)
+    return f'{stem}.{digest[:HASH_LENGTH]}{ext}'
+
+
+class LinkedAssets:
+    """Publishes the files a page links to into the output folder, each once,
+    under a content-hashed name next to where the original lives.
+
+    Because the name changes whenever the content does, a browser may cache
+    the files forever, and every page of the build shares one copy.  Files
+    are written through a temp file and never overwritten, so build workers
+    in several processes can publish the same asset safely.
+
+    published maps each source path (relative to source_dir) to its output
+    path (relative to out_dir); see AssetManifest.
+    """
+
+    def __init__(self, source_dir, out_dir, cache=None):
+        self.source_dir = source_dir
+        self.out_dir = out_dir
+        self.cache = cache or get_cache()
+        self.published = {}
+
+    def _target(self, path, digest, ext=None):
+        rel = _key(path, self.source_dir)
+        if ext:
+            rel = os.path.splitext(rel)[0] + ext
+        return os.path.join(self.out_dir, hashed_name(rel, digest))
+
+    def _publish(self, path, target, write, key=None):
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp, target)
+        self.published[key or _key(path, self.source_dir)] = _key(target, self.out_dir)
+        return target
+
+    def copy(self, path, optimized=True):
+        """Publishes path (its optimized variant, if any, unless optimized is
+        False); returns the output path."""
+        source = self.cache.source_for(os.path.abspath(path)) if optimized else os.path.abspath(path)
+        # An optimized variant keeps the original's name, with its own extension
+        target = self._target(path, self.cache.digest(source), os.path.splitext(source)[1])
+
+        def write(f):
+            with open(source, 'rb') as src:
+                shutil.copyfileobj(src, f)
+        return self._publish(path, target, write)
+
+    def copy_variant(self, path, variant, width):
+        """Publishes variant, path resized to width px, as
+        <name>-<width>w.<hash>.<ext> next to path's own copy."""
+        rel = _key(path, self.source_dir)
+        ext = os.path.splitext(variant)[1]
+        name = f'{os.path.splitext(rel)[0]}-{width}w{ext}'
+        target = os.path.join(self.out_dir, hashed_name(name, self.cache.digest(variant)))
+
+        def write(f):
+            with open(variant, 'rb') as src:
+                shutil.copyfileobj(src, f)
+        return self._publish(path, target, write, key=f'{rel}@{width}w{ext}')
+
+    def picture_sources(self, path, from_dir):
+        """<source> tags offering path's resized WebP/AVIF variants, as
+        published copies, or '' when images are not being optimized."""
+        optimizer = self.cache.optimizer
+        if optimizer is None or not optimizer.handles(path):
+            return ''
+        try:
+            return optimizer.picture_sources(
+                path, lambda variant, width: self.url(self.copy_variant(path, variant, width), from_dir))
+        except (OSError, ValueError) as e:
+            print(f"Warning: no srcset for {path}: {e}")
+            return ''
+
+    def write_text(self, path, text):
+        """Publishes text as the output version of path; returns the output path."""
+        data = text.encode('utf-8')
+        target = self._target(path, hashlib.sha256(data).hexdigest())
+        return self._publish(path, target, lambda f: f.write(data))
+
+    @staticmethod
+    def url(target, from_dir):
+        """The URL of output file target as seen from output directory from_dir."""
+        return os.path.relpath(target, from_dir).replace('\\', '/')
+
+
+class AssetManifest:
+    """asset-manifest.json in the output folder: which hashed file stands
+    for which source, and which files each page links.
+
+    Pages are merged into the existing manifest, so an incremental build
+    that rebuilds one page keeps the others' entries.  collect() then
+    deletes hashed files that no page links any more.
+    """
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.path = os.path.join(out_dir, MANIFEST_FILE)
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.assets = data.get('assets', {})
+        self.pages = data.get('pages', {})
+        self._written = set(self.assets.values()).union(*self.pages.values())
+
+    def record(self, page, published):
+        self.pages[page] = sorted(set(published.values()))
+        self.assets.update(published)
+        self._written.update(published.values())
+
+    def forget(self, page):
+        self.pages.pop(page, None)
+
+    def collect(self):
+        """Deletes hashed files no page links any more; returns how many."""
+        live = set().union(*self.pages.values())
+        self.assets = {src: out for src, out in self.assets.items() if out in live}
+        removed = 0
+        for out in sorted(self._written - live):
+            path = os.path.join(self.out_dir, out)
+            if os.path.exists(path):
+                os.remove(path)
+                removed += 1
+        self._written = live
+        return removed
+
+    def save(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.out_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'assets': self.assets, 'pages': self.pages}, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
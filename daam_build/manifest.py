@@ -0,0 +1,70 @@
+import os
+import json
+import glob
+import tempfile
+
+from daam_build.asset_cache import get_cache
+
+# Configuration
+MANIFEST_DIR = '.build_cache/manifests'
+
+
+def toolchain_files(builder_script):
+    """The builder script and this package: changing either invalidates outputs."""
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    files = sorted(glob.glob(os.path.join(package_dir, '**', '*.py'), recursive=True))
+    return [builder_script] + [f for f in files if f != os.path.abspath(builder_script)]
+
+
+def _key(path):
+    return os.path.relpath(os.path.abspath(path)).replace('\\', '/')
+
+
+class BuildManifest:
+    """Records, per output file, the hash of every input it was built from.
+
+    An output is fresh when it still exists, was built with the same
+    options, and every input hashes the same as last time.  Hashes come
+    from the shared asset cache, so unchanged files are checked by stat
+    alone.  Missing inputs are recorded as None, so a page that starts
+    resolving a previously missing image is rebuilt.
+    """
+
+    def __init__(self, name, manifest_dir=MANIFEST_DIR):
+        self.path = os.path.join(manifest_dir, name + '.json')
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def hashes(self, inputs):
+        cache = get_cache()
+        result = {}
+        for path in inputs:
+            key = _key(path)
+            if key not in result:
+                result[key] = cache.digest(path) if os.path.isfile(path) else None
+        return result
+
+    def is_fresh(self, output, inputs, options=None):
+        entry = self.entries.get(_key(output))
+        if not entry or not os.path.exists(output):
+            return False
+        return entry['options'] == (options or {}) and entry['inputs'] == self.hashes(inputs)
+
+    def record(self, output, inputs, options=None):
+        self.entries[_key(output)] = {'options': options or {}, 'inputs': self.hashes(inputs)}
+
+    def outputs(self):
+        return list(self.entries)
+
+    def forget(self, output):
+        self.entries.pop(_key(output), None)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
@@ -0,0 +1,21 @@
+import os
+
+# Configuration
+IGNORE_DIRS = {'.git', '.gemini', 'daam-one-page', 'daam_offline_site', 'daam_linked_site', '__pycache__', '.idea', '.vscode', '.build_cache', 'layout'}
+IGNORE_FILES = {'build_standalone.py', 'build_full_site.py', 'daam_standalone.html', 'daam_one_file_all_pages.html'}
+
+
+def find_pages(source_dir='.', ignore_dirs=IGNORE_DIRS, ignore_files=IGNORE_FILES):
+    """Returns (full_path, rel_path) for every page, in a stable order."""
+    pages = []
+    for root, dirs, files in os.walk(source_dir):
+        # Modify dirs in-place to skip ignored directories
+        dirs[:] = sorted(d for d in dirs if d not in ignore_dirs)
+        
+        for file in sorted(files):
+            if not file.endswith('.html') or file in ignore_files:
+                continue
+                
+            full_path = os.path.join(root, file)
+            pages.append((full_path, os.path.relpath(full_path, source_dir)))
+    return pages
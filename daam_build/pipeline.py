@@ -0,0 +1,111 @@
+import time
+from contextlib import contextmanager
+
+from daam_build.tracing import complete
+
+# Every target runs through these stages, in this order:
+#   load      - read source pages, stylesheets and scripts
+#   transform - work on whole documents: body extraction, CSS pruning
+#   rewrite   - the single HtmlRewriter pass over each page
+#   embed     - expanding asset references into data URIs
+#   write     - everything else that goes to disk
+#   precompress - .gz/.br siblings of the outputs, after the build
+STAGES = ('load', 'transform', 'rewrite', 'embed', 'write', 'precompress')
+
+
+def size_of(data):
+    """Bytes in data: a str (as UTF-8), bytes, or a list of either.
+    Anything else (e.g. a parsed structure) counts as 0."""
+    if isinstance(data, (list, tuple)):
+        return sum(size_of(d) for d in data)
+    if isinstance(data, str):
+        return len(data.encode('utf-8'))
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    return 0
+
+
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def add(self, seconds, bytes_in=0, bytes_out=0, calls=1):
+        self.calls += calls
+        self.seconds += seconds
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+
+    def as_dict(self):
+        return {'calls': self.calls, 'seconds': self.seconds,
+                'bytes_in': self.bytes_in, 'bytes_out': self.bytes_out}
+
+
+class Timing:
+    """Handed out by Pipeline.stage; set bytes_in / bytes_out before it closes."""
+
+    def __init__(self):
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+
+class Pipeline:
+    """Per-stage wall time and bytes in/out for one target's build.
+
+    Work is wrapped either with run(), which measures the data passed in
+    and returned, or with the stage() context manager for anything that
+    does not fit one call.  Stats from other processes are folded in with
+    merge(), so a parallel build still reports one table.  With tracing on
+    (see daam_build.tracing) each timed call is also a span.
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self.stats = {name: StageStats(name) for name in STAGES}
+        self.started = time.perf_counter()
+
+    def record(self, name, seconds, bytes_in=0, bytes_out=0):
+        self.stats[name].add(seconds, bytes_in, bytes_out)
+
+    @contextmanager
+    def stage(self, name):
+        timing = Timing()
+        started = time.perf_counter()
+        try:
+            yield timing
+        finally:
+            seconds = time.perf_counter() - started
+            self.record(name, seconds, timing.bytes_in, timing.bytes_out)
+            complete(name, name, started, seconds, bytes_in=timing.bytes_in, bytes_out=timing.bytes_out)
+
+    def run(self, name, fn, data, *args, **kwargs):
+        """Returns fn(data, *args, **kwargs), timed as stage name."""
+        started = time.perf_counter()
+        result = fn(data, *args, **kwargs)
+        seconds = time.perf_counter() - started
+        bytes_in, bytes_out = size_of(data), size_of(result)
+        self.record(name, seconds, bytes_in, bytes_out)
+        complete(getattr(fn, '__name__', name), name, started, seconds, bytes_in=bytes_in, bytes_out=bytes_out)
+        return result
+
+    def as_dict(self):
+        return {name: stats.as_dict() for name, stats in self.stats.items()}
+
+    def merge(self, stats):
+        """Adds the stats of another Pipeline, given as its as_dict()."""
+        for name, s in stats.items():
+            self.stats[name].add(s['seconds'], s['bytes_in'], s['bytes_out'], s['calls'])
+
+    def report(self):
+        lines = [f"Stages for {self.target} ({time.perf_counter() - self.started:.2f} s wall):",
+                 f"  {'stage':<11} {'calls':>6} {'time':>9} {'in':>10} {'out':>10}"]
+        for name in STAGES:
+            s = self.stats[name]
+            if not s.calls:
+                continue
+            lines.append(f"  {name:<11} {s.calls:>6} {s.seconds * 1000:>7.0f}ms "
+                         f"{s.bytes_in // 1024:>7} KB {s.bytes_out // 1024:>7} KB")
+        return '\n'.join(lines)
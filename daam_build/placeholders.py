@@ -0,0 +1,126 @@
+import io
+import os
+import base64
+import tempfile
+from urllib.parse import quote
+
+from daam_build.asset_cache import get_cache
+from daam_build.dimensions import image_size
+from daam_build.embed import local_path
+from daam_build.images import RASTER_EXTS, Image, available
+
+# Configuration
+CACHE_DIR = '.build_cache/placeholders'
+PLACEHOLDER_WIDTH = 16          # px; the browser scales it up behind a blur
+PLACEHOLDER_QUALITY = 40
+MIN_BYTES = 32 * 1024           # smaller images (logos, icons) arrive fast enough as they are
+BLUR = 1                        # stdDeviation, in placeholder pixels
+
+
+def _thumbnail(path, cache_dir=CACHE_DIR):
+    """path shrunk to PLACEHOLDER_WIDTH as a WebP data URI, or "" when it
+    gets none (transparent images would show the blur through).
+
+    Cached on disk by content hash, so each image is decoded once.
+    """
+    digest = get_cache().digest(path)
+    cached = os.path.join(cache_dir, f"{digest}-w{PLACEHOLDER_WIDTH}-q{PLACEHOLDER_QUALITY}.txt")
+    try:
+        with open(cached, 'r', encoding='ascii') as f:
+            return f.read()
+    except OSError:
+        pass
+
+    uri = ""
+    with Image.open(path) as im:
+        if not ('A' in im.mode or 'transparency' in im.info):
+            im.draft('RGB', (PLACEHOLDER_WIDTH * 4, PLACEHOLDER_WIDTH * 4))
+            im = im.convert('RGB')
+            height = max(1, round(im.height * PLACEHOLDER_WIDTH / im.width))
+            im = im.resize((PLACEHOLDER_WIDTH, height), Image.LANCZOS)
+            buf = io.BytesIO()
+            im.save(buf, format='WEBP', quality=PLACEHOLDER_QUALITY, method=6)
+            uri = 'data:image/webp;base64,' + base64.b64encode(buf.getvalue()).decode('ascii')
+
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='ascii') as f:
+        f.write(uri)
+    os.replace(tmp, cached)
+    return uri
+
+
+def enable_placeholders():
+    """True when placeholders can be made; warns when Pillow is missing."""
+    if not available():
+        print("Warning: Pillow with WebP support is not installed; "
+              "images will load without placeholders.")
+        return False
+    return True
+
+
+class Placeholders:
+    """Shows a blurred preview of each content image until it is decoded.
+
+    A raster <img> of at least MIN_BYTES gets a placeholder of a few
+    hundred bytes: the image shrunk to PLACEHOLDER_WIDTH px, wrapped in an
+    SVG that blurs it and has the full image's intrinsic size.  By default
+    it becomes the <img>'s background, which the full image paints over
+    once decoded (decoding="async" keeps that off the main thread; pair
+    with ImageHints for lazy loading).  Builds that defer the full image
+    instead use uri() as its src until it is swapped in (see
+    daam_build.targets.spa).
+
+    Needs Pillow with WebP support; check enable_placeholders() first.
+    """
+
+    def __init__(self, base_dir='.', cache_dir=CACHE_DIR):
+        self.base_dir = base_dir
+        self.cache_dir = cache_dir
+        self.count = 0
+        self.bytes = 0
+
+    def uri(self, path):
+        """path's placeholder as an SVG data URI, or None if it gets none."""
+        if (not path or os.path.splitext(path)[1].lower() not in RASTER_EXTS
+                or not os.path.isfile(path) or os.path.getsize(path) < MIN_BYTES):
+            return None
+        size = image_size(path)
+        try:
+            thumbnail = _thumbnail(path, self.cache_dir)
+        except (OSError, ValueError) as e:
+            print(f"Warning: no placeholder for {path}: {e}")
+            return None
+        if not size or not thumbnail:
+            return None
+        width, height = size
+        svg = (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+               f'viewBox="0 0 {width} {height}" preserveAspectRatio="none">'
+               f'<filter id="b" color-interpolation-filters="sRGB"><feGaussianBlur stdDeviation="{BLUR * width / PLACEHOLDER_WIDTH:g}"/>'
+               f'<feComponentTransfer><feFuncA type="discrete" tableValues="1 1"/></feComponentTransfer></filter>'
+               f'<image width="100%" height="100%" preserveAspectRatio="none" filter="url(#b)" href="{thumbnail}"/></svg>')
+        uri = 'data:image/svg+xml,' + quote(svg, safe=' /=:;,+')
+        self.count += 1
+        self.bytes += len(uri)
+        return uri
+
+    def img(self, tag):
+        uri = self.uri(local_path(tag.get('src'), self.base_dir))
+        if uri is None:
+            return
+        # Ahead of any inline style, so the page's own background wins
+        style = tag.get('style') or ''
+        tag.set('style', f"background:url('{uri}') center/cover no-repeat;{style}")
+        if tag.get('decoding') is None:
+            tag.set('decoding', 'async')
+
+    def handlers(self, embed_img=None):
+        """HtmlRewriter handlers; embed_img(tag), if given, runs after the placeholder."""
+        def img(tag):
+            self.img(tag)
+            return embed_img(tag) if embed_img else None
+        return {'img': img}
+
+    def summary(self):
+        return f"Placeholders: {self.count} image(s), {self.bytes // 1024} KB of blurred previews."
+
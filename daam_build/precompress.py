@@ -0,0 +1,189 @@
+import os
+import gzip
+import json
+import shutil
+import tempfile
+
+from daam_build.asset_cache import file_digest
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; without it only .gz siblings are written
+    brotli = None
+
+# Configuration
+TEXT_EXTS = {'.html', '.css', '.js', '.json', '.svg', '.txt', '.xml'}
+MANIFEST_FILE = 'etags.json'
+# Outputs written next to the sources (spa, standalone) keep theirs here
+ROOT_MANIFEST = os.path.join('.build_cache', MANIFEST_FILE)
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+MIN_SAVING = 0.05           # keep a variant only if it is at least 5% smaller
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+
+def brotli_available():
+    return brotli is not None
+
+
+def manifest_path(root):
+    """Where the ETag manifest for the files under root lives: inside root
+    for an output folder, in the build cache when root is the source tree."""
+    if os.path.abspath(root) == os.path.abspath('.'):
+        return ROOT_MANIFEST
+    return os.path.join(root, MANIFEST_FILE)
+
+
+def _write_variant(path, target, encoding):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(target)), suffix='.tmp')
+    with open(path, 'rb') as src, os.fdopen(fd, 'wb') as raw:
+        if encoding == 'gzip':
+            # mtime=0 so the same input always gives the same bytes
+            with gzip.GzipFile(filename='', mode='wb', fileobj=raw, compresslevel=GZIP_LEVEL, mtime=0) as out:
+                shutil.copyfileobj(src, out, 1024 * 1024)
+        else:
+            compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            for chunk in iter(lambda: src.read(1024 * 1024), b''):
+                raw.write(compressor.process(chunk))
+            raw.write(compressor.finish())
+    os.replace(tmp, target)
+    return os.path.getsize(target)
+
+
+class Precompressor:
+    """Writes .gz (and, with Brotli installed, .br) siblings for text outputs,
+    plus an ETag manifest for a server to answer conditional requests.
+
+    The manifest (see manifest_path()) maps each output, relative to
+    root, to its content hash, size, mtime, the encodings tried and the
+    size of each variant kept; a server only trusts an entry whose size
+    and mtime still match the file.  A file whose hash is unchanged, whose
+    siblings still exist and that was already tried in every encoding
+    asked for is skipped, so rerunning after an incremental build only
+    compresses what was rebuilt (or everything, once, when --brotli is
+    added).  A variant that saves less than MIN_SAVING is deleted rather
+    than served, but still counts as tried.
+    """
+
+    def __init__(self, root, use_brotli=False):
+        self.root = root
+        self.encodings = ['gzip'] + (['br'] if use_brotli and brotli_available() else [])
+        self.path = manifest_path(root)
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self.written = 0
+
+    def _fresh(self, entry, digest, path):
+        if not entry or entry['etag'] != digest:
+            return False
+        if set(self.encodings) - set(entry.get('encodings', entry['variants'])):
+            return False
+        return all(os.path.exists(path + ENCODINGS[enc]) for enc in entry['variants'])
+
+    def add(self, path):
+        """Precompresses one file, if it is text; returns its manifest entry."""
+        if os.path.splitext(path)[1].lower() not in TEXT_EXTS:
+            return None
+        key = os.path.relpath(path, self.root).replace('\\', '/')
+        digest = file_digest(path)[:32]
+        st = os.stat(path)
+        size = st.st_size
+        entry = self.entries.get(key)
+        if self._fresh(entry, digest, path):
+            # Rewritten with the same content: the variants still hold
+            entry.update(size=size, mtime=st.st_mtime_ns)
+        else:
+            entry = {'etag': digest, 'size': size, 'mtime': st.st_mtime_ns,
+                     'encodings': list(self.encodings), 'variants': {}}
+            for encoding in self.encodings:
+                target = path + ENCODINGS[encoding]
+                packed = _write_variant(path, target, encoding)
+                if packed > size * (1 - MIN_SAVING):
+                    os.remove(target)
+                    continue
+                entry['variants'][encoding] = packed
+            self.written += 1
+        self.entries[key] = entry
+        self.raw_bytes += size
+        self.compressed_bytes += min(entry['variants'].values(), default=size)
+        return entry
+
+    def add_tree(self, folder=None):
+        """Precompresses every text file under folder (default: the root)."""
+        for dirpath, dirs, files in os.walk(folder or self.root):
+            dirs.sort()
+            for name in sorted(files):
+                if name != MANIFEST_FILE and not name.endswith(('.gz', '.br', '.tmp')):
+                    self.add(os.path.join(dirpath, name))
+
+    def forget(self, path):
+        """Drops path's siblings and entry; True if it had an entry."""
+        for ext in ENCODINGS.values():
+            if os.path.exists(path + ext):
+                os.remove(path + ext)
+        key = os.path.relpath(path, self.root).replace('\\', '/')
+        return self.entries.pop(key, None) is not None
+
+    def prune(self):
+        """Drops entries (and siblings) for files that no longer exist."""
+        for key in list(self.entries):
+            path = os.path.join(self.root, key)
+            if not os.path.exists(path):
+                for ext in ENCODINGS.values():
+                    if os.path.exists(path + ext):
+                        os.remove(path + ext)
+                del self.entries[key]
+
+    def save(self):
+        folder = os.path.dirname(self.path) or '.'
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def summary(self):
+        ratio = self.compressed_bytes / self.raw_bytes if self.raw_bytes else 0
+        return (f"Precompressed ({', '.join(self.encodings)}): {self.written} file(s) updated; "
+                f"{self.raw_bytes // 1024} KB served as {self.compressed_bytes // 1024} KB ({ratio:.0%})")
+
+
+def forget_outputs(root, paths):
+    """Called by a builder for the outputs under root it just rewrote:
+    their old siblings and ETags must not be served for the new content."""
+    pre = Precompressor(root)
+    forgotten = [pre.forget(path) for path in paths]
+    if any(forgotten):
+        pre.save()
+
+
+def precompress_outputs(root, paths=None, use_brotli=False, pipeline=None):
+    """The post-build stage: precompresses paths (default: everything under
+    root), updates root's manifest and prints a summary."""
+    if use_brotli and not brotli_available():
+        print("Warning: Brotli is not installed; writing .gz only.")
+    pre = Precompressor(root, use_brotli)
+
+    def run():
+        if paths is None:
+            pre.add_tree()
+        else:
+            for path in paths:
+                pre.add(path)
+        pre.prune()
+        pre.save()
+
+    if pipeline is None:
+        run()
+    else:
+        with pipeline.stage('precompress') as timing:
+            run()
+            timing.bytes_in = pre.raw_bytes
+            timing.bytes_out = pre.compressed_bytes
+    print(pre.summary())
+    return pre
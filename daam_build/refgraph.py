@@ -0,0 +1,280 @@
+"""The site's reference graph: which page or stylesheet uses which file.
+
+    python -m daam_build refs            broken references, orphaned and unused files
+    python -m daam_build refs --json     the same, machine-readable
+"""
+import os
+import sys
+import json
+import tempfile
+import argparse
+from collections import namedtuple
+
+from daam_build.asset_cache import get_cache
+from daam_build.embed import local_path, url_path
+from daam_build.pages import find_pages
+from daam_build.rewriter import HtmlRewriter, rewrite_css_urls
+
+# Configuration
+SOURCE_DIR = '.'
+CACHE_FILE = '.build_cache/refgraph.json'
+GRAPH_VERSION = 1
+# Folders whose files should all be used somewhere, and whether to look
+# into their subfolders
+AUDIT_DIRS = {'assets/images': False, 'assets/images/resource': True}
+
+# What a build reads from a page: everything but links to other pages
+INPUT_KINDS = ('img', 'stylesheet', 'script', 'url')
+
+Ref = namedtuple('Ref', 'kind url path exists')
+
+
+def page_refs(html):
+    """(kind, url) for every reference in an HTML page, in document order."""
+    refs = []
+
+    def add(kind, url):
+        if url_path(url) is not None:
+            refs.append((kind, url))
+
+    def link(tag):
+        rel = (tag.get('rel') or '').lower()
+        add('stylesheet' if rel == 'stylesheet' else 'link', tag.get('href'))
+
+    def css_url(url):
+        add('url', url)
+        return None
+
+    HtmlRewriter({
+        'img': lambda tag: add('img', tag.get('src')),
+        'script': lambda tag: add('script', tag.get('src')),
+        'link': link,
+        'a': lambda tag: add('page', tag.get('href')),
+    }, css_url=css_url).rewrite(html)
+    return refs
+
+
+def css_refs(css):
+    """(kind, url) for every url() in a stylesheet."""
+    refs = []
+
+    def css_url(url):
+        if url_path(url) is not None:
+            refs.append(('url', url))
+        return None
+    rewrite_css_urls(css, css_url)
+    return refs
+
+
+class RefGraph:
+    """One crawl of every page and the stylesheets they link.
+
+    Each document's references are stored resolved against it, so a
+    builder asks the graph instead of joining, normalizing and statting
+    paths itself.  The crawl is cached in CACHE_FILE: a page or
+    stylesheet is only parsed again when its mtime or size changes, and
+    every referenced file is statted once per load, however many pages
+    use it.  Paths are relative to source_dir, with forward slashes.
+    """
+
+    def __init__(self, source_dir=SOURCE_DIR, cache_file=CACHE_FILE):
+        self.source_dir = source_dir
+        self.cache_file = cache_file
+        self.docs = {}          # rel path -> {'kind', 'mtime', 'size', 'refs': [[kind, url, path]]}
+        self.files = {}         # rel path -> (exists, size, mtime_ns)
+        self._load()
+        self.refresh()
+
+    # -- paths ---------------------------------------------------------------
+
+    def rel(self, path):
+        return os.path.relpath(os.path.abspath(path), os.path.abspath(self.source_dir)).replace('\\', '/')
+
+    def full(self, rel):
+        return os.path.normpath(os.path.join(self.source_dir, rel))
+
+    def resolve(self, url, doc):
+        """The rel path url points at from document doc, or None."""
+        path = local_path(url, os.path.dirname(doc) or '.', '.')
+        return path.replace('\\', '/') if path is not None else None
+
+    # -- crawl ---------------------------------------------------------------
+
+    def _load(self):
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == GRAPH_VERSION and data.get('source_dir') == os.path.abspath(self.source_dir):
+            self.docs = data['docs']
+
+    def _stat(self, rel):
+        if rel not in self.files:
+            try:
+                st = os.stat(self.full(rel))
+                self.files[rel] = (os.path.isfile(self.full(rel)), st.st_size, st.st_mtime_ns)
+            except OSError:
+                self.files[rel] = (False, None, None)
+        return self.files[rel]
+
+    def _crawl(self, rel, kind):
+        """Parses document rel unless its cached entry is still current."""
+        exists, size, mtime = self._stat(rel)
+        if not exists:
+            return None
+        entry = self.docs.get(rel)
+        if entry and entry['kind'] == kind and entry['mtime'] == mtime and entry['size'] == size:
+            return entry, False
+        try:
+            with open(self.full(rel), 'r', encoding='utf-8') as f:
+                text = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Warning: could not read {rel}: {e}")
+            return None
+        refs = page_refs(text) if kind == 'page' else css_refs(text)
+        entry = {'kind': kind, 'mtime': mtime, 'size': size,
+                 'refs': [[k, url, self.resolve(url, rel)] for k, url in refs]}
+        self.docs[rel] = entry
+        return entry, True
+
+    def refresh(self):
+        """Re-crawls whatever changed on disk since the graph was built."""
+        self.files = {}
+        changed = False
+        seen = set()
+        queue = [(self.rel(full), 'page') for full, _ in find_pages(self.source_dir)]
+        while queue:
+            rel, kind = queue.pop(0)
+            if rel in seen:
+                continue
+            seen.add(rel)
+            crawled = self._crawl(rel, kind)
+            if crawled is None:
+                changed = self.docs.pop(rel, None) is not None or changed
+                continue
+            entry, parsed = crawled
+            changed = changed or parsed
+            for ref_kind, _, path in entry['refs']:
+                if ref_kind == 'stylesheet' and path.endswith('.css'):
+                    queue.append((path, 'css'))
+        stale = set(self.docs) - seen
+        for rel in stale:
+            del self.docs[rel]
+        if changed or stale:
+            self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.cache_file), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'version': GRAPH_VERSION, 'source_dir': os.path.abspath(self.source_dir),
+                       'docs': self.docs}, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.cache_file)
+
+    # -- queries ---------------------------------------------------------------
+
+    def exists(self, path):
+        """Whether path (any path, relative to the working directory) is a file."""
+        return self._stat(self.rel(path))[0]
+
+    def digest(self, path):
+        """The content hash of path, through the shared asset cache; None if missing."""
+        return get_cache().digest(os.path.abspath(path)) if self.exists(path) else None
+
+    def refs(self, doc, kinds=None):
+        """The Refs of a page or stylesheet (a path), in document order."""
+        entry = self.docs.get(self.rel(doc))
+        if entry is None:
+            return []
+        return [Ref(kind, url, self.full(path), self._stat(path)[0])
+                for kind, url, path in entry['refs'] if kinds is None or kind in kinds]
+
+    def inputs(self, page):
+        """Every file a build of page reads: the page, its images, CSS and
+        JS, and the url()s inside its stylesheets."""
+        inputs = [page]
+        for ref in self.refs(page, INPUT_KINDS):
+            inputs.append(ref.path)
+            if ref.kind == 'stylesheet':
+                inputs.extend(r.path for r in self.refs(ref.path))
+        return inputs
+
+    def assets(self, page):
+        """The existing images a page embeds, directly or through its CSS."""
+        paths = []
+        for ref in self.refs(page, ('img', 'url', 'stylesheet')):
+            if ref.kind == 'stylesheet':
+                paths.extend(r.path for r in self.refs(ref.path) if r.exists)
+            elif ref.exists:
+                paths.append(ref.path)
+        return paths
+
+    def broken(self, doc=None):
+        """(document, Ref) for every reference to a missing file."""
+        docs = [self.rel(doc)] if doc is not None else sorted(self.docs)
+        return [(rel, ref) for rel in docs for ref in self.refs(self.full(rel)) if not ref.exists]
+
+    def used(self):
+        """Rel paths of every file some page or stylesheet references."""
+        return {path for entry in self.docs.values() for _, _, path in entry['refs'] if path}
+
+    def unused(self, folder, recursive=False):
+        """Files in folder (rel) that nothing references."""
+        used = self.used()
+        found = []
+        for root, dirs, files in os.walk(self.full(folder)):
+            if not recursive:
+                dirs[:] = []
+            dirs.sort()
+            found.extend(self.rel(os.path.join(root, name)) for name in sorted(files))
+        return [rel for rel in found if rel not in used]
+
+    def warn_broken(self, doc, label=None):
+        """Prints a warning, naming the referring document, for each broken ref."""
+        for _, ref in self.broken(doc):
+            print(f"Warning: {label or self.rel(doc)} references missing {ref.url} ({ref.kind})")
+
+
+_default_graph = None
+
+
+def get_graph(source_dir=SOURCE_DIR):
+    """Returns the process-wide RefGraph, refreshed on first use."""
+    global _default_graph
+    if _default_graph is None or _default_graph.source_dir != source_dir:
+        _default_graph = RefGraph(source_dir)
+    return _default_graph
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m daam_build refs', description=__doc__.split('\n')[0])
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    graph = get_graph()
+    broken = [{'document': doc, 'kind': ref.kind, 'url': ref.url} for doc, ref in graph.broken()]
+    unused = {folder: graph.unused(folder, recursive) for folder, recursive in AUDIT_DIRS.items()}
+    if args.json:
+        print(json.dumps({'documents': len(graph.docs), 'broken': broken, 'unused': unused},
+                         indent=1, ensure_ascii=False))
+        return 1 if broken else 0
+
+    pages = sum(1 for entry in graph.docs.values() if entry['kind'] == 'page')
+    print(f"{pages} page(s), {len(graph.docs) - pages} stylesheet(s), "
+          f"{len(graph.used())} referenced file(s).")
+    print(f"\n{len(broken)} broken reference(s):")
+    for b in broken:
+        print(f"  {b['document']}: {b['url']} ({b['kind']})")
+    for folder, files in unused.items():
+        print(f"\n{len(files)} unreferenced file(s) in {folder}{'/' if not AUDIT_DIRS[folder] else '/**'}:")
+        for rel in files:
+            print(f"  {rel}")
+    return 1 if broken else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
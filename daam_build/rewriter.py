@@ -0,0 +1,159 @@
+import re
+
+from daam_build.tracing import span
+
+# One token per match: a comment, a raw-text element (<script>/<style> with its
+# content), or a start tag.  Text and end tags fall between matches and are
+# copied through untouched.
+TOKEN_PATTERN = re.compile(r'''
+    <!--.*?-->
+  | <(?P<raw>script|style)\b(?P<raw_attrs>(?:"[^"]*"|'[^']*'|[^'">])*)>(?P<content>.*?)(?P<end></(?P=raw)\s*>)
+  | <(?P<name>[a-zA-Z][\w:-]*)(?P<attrs>(?:"[^"]*"|'[^']*'|[^'">])*)>
+''', re.DOTALL | re.IGNORECASE | re.VERBOSE)
+
+ATTR_PATTERN = re.compile(r'''(\s*)([^\s"'>/=]+)(?:(\s*=\s*)("[^"]*"|'[^']*'|[^\s"'=<>`]+))?''')
+
+CSS_URL_PATTERN = re.compile(r'url\s*\([\'"]?([^\'"\)]+)[\'"]?\)')
+
+
+def is_local(url):
+    return not (url.startswith('http') or url.startswith('data:') or url.startswith('#'))
+
+
+def rewrite_css_urls(css, on_url):
+    """Rewrites every url(...) in css in one pass.
+
+    on_url(url) returns the text that replaces the whole url(...) token,
+    e.g. 'url("data:...")' or 'var(--asset-x)', or None to leave it as is.
+    """
+    def repl(m):
+        new = on_url(m.group(1))
+        return m.group(0) if new is None else new
+    with span('rewrite_css_urls', 'rewrite', bytes=len(css)):
+        return CSS_URL_PATTERN.sub(repl, css)
+
+
+class Tag:
+    """A start tag whose attributes can be read and edited in place.
+
+    Untouched tags render exactly as they appeared in the source.
+    """
+
+    def __init__(self, name, attr_text, content=None):
+        self.name = name.lower()
+        self.content = content      # inner text of <script>/<style>, else None
+        self._attr_text = attr_text
+        self._attrs = None
+        self._tail = ''
+        self.dirty = False
+
+    def _parse(self):
+        if self._attrs is None:
+            self._attrs = []
+            pos = 0
+            for m in ATTR_PATTERN.finditer(self._attr_text):
+                if not m.group(2):
+                    break
+                self._attrs.append([m.group(1), m.group(2), m.group(3), m.group(4)])
+                pos = m.end()
+            self._tail = self._attr_text[pos:]
+        return self._attrs
+
+    def _find(self, name):
+        for attr in self._parse():
+            if attr[1].lower() == name:
+                return attr
+        return None
+
+    def get(self, name, default=None):
+        attr = self._find(name)
+        if attr is None:
+            return default
+        value = attr[3] or ''
+        if value[:1] in ('"', "'"):
+            value = value[1:-1]
+        return value
+
+    def set(self, name, value):
+        attr = self._find(name)
+        if attr is None:
+            self._attrs.append([' ', name, '=', None])
+            attr = self._attrs[-1]
+        attr[2] = attr[2] or '='
+        quote = "'" if '"' in value else '"'
+        attr[3] = f'{quote}{value}{quote}'
+        self.dirty = True
+
+    def remove(self, name):
+        attr = self._find(name)
+        if attr is not None:
+            self._attrs.remove(attr)
+            self.dirty = True
+
+    def render(self):
+        if not self.dirty:
+            return f'<{self.name}{self._attr_text}>'
+        attrs = ''.join(f"{ws or ' '}{name}{eq or ''}{value or ''}"
+                        for ws, name, eq, value in self._attrs)
+        return f'<{self.name}{attrs}{self._tail}>'
+
+
+class HtmlRewriter:
+    """Applies every rewrite rule to a document in a single scan.
+
+    handlers maps a tag name to fn(tag).  A handler edits the Tag in place
+    and returns None, or returns a string that replaces the whole tag (for
+    <script>/<style>, the whole element).  css_url, if given, is applied
+    to url()s in style attributes and <style> elements.
+
+    Output is assembled from slices of the source plus replacements, so
+    inserted data (e.g. base64) is never scanned again.
+    """
+
+    def __init__(self, handlers=None, css_url=None):
+        self.handlers = handlers or {}
+        self.css_url = css_url
+
+    def rewrite(self, html):
+        with span('HtmlRewriter', 'rewrite', bytes=len(html)):
+            out = []
+            pos = 0
+            for m in TOKEN_PATTERN.finditer(html):
+                replacement = self._token(m)
+                if replacement is None:
+                    continue
+                out.append(html[pos:m.start()])
+                out.append(replacement)
+                pos = m.end()
+            out.append(html[pos:])
+            return ''.join(out)
+
+    def _token(self, m):
+        """Returns the rewritten token, or None to keep it verbatim."""
+        if m.group('raw'):
+            tag = Tag(m.group('raw'), m.group('raw_attrs'), m.group('content'))
+        elif m.group('name'):
+            tag = Tag(m.group('name'), m.group('attrs'))
+        else:
+            return None  # comment
+
+        handler = self.handlers.get(tag.name)
+        if handler is not None:
+            replacement = handler(tag)
+            if replacement is not None:
+                return replacement
+
+        content_changed = False
+        if self.css_url is not None:
+            style = tag.get('style') if 'style' in tag._attr_text.lower() else None
+            if style and 'url' in style:
+                tag.set('style', rewrite_css_urls(style, self.css_url))
+            if tag.name == 'style' and tag.content and 'url' in tag.content:
+                tag.content = rewrite_css_urls(tag.content, self.css_url)
+                content_changed = True
+
+        if not tag.dirty and not content_changed:
+            return None
+        if tag.content is None:
+            return tag.render()
+        return tag.render() + tag.content + m.group('end')
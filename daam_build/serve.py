@@ -0,0 +1,157 @@
+import os
+import re
+import sys
+import json
+import argparse
+import mimetypes
+from urllib.parse import unquote, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from daam_build.precompress import ENCODINGS, manifest_path
+
+# Configuration
+HASHED_NAME = re.compile(r'\.[0-9a-f]{8}\.\w+$')    # see daam_build.linked
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+
+def accepted_encodings(header):
+    """The codings an Accept-Encoding header allows, ignoring q=0 ones."""
+    accepted = set()
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        q = re.search(r'q\s*=\s*([0-9.]+)', params)
+        if coding and not (q and float(q.group(1)) == 0):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def etag_matches(header, etag):
+    """Whether an If-None-Match header covers etag: "*", or any listed
+    tag, compared weakly (a W/ prefix is ignored) as RFC 9110 asks."""
+    for tag in (header or '').split(','):
+        tag = tag.strip()
+        if tag == '*' or (tag[2:] if tag.startswith('W/') else tag) == etag:
+            return True
+    return False
+
+
+class StaticSite:
+    """A built folder plus its ETag manifest (see daam_build.precompress).
+
+    Files missing from the manifest, or changed since it was written
+    (their size or mtime no longer match), still get an ETag, from size
+    and mtime, but are always sent uncompressed.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self._manifest = None
+        self._manifest_mtime = None
+
+    def manifest(self):
+        """The ETag manifest, reread whenever a build rewrites it."""
+        path = manifest_path(self.root)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return {}
+        if mtime != self._manifest_mtime:
+            with open(path, 'r', encoding='utf-8') as f:
+                self._manifest = json.load(f)
+            self._manifest_mtime = mtime
+        return self._manifest
+
+    def resolve(self, url_path):
+        """Maps a URL path to (file path, manifest key), or None."""
+        rel = unquote(url_path).lstrip('/')
+        if rel == '' or rel.endswith('/'):
+            rel += 'index.html'
+        full = os.path.abspath(os.path.join(self.root, rel))
+        if not full.startswith(self.root + os.sep) or not os.path.isfile(full):
+            return None
+        return full, os.path.relpath(full, self.root).replace('\\', '/')
+
+    def choose(self, full, key, accept_encoding):
+        """Returns (path to send, Content-Encoding or None, ETag)."""
+        entry = self.manifest().get(key)
+        st = os.stat(full)
+        if entry is None or entry['size'] != st.st_size or entry.get('mtime') != st.st_mtime_ns:
+            return full, None, f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+        accepted = accepted_encodings(accept_encoding)
+        for encoding in ENCODINGS:
+            variant = full + ENCODINGS[encoding]
+            if encoding in entry['variants'] and encoding in accepted and os.path.exists(variant):
+                return variant, encoding, f'"{entry["etag"]}-{encoding}"'
+        return full, None, f'"{entry["etag"]}"'
+
+
+def make_handler(site):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_HEAD(self):
+            self.respond(send_body=False)
+
+        def do_GET(self):
+            self.respond(send_body=True)
+
+        def respond(self, send_body):
+            found = site.resolve(urlsplit(self.path).path)
+            if found is None:
+                return self.send_error(404)
+            full, key = found
+            path, encoding, etag = site.choose(full, key, self.headers.get('Accept-Encoding'))
+            cache_control = IMMUTABLE if HASHED_NAME.search(full) else REVALIDATE
+
+            if etag_matches(self.headers.get('If-None-Match'), etag):
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', cache_control)
+                self.send_header('Vary', 'Accept-Encoding')
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', mimetypes.guess_type(full)[0] or 'application/octet-stream')
+            self.send_header('Content-Length', str(os.path.getsize(path)))
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', cache_control)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            if send_body:
+                with open(path, 'rb') as f:
+                    while chunk := f.read(1024 * 1024):
+                        self.wfile.write(chunk)
+
+    return Handler
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m daam_build serve',
+                                     description="Serve a built folder with precompressed variants and ETags.")
+    parser.add_argument('root', nargs='?', default='daam_offline_site', help="folder to serve")
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--host', default='127.0.0.1')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(StaticSite(args.root)))
+    server.daemon_threads = True
+    print(f"Serving {args.root} on http://{args.host}:{args.port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+import os
+import re
+import time
+
+from daam_build.asset_cache import get_cache
+from daam_build.pipeline import size_of
+from daam_build.tracing import complete
+
+PLACEHOLDER = '@@DAAM_ASSET_{}@@'
+PLACEHOLDER_PATTERN = re.compile(r'@@DAAM_ASSET_(\d+)@@')
+
+
+class StreamWriter:
+    """Writes a single-file build straight to disk, in document order.
+
+    The rewrite passes call asset_ref() instead of file_to_base64(); it
+    returns a short placeholder rather than the data URI.  write() swaps
+    each placeholder for the real data URI as it goes out, streaming the
+    base64 from the asset cache, so no page or asset is ever held in memory
+    as one large string.
+
+    With a pipeline (see daam_build.pipeline), expanding data URIs is
+    timed as its 'embed' stage and the rest of the output as 'write'.
+    """
+
+    def __init__(self, path, cache=None, pipeline=None):
+        self.path = path
+        self.cache = cache or get_cache()
+        self.pipeline = pipeline
+        self.assets = []
+        self._ids = {}
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'w', encoding='utf-8')
+        return self
+
+    def __exit__(self, *exc):
+        self._file.close()
+
+    def asset_ref(self, path):
+        """Returns a placeholder for path's data URI, or "" if it is missing.
+
+        Missing files are not reported here: builders warn about them up
+        front, naming the page, from the reference graph.
+        """
+        if not os.path.isfile(path):
+            return ""
+        path = os.path.abspath(path)
+        if path not in self._ids:
+            self._ids[path] = len(self.assets)
+            self.assets.append(path)
+        return PLACEHOLDER.format(self._ids[path])
+
+    def uri_length(self, ref):
+        return self.cache.uri_length(self.assets[int(PLACEHOLDER_PATTERN.fullmatch(ref).group(1))])
+
+    def write(self, text):
+        started = time.perf_counter()
+        embedding = 0.0
+        pos = 0
+        for m in PLACEHOLDER_PATTERN.finditer(text):
+            self._file.write(text[pos:m.start()])
+            embedding += self._embed(self.assets[int(m.group(1))])
+            pos = m.end()
+        self._file.write(text[pos:])
+        size = size_of(text)
+        if self.pipeline is not None:
+            self.pipeline.record('write', time.perf_counter() - started - embedding, size, size)
+        complete(os.path.basename(self.path), 'write', started, time.perf_counter() - started,
+                 path=self.path, bytes=size, embedded_seconds=embedding)
+
+    def _embed(self, path):
+        """Streams path's data URI out; returns the seconds it took."""
+        started = time.perf_counter()
+        self.cache.write_data_uri(path, self._file)
+        seconds = time.perf_counter() - started
+        if self.pipeline is not None:
+            self.pipeline.record('embed', seconds, os.path.getsize(self.cache.source_for(path)),
+                                 self.cache.uri_length(path))
+        complete(os.path.basename(path), 'embed', started, seconds, path=path)
+        return seconds
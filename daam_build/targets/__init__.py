@@ -0,0 +1 @@
+"""The outputs daam_build can produce; each module has main(argv)."""
@@ -0,0 +1,349 @@
+import os
+import sys
+import shutil
+import argparse
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from daam_build.asset_cache import get_cache
+from daam_build.budget import BUDGET_FILE, report_build
+from daam_build.css import page_tokens
+from daam_build.dimensions import ImageHints
+from daam_build.embed import embed_all, local_path, read_stylesheet
+from daam_build.icons import IconSprite
+from daam_build.placeholders import Placeholders, enable_placeholders
+from daam_build.images import enable_optimization
+from daam_build.linked import AssetManifest, LinkedAssets
+from daam_build.manifest import BuildManifest, toolchain_files
+from daam_build.pages import find_pages
+from daam_build.precompress import forget_outputs, precompress_outputs
+from daam_build.pipeline import Pipeline
+from daam_build.refgraph import css_refs, get_graph
+from daam_build.rewriter import HtmlRewriter, rewrite_css_urls
+from daam_build.stream import StreamWriter
+from daam_build.tracing import TRACE_DIR, Profiling, add_events, span, start_tracing, take_events
+
+# Configuration
+SOURCE_DIR = '.'
+OUTPUT_DIR = 'daam_offline_site'
+LINKED_OUTPUT_DIR = 'daam_linked_site'
+
+
+def link_all(html_content, base_dir, page_out_dir, linked, tokens=None, hints=None, icons=None,
+             placeholders=None):
+    """Points every local asset reference at its content-hashed copy.
+
+    Images, icons and scripts are published as they are (optimized images
+    also as a <picture> of resized variants); stylesheets are pruned
+    (with tokens) and have their url()s linked first, so the hash covers
+    the final CSS.  hints (an ImageHints) sees each <img> first;
+    icons (a scanned IconSprite) replaces the Font Awesome webfont, and
+    placeholders (a Placeholders) gives large images a blurred preview.
+    """
+    def existing_path(url, from_dir):
+        path = local_path(url, from_dir)
+        return path if path and get_graph().exists(path) else None
+
+    def link_asset(url, from_dir, out_dir):
+        path = existing_path(url, from_dir)
+        return linked.url(linked.copy(path), out_dir) if path else None
+
+    def link_attr(tag, attr):
+        url = link_asset(tag.get(attr), base_dir, page_out_dir)
+        if url:
+            tag.set(attr, url)
+
+    def link_img(tag):
+        path = existing_path(tag.get('src'), base_dir)
+        if not path:
+            return None
+        sources = linked.picture_sources(path, page_out_dir)
+        # Inside a <picture> the <img> is the fallback for browsers that
+        # take none of the sources, so it keeps the original format
+        tag.set('src', linked.url(linked.copy(path, optimized=not sources), page_out_dir))
+        return f'<picture>{sources}{tag.render()}</picture>' if sources else None
+
+    def link_stylesheet(tag):
+        path = existing_path(tag.get('href'), base_dir)
+        if (tag.get('rel') or '').lower() != 'stylesheet':
+            return link_attr(tag, 'href')
+        if not path:
+            return None
+        css_content = read_stylesheet(path, tokens)
+        css_dir = os.path.dirname(path)
+        css_out_dir = os.path.join(linked.out_dir, os.path.relpath(css_dir, SOURCE_DIR))
+
+        def css_url(url):
+            new = link_asset(url, css_dir, css_out_dir)
+            return f'url("{new}")' if new else None
+
+        css_content = rewrite_css_urls(css_content, css_url)
+        tag.set('href', linked.url(linked.write_text(path, css_content), page_out_dir))
+
+    def style_url(url):
+        new = link_asset(url, base_dir, page_out_dir)
+        return f'url("{new}")' if new else None
+
+    handlers = {
+        'img': link_img,
+        'link': link_stylesheet,
+        'script': lambda tag: link_attr(tag, 'src'),
+    }
+    if hints is not None:
+        handlers.update(hints.handlers(handlers['img']))
+    if placeholders is not None:
+        handlers.update(placeholders.handlers(handlers['img']))
+    if icons is not None:
+        handlers.update(icons.handlers(link_stylesheet))
+    return HtmlRewriter(handlers, css_url=style_url).rewrite(html_content)
+
+def referenced_assets(file_path, tokens=None):
+    """Lists the local images a page embeds, directly or through its CSS.
+
+    With tokens, a stylesheet's url()s only count if their rule survives
+    pruning.
+    """
+    graph = get_graph()
+    if tokens is None:
+        return graph.assets(file_path)
+    paths = [ref.path for ref in graph.refs(file_path, ('img', 'url')) if ref.exists]
+    for sheet in graph.refs(file_path, ('stylesheet',)):
+        if not sheet.exists:
+            continue
+        kept = {url for _, url in css_refs(read_stylesheet(sheet.path, tokens))}
+        paths.extend(ref.path for ref in graph.refs(sheet.path) if ref.exists and ref.url in kept)
+    return paths
+
+def page_inputs(file_path):
+    """Every file an output page is built from: the page, its CSS, JS and images."""
+    return get_graph().inputs(file_path) + toolchain_files(__file__)
+
+def read_source(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def process_file(file_path, rel_path, pipeline, prune=False, linked=False,
+                 image_hints=False, hero_priority=False, icons=None, placeholders=False):
+    """Builds one page; returns the assets it published (linked builds only).
+
+    icons, if given, is a fresh IconSprite for this page.
+    """
+    html = pipeline.run('load', read_source, file_path)
+    base_dir = os.path.dirname(file_path)
+    tokens = pipeline.run('transform', page_tokens, html, base_dir) if prune else None
+    hints = ImageHints(base_dir, hero_priority) if image_hints else None
+    if icons is not None:
+        icons.scan(html)
+    placeholders = Placeholders(base_dir) if placeholders else None
+
+    if linked:
+        out_path = os.path.join(LINKED_OUTPUT_DIR, rel_path)
+        assets = LinkedAssets(SOURCE_DIR, LINKED_OUTPUT_DIR)
+        html = pipeline.run('rewrite', link_all, html, base_dir, os.path.dirname(out_path), assets,
+                            tokens, hints, icons, placeholders)
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        with StreamWriter(out_path, pipeline=pipeline) as out:
+            out.write(html)
+        return assets.published
+
+    # Read and encode this page's assets concurrently before the rewrite pass
+    with pipeline.stage('embed'):
+        get_cache().prefetch(referenced_assets(file_path, tokens))
+
+    out_path = os.path.join(OUTPUT_DIR, rel_path)
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with StreamWriter(out_path, pipeline=pipeline) as out:
+        html = pipeline.run('rewrite', embed_all, html, base_dir, out.asset_ref, tokens, hints, icons,
+                            placeholders)
+        out.write(html)
+    return {}
+
+# icons is (used, missing) of the page's IconSprite, or None
+PageResult = namedtuple('PageResult', 'rel_path error savings published stages events icons')
+
+def build_page(file_path, rel_path, prune=False, linked=False, image_hints=False, hero_priority=False,
+               icon_sprite=False, placeholders=False):
+    """Builds one page and returns its PageResult.  Errors are reported, not
+    raised, so one broken page does not stop a parallel build."""
+    pipeline = Pipeline('site')
+    published = {}
+    icons = IconSprite() if icon_sprite else None
+    try:
+        with span(rel_path, 'page'):
+            published = process_file(file_path, rel_path, pipeline, prune, linked,
+                                     image_hints, hero_priority, icons, placeholders)
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    # Pool workers never run exit handlers, so the index is saved per page
+    get_cache().save_index()
+    optimizer = get_cache().optimizer
+    savings = dict(optimizer.savings) if optimizer else {}
+    icon_use = (icons.used, icons.missing) if icons is not None else None
+    return PageResult(rel_path, error, savings, published, pipeline.as_dict(), take_events(), icon_use)
+
+def init_worker(optimize_images, avif, trace=False):
+    """Gives each worker process the parent's image and tracing settings."""
+    if optimize_images and get_cache().optimizer is None:
+        enable_optimization(avif)
+    if trace:
+        start_tracing()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m daam_build site',
+                                     description="Build the self-contained offline site.")
+    parser.add_argument('--optimize-images', action='store_true',
+                        help="embed downscaled WebP variants of raster images (needs Pillow)")
+    parser.add_argument('--avif', action='store_true',
+                        help="also try AVIF when optimizing images")
+    parser.add_argument('--prune-css', action='store_true',
+                        help="drop CSS rules that match nothing on the page, and minify the rest")
+    parser.add_argument('--image-hints', action='store_true',
+                        help="add width/height to images, and lazy loading below each page's hero")
+    parser.add_argument('--hero-priority', action='store_true',
+                        help="with --image-hints, fetch each page's hero image first")
+    parser.add_argument('--placeholders', action='store_true',
+                        help="show a blurred preview of each large image until it has loaded (needs Pillow)")
+    parser.add_argument('--icon-sprite', action='store_true',
+                        help="draw Font Awesome icons from an inline SVG sprite instead of the CDN webfont")
+    parser.add_argument('--linked', action='store_true',
+                        help=f"write {LINKED_OUTPUT_DIR}, linking content-hashed shared asset files "
+                             "instead of embedding them in every page")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="pages to build in parallel (0 = one per CPU core)")
+    parser.add_argument('--precompress', action='store_true',
+                        help="write .gz siblings and an ETag manifest for serving")
+    parser.add_argument('--brotli', action='store_true',
+                        help="with --precompress, also write .br siblings (needs brotli)")
+    parser.add_argument('--budgets', default=BUDGET_FILE,
+                        help=f"size budgets to check the output against (default: {BUDGET_FILE})")
+    parser.add_argument('--profile', action='store_true',
+                        help=f"write a Chrome/Perfetto trace of the build to {TRACE_DIR}/")
+    parser.add_argument('--cprofile', action='store_true',
+                        help="also profile the build with cProfile and list the hottest functions")
+    parser.add_argument('--clean', action='store_true',
+                        help="delete the output folder and rebuild every page")
+    return parser.parse_args(argv)
+
+def build(args):
+    """Runs the build parse_args(argv) describes; returns the exit code."""
+    optimizer = enable_optimization(args.avif) if args.optimize_images else None
+    pipeline = Pipeline('site')
+
+    out_dir = LINKED_OUTPUT_DIR if args.linked else OUTPUT_DIR
+    manifest = BuildManifest('linked_site' if args.linked else 'full_site')
+    options = {'optimize_images': args.optimize_images, 'avif': args.avif, 'prune_css': args.prune_css,
+               'image_hints': args.image_hints, 'hero_priority': args.hero_priority,
+               'placeholders': args.placeholders, 'icon_sprite': args.icon_sprite}
+    if args.clean and os.path.exists(out_dir):
+        print(f"Cleaning existing {out_dir}...")
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    assets = AssetManifest(out_dir) if args.linked else None
+
+    # Drop outputs whose source page has been deleted
+    all_pages = find_pages(SOURCE_DIR)
+    expected = {os.path.join(out_dir, rel_path) for _, rel_path in all_pages}
+    for output in manifest.outputs():
+        if output not in expected:
+            print(f"Removing stale {output}...")
+            if os.path.exists(output):
+                os.remove(output)
+            manifest.forget(output)
+            if assets:
+                assets.forget(os.path.relpath(output, out_dir).replace('\\', '/'))
+
+    # Only rebuild pages whose inputs changed since the last build
+    pages = []
+    inputs = {}
+    for full_path, rel_path in all_pages:
+        out_path = os.path.join(out_dir, rel_path)
+        inputs[rel_path] = page_inputs(full_path)
+        if manifest.is_fresh(out_path, inputs[rel_path], options):
+            continue
+        pages.append((full_path, rel_path))
+    print(f"{len(pages)} of {len(all_pages)} page(s) need rebuilding.")
+    for full_path, rel_path in pages:
+        get_graph().warn_broken(full_path, rel_path)
+
+    placeholders = args.placeholders and enable_placeholders()
+    jobs = args.jobs or os.cpu_count() or 1
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                                 initargs=(args.optimize_images, args.avif, args.profile)) as pool:
+            futures = [pool.submit(build_page, *page, args.prune_css, args.linked,
+                                   args.image_hints, args.hero_priority, args.icon_sprite,
+                                   placeholders)
+                       for page in pages]
+            # Report in page order, not completion order, so logs are stable
+            results = []
+            for future in futures:
+                results.append(future.result())
+                print(f"Processing {results[-1].rel_path}...")
+    else:
+        results = []
+        for page in pages:
+            print(f"Processing {page[1]}...")
+            results.append(build_page(*page, args.prune_css, args.linked,
+                                      args.image_hints, args.hero_priority, args.icon_sprite,
+                                      placeholders))
+
+    failures = [(r.rel_path, r.error) for r in results if r.error]
+    for r in results:
+        out_path = os.path.join(out_dir, r.rel_path)
+        pipeline.merge(r.stages)
+        add_events(r.events)
+        if r.error:
+            manifest.forget(out_path)
+        else:
+            manifest.record(out_path, inputs[r.rel_path], options)
+            if assets:
+                assets.record(r.rel_path.replace('\\', '/'), r.published)
+    manifest.save()
+    # Rebuilt pages must not be served from their old .gz/.br siblings
+    forget_outputs(out_dir, [os.path.join(out_dir, r.rel_path) for r in results])
+    removed = 0
+    if assets:
+        removed = assets.collect()
+        assets.save()
+    savings = {}
+    icons = IconSprite() if args.icon_sprite else None
+    for r in results:
+        savings.update(r.savings)
+        if icons is not None and r.icons is not None:
+            icons.merge(*r.icons)
+    if args.precompress:
+        # Covers every output, not just the rebuilt pages: unchanged files are skipped by hash
+        precompress_outputs(out_dir, use_brotli=args.brotli, pipeline=pipeline)
+
+    print("\n-----------------------------------------------------------")
+    print(f"Build Complete! The website is ready in '{out_dir}' folder.")
+    print("You can zip this folder and send it to anyone.")
+    print("All links between pages (e.g. href='about.html') will work.")
+    if assets:
+        print(f"Assets are shared, content-hashed files listed in {assets.path}"
+              f" ({len(assets.assets)} files, {removed} unused removed).")
+    else:
+        print("All media is embedded.")
+    if optimizer:
+        print(f"Image optimization saved {sum(savings.values()) // 1024} KB before encoding.")
+    if icons is not None and results:
+        print(icons.summary())
+    print(pipeline.report())
+    print("-----------------------------------------------------------")
+    over_budget = report_build('linked_site' if args.linked else 'site', out_dir, args.budgets)
+
+    if failures:
+        print(f"\n{len(failures)} page(s) failed:")
+        for rel_path, error in failures:
+            print(f"  {rel_path}: {error}")
+        return 1
+    return over_budget
+
+def main(argv=None):
+    args = parse_args(argv)
+    with Profiling('linked_site' if args.linked else 'site', args.profile, args.cprofile):
+        return build(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
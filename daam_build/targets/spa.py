@@ -0,0 +1,516 @@
+import os
+import re
+import sys
+import json
+import argparse
+
+from daam_build.asset_cache import file_to_base64
+from daam_build.asset_table import AssetTable
+from daam_build.budget import BUDGET_FILE, report_build
+from daam_build.compress import FORMATS, CompressedStreamWriter
+from daam_build.css import PageTokens
+from daam_build.dimensions import ImageHints
+from daam_build.embed import css_url_embedder, local_path, read_stylesheet
+from daam_build.icons import ICON_CSS, IconSprite
+from daam_build.images import enable_optimization
+from daam_build.layout import FOOTER_PATTERN, HEADER_PATTERN
+from daam_build.manifest import BuildManifest, toolchain_files
+from daam_build.placeholders import Placeholders, enable_placeholders
+from daam_build.precompress import forget_outputs, precompress_outputs
+from daam_build.pipeline import Pipeline, size_of
+from daam_build.refgraph import get_graph
+from daam_build.rewriter import HtmlRewriter, rewrite_css_urls
+from daam_build.stream import StreamWriter
+from daam_build.tracing import TRACE_DIR, Profiling, spans
+
+# Configuration
+ROOT_DIR = '.'
+OUTPUT_FILE = 'daam_one_file_all_pages.html'
+# Files to process and their "virtual" paths (keys)
+PAGE_FILES = [
+    'index.html',
+    'about.html',
+    'programs.html',
+    'participate.html',
+    'contact.html',
+    'en/index.html',
+    'en/about.html',
+    'en/programs.html',
+    'en/participate.html',
+    'en/contact.html'
+]
+# The page shown on load; with --lazy-pages every other page is stored inert
+INITIAL_PAGE = 'index.html'
+
+def embed_assets(content, base_path, table=None, to_data_uri=file_to_base64, lazy_images=False,
+                 hints=None, icons=None, placeholders=None):
+    """Embeds images and re-writes links to be SPA-compatible.
+
+    All rules run in a single pass of HtmlRewriter, so embedded data is
+    never rescanned.  With an AssetTable, images and url()s reference table
+    keys instead of carrying their own data URI.  to_data_uri produces the
+    embedded value (StreamWriter.asset_ref when streaming).  lazy_images
+    adds loading="lazy" to every image that does not set loading itself.
+    hints, an ImageHints, sizes and prioritizes images before they are embedded.
+    icons, an IconSprite, draws Font Awesome icons from the shared sprite.
+    placeholders, a Placeholders, gives table images a blurred preview as
+    their src until the table fills them in.
+    """
+    
+    # 1. Embed Images (src="...")
+    def repl_img(tag):
+        if lazy_images and tag.get('loading') is None:
+            tag.set('loading', 'lazy')
+        full_path = local_path(tag.get('src'), base_path)
+        if full_path is None or not get_graph().exists(full_path): return
+        if table is not None:
+            key = table.add(full_path)
+            if key:
+                preview = placeholders.uri(full_path) if placeholders else None
+                if preview:
+                    tag.set('src', preview)
+                else:
+                    tag.remove('src')
+                tag.set('data-asset', key)
+            return
+        b64 = to_data_uri(full_path)
+        if b64: tag.set('src', b64)
+
+    # 2. Embed CSS Styles (url(...)) - inline styles and <style> blocks
+    repl_css_url = css_url_embedder(base_path, to_data_uri, table)
+
+    # 3. Rewrite Links (href="...")
+    # converting href="about.html" -> href="#" onclick="navigate('about.html')" logic
+    # But actually, we will use a global event listener, so we just need to normalize paths.
+    # If we are in 'en/index.html' and link is 'about.html', it refers to 'en/about.html'
+    # We need to resolve this to the canonical keys in PAGE_FILES.
+    
+    def repl_link(tag):
+        href = tag.get('href')
+        if not href or href.startswith('http') or href.startswith('#') or href.startswith('mailto:') or href.startswith('tel:'):
+            return
+        
+        # Resolving relative path
+        if base_path == '.':
+            return
+        # e.g. base_path='en', href='about.html' -> en/about.html
+        # e.g. base_path='en', href='../index.html' -> index.html
+        # We standardise to forward slashes for keys
+        tag.set('href', os.path.normpath(os.path.join(base_path, href)).replace('\\', '/'))
+
+    handlers = {'img': repl_img, 'a': repl_link}
+    if hints is not None:
+        handlers.update(hints.handlers(repl_img))
+    if icons is not None:
+        handlers['i'] = icons.icon
+    rewriter = HtmlRewriter(handlers, css_url=repl_css_url)
+    return rewriter.rewrite(content)
+
+def head_skeleton(html):
+    """The <head> of html without its stylesheet links and external scripts,
+    which the build replaces with embedded copies."""
+    head_match = re.search(r'<head>(.*?)</head>', html, re.DOTALL | re.IGNORECASE)
+    head_content = head_match.group(1) if head_match else ""
+    
+    # Remove existing CSS links/JS scripts to replace with embedded
+    head_content = re.sub(r'<link[^>]+rel=["\']stylesheet["\'][^>]*>', '', head_content)
+    return re.sub(r'<script[^>]*src=[^>]*>.*?</script>', '', head_content)
+
+def get_body_content(html):
+    """Extracts content between <body> tags."""
+    m = re.search(r'<body[^>]*>(.*?)</body>', html, re.DOTALL | re.IGNORECASE)
+    if m:
+        return m.group(1)
+    return ""
+
+def page_locale(html):
+    """(lang, dir) from a page's <html> tag, defaulting to Arabic, RTL."""
+    m = re.search(r'<html\b([^>]*)>', html, re.IGNORECASE)
+    attrs = m.group(1) if m else ''
+    lang = re.search(r'\blang=["\']([^"\']+)', attrs)
+    direction = re.search(r'\bdir=["\']([^"\']+)', attrs)
+    return (lang.group(1) if lang else 'ar'), (direction.group(1) if direction else 'rtl')
+
+def split_chrome(body):
+    """(body without its <header> and <footer>, header, footer)."""
+    header = re.search(HEADER_PATTERN, body, re.DOTALL)
+    footer = re.search(FOOTER_PATTERN, body, re.DOTALL)
+    for m in sorted(filter(None, (footer, header)), key=lambda m: -m.start()):
+        body = body[:m.start()] + body[m.end():]
+    return body, header.group(0) if header else '', footer.group(0) if footer else ''
+
+def counterparts():
+    """Page -> the same page in the other language, for the language toggles."""
+    pairs = {}
+    for page_path in PAGE_FILES:
+        for other in PAGE_FILES:
+            if other != page_path and os.path.basename(other) == os.path.basename(page_path):
+                pairs.setdefault(page_path, other)
+    return pairs
+
+def process_css(base_dir, table=None, to_data_uri=file_to_base64, tokens=None):
+    """Reads style.css, embeds assets, returns css string.
+
+    With tokens, rules that match no page are pruned and the rest minified.
+    """
+    # Assuming primary usage of assets/css/style.css
+    css_path = os.path.join(base_dir, 'assets', 'css', 'style.css')
+    if not os.path.exists(css_path): return "/* CSS Not Found */"
+    
+    css = read_stylesheet(css_path, tokens)
+    return rewrite_css_urls(css, css_url_embedder(os.path.dirname(css_path), to_data_uri, table))
+
+def site_tokens(js_content):
+    """PageTokens for the whole SPA: every page, the router and main.js."""
+    tokens = PageTokens()
+    for page_path in PAGE_FILES:
+        if os.path.exists(page_path):
+            with open(page_path, 'r', encoding='utf-8') as f:
+                tokens.add_html(f.read())
+    tokens.add_script(js_content)
+    tokens.add_script(ROUTER_SCRIPT)
+    return tokens
+
+def read_source(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def process_js(base_dir):
+    """Reads main.js."""
+    js_path = os.path.join(base_dir, 'assets', 'js', 'main.js')
+    if not os.path.exists(js_path): return "// JS Not Found"
+    with open(js_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+ROUTER_SCRIPT = """
+<script>
+    // SPA Router Logic
+    document.addEventListener('DOMContentLoaded', () => {
+        
+        // Pages built with --lazy-pages sit in inert <template>s: no DOM,
+        // no image decoding, until the first visit turns them into a page.
+        function hydratePage(pageId) {
+            const tpl = document.getElementById('tpl-' + pageId);
+            if (!tpl) return null;
+            const page = document.createElement('div');
+            page.id = 'page-' + pageId;
+            page.className = 'spa-page';
+            page.dataset.locale = tpl.dataset.locale;
+            page.appendChild(document.importNode(tpl.content, true));
+            tpl.replaceWith(page);
+            if (window.daamHydrateAssets) window.daamHydrateAssets(page);
+            return page;
+        }
+
+        // Built with --shared-chrome, each language's header and footer
+        // exist once and follow the page: language, direction, the active
+        // nav link and where the language toggle leads.
+        const COUNTERPARTS = %(counterparts)s;
+        function showChrome(pageId, page) {
+            const chrome = document.querySelectorAll('.spa-chrome');
+            if (!chrome.length) return;
+            chrome.forEach(el => {
+                const current = el.dataset.locale === page.dataset.locale;
+                el.style.display = current ? '' : 'none';
+                if (!current) return;
+                document.documentElement.lang = el.dataset.lang;
+                document.documentElement.dir = el.dataset.dir;
+                el.querySelectorAll('.nav-links a').forEach(a => {
+                    a.classList.toggle('active', a.getAttribute('href') === pageId);
+                });
+                if (COUNTERPARTS[pageId]) {
+                    el.querySelectorAll('.lang-toggle, .mobile-lang-item').forEach(a => {
+                        a.setAttribute('href', COUNTERPARTS[pageId]);
+                    });
+                }
+            });
+        }
+
+        function showPage(pageId) {
+            // Hide all pages
+            document.querySelectorAll('.spa-page').forEach(el => {
+                el.style.display = 'none';
+            });
+            
+            // Show target
+            const target = document.getElementById('page-' + pageId) || hydratePage(pageId);
+            if (target) {
+                target.style.display = 'block';
+                showChrome(pageId, target);
+                window.scrollTo(0, 0);
+            } else {
+                console.error('Page not found:', pageId);
+                // Fallback to index
+                if(pageId !== '%(initial)s') showPage('%(initial)s');
+            }
+        }
+
+        // Intercept Clicks
+        document.body.addEventListener('click', (e) => {
+            const link = e.target.closest('a');
+            if (link) {
+                const href = link.getAttribute('href');
+                // Check if it's an internal navigation link
+                if (href && !href.startsWith('http') && !href.startsWith('#') && !href.startsWith('mailto:')) {
+                    e.preventDefault();
+                    // Normalize path separators if needed (though we did in python)
+                    showPage(href); 
+                }
+            }
+        });
+
+        // Initialize: Show the initial page by default
+        showPage('%(initial)s');
+        
+        // Handle Mobile Menu (Re-initialize logic for the specific active page?)
+        // Since all HTML is present, querySelector might pick the first hidden one.
+        // We might need to scope listeners, but simple toggle usually works globally 
+        // if classes are unique or we listen on document.body
+    });
+</script>
+"""
+
+def build_inputs():
+    """Every file the single-file SPA is built from."""
+    graph = get_graph()
+    css_path = os.path.join('assets', 'css', 'style.css')
+    inputs = [css_path, os.path.join('assets', 'js', 'main.js')]
+    inputs += [ref.path for ref in graph.refs(css_path)]
+    for page_path in PAGE_FILES:
+        inputs += graph.inputs(page_path) if graph.exists(page_path) else [page_path]
+    return inputs + toolchain_files(__file__)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m daam_build spa', description="Build the single-file SPA of all pages.")
+    parser.add_argument('--dedupe-assets', action='store_true',
+                        help="store each distinct asset once in a shared table")
+    parser.add_argument('--lazy-pages', action='store_true',
+                        help="keep pages other than the first inert until they are opened")
+    parser.add_argument('--shared-chrome', action='store_true',
+                        help="write each language's header and footer once instead of on every page")
+    parser.add_argument('--optimize-images', action='store_true',
+                        help="embed downscaled WebP variants of raster images (needs Pillow)")
+    parser.add_argument('--avif', action='store_true',
+                        help="also try AVIF when optimizing images")
+    parser.add_argument('--prune-css', action='store_true',
+                        help="drop CSS rules that match nothing on any page, and minify the rest")
+    parser.add_argument('--image-hints', action='store_true',
+                        help="add width/height to images, and lazy loading below each page's hero")
+    parser.add_argument('--hero-priority', action='store_true',
+                        help="with --image-hints, fetch the first page's hero image first")
+    parser.add_argument('--placeholders', action='store_true',
+                        help="show blurred previews of large images while the asset table, "
+                             "written after the pages, loads the full ones (needs Pillow)")
+    parser.add_argument('--icon-sprite', action='store_true',
+                        help="draw Font Awesome icons from one inline SVG sprite shared by every page")
+    parser.add_argument('--compress', choices=sorted(FORMATS),
+                        help="ship the page compressed, inflated in the browser on open")
+    parser.add_argument('--precompress', action='store_true',
+                        help="write .gz siblings and an ETag manifest for serving")
+    parser.add_argument('--brotli', action='store_true',
+                        help="with --precompress, also write .br siblings (needs brotli)")
+    parser.add_argument('--budgets', default=BUDGET_FILE,
+                        help=f"size budgets to check the output against (default: {BUDGET_FILE})")
+    parser.add_argument('--profile', action='store_true',
+                        help=f"write a Chrome/Perfetto trace of the build to {TRACE_DIR}/")
+    parser.add_argument('--cprofile', action='store_true',
+                        help="also profile the build with cProfile and list the hottest functions")
+    parser.add_argument('--force', action='store_true',
+                        help="rebuild even if no input changed since the last build")
+    return parser.parse_args(argv)
+
+def build(args):
+    """Runs the build parse_args(argv) describes; returns the exit code."""
+    manifest = BuildManifest('spa_final')
+    options = {'dedupe_assets': args.dedupe_assets, 'lazy_pages': args.lazy_pages,
+               'shared_chrome': args.shared_chrome,
+               'optimize_images': args.optimize_images, 'avif': args.avif,
+               'prune_css': args.prune_css, 'compress': args.compress,
+               'image_hints': args.image_hints, 'hero_priority': args.hero_priority,
+               'placeholders': args.placeholders, 'icon_sprite': args.icon_sprite}
+    inputs = build_inputs()
+    if not args.force and manifest.is_fresh(OUTPUT_FILE, inputs, options):
+        print(f"{OUTPUT_FILE} is up to date.")
+        if args.precompress:
+            precompress_outputs(os.path.dirname(OUTPUT_FILE) or '.', [OUTPUT_FILE], args.brotli)
+        return report_build('spa', OUTPUT_FILE, args.budgets)
+
+    optimizer = enable_optimization(args.avif) if args.optimize_images else None
+    pipeline = Pipeline('spa')
+
+    print("Building Ultimate Single-File SPA...")
+    
+    # 1. Start with Head Skeleton (from index.html)
+    master_html = pipeline.run('load', read_source, 'index.html')
+    head_content = pipeline.run('transform', head_skeleton, master_html)
+    # head_skeleton drops the Font Awesome <link> with the other stylesheets;
+    # the sprite is what brings the icons back
+    icons = IconSprite() if args.icon_sprite else None
+    placeholders = Placeholders() if args.placeholders and enable_placeholders() else None
+    if icons:
+        head_content += f'\n    <style>{ICON_CSS}</style>'
+
+    # Output is streamed: each part is written as soon as it is ready, and
+    # data URIs are only expanded, chunk by chunk, on their way to disk.
+    # With --compress they are deflated on the way too.
+    if args.compress:
+        writer = CompressedStreamWriter(OUTPUT_FILE, args.compress, pipeline=pipeline)
+    else:
+        writer = StreamWriter(OUTPUT_FILE, pipeline=pipeline)
+    with writer as out:
+        # Placeholders need the table: it is what moves the full images
+        # after the pages, so every page can render before they arrive
+        table = AssetTable(data_uri=out.asset_ref) if args.dedupe_assets or placeholders else None
+
+        # 2. Global Styles, written first so the head is complete
+        print("Processing Global Styles & Scripts...")
+        with pipeline.stage('load') as timing:
+            js_content = process_js('.')
+            timing.bytes_out = size_of(js_content)
+        tokens = pipeline.run('transform', site_tokens, js_content) if args.prune_css else None
+        with pipeline.stage('rewrite') as timing:
+            css_content = process_css('.', table, out.asset_ref, tokens)
+            timing.bytes_out = size_of(css_content)
+
+        out.write(f"""<!DOCTYPE html>
+<html lang="ar" dir="rtl">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Da'am Foundation - Single File</title>
+    {head_content}
+    <style>
+        /* Global Embedded CSS */
+        {css_content}
+        
+        /* SPA Specific Adjustments */
+        .spa-page {{ display: none; }}
+    </style>
+</head>
+<body>
+
+""")
+
+        # 3. With --shared-chrome, the header and footer of each language,
+        # taken from its first page; the router adjusts them per page
+        chrome = {}
+        if args.shared_chrome:
+            for page_path in PAGE_FILES:
+                if not os.path.exists(page_path):
+                    continue
+                raw_html = pipeline.run('load', read_source, page_path)
+                lang, direction = page_locale(raw_html)
+                if lang in chrome:
+                    continue
+                # Only the initial page's language shows before the router runs
+                display = '' if page_path == INITIAL_PAGE else ' style="display:none;"'
+                _, header, footer = pipeline.run('transform', split_chrome, get_body_content(raw_html))
+                base_dir = os.path.dirname(page_path) or '.'
+                chrome[lang] = {
+                    'attrs': f'class="spa-chrome" data-locale="{lang}" data-lang="{lang}" data-dir="{direction}"{display}',
+                    'header': pipeline.run('rewrite', embed_assets, header, base_dir, table, out.asset_ref,
+                                           hints=ImageHints(base_dir) if args.image_hints else None,
+                                           icons=icons, placeholders=placeholders),
+                    'footer': pipeline.run('rewrite', embed_assets, footer, base_dir, table, out.asset_ref,
+                                           icons=icons, placeholders=placeholders),
+                }
+            for lang, parts in chrome.items():
+                out.write(f'\n<!-- HEADER: {lang} -->\n<div {parts["attrs"]}>\n{parts["header"]}\n</div>\n')
+
+        # 4. Pages, one at a time
+        for page_path in spans(PAGE_FILES, 'page'):
+            if not os.path.exists(page_path):
+                print(f"Skipping {page_path} (not found)")
+                continue
+                
+            print(f"Processing Body: {page_path}")
+            get_graph().warn_broken(page_path)
+            raw_html = pipeline.run('load', read_source, page_path)
+            body = pipeline.run('transform', get_body_content, raw_html)
+            if not body:
+                print(f"Warning: No body in {page_path}")
+                continue
+            lang, _ = page_locale(raw_html)
+            if lang in chrome:
+                body, _, _ = pipeline.run('transform', split_chrome, body)
+                
+            # Determine base path for relative asset resolution
+            base_dir = os.path.dirname(page_path)
+            if base_dir == '': base_dir = '.'
+            
+            # Embed assets within this body
+            lazy = args.lazy_pages and page_path != INITIAL_PAGE
+            hints = None
+            if args.image_hints:
+                hints = ImageHints(base_dir, args.hero_priority and page_path == INITIAL_PAGE)
+            body = pipeline.run('rewrite', embed_assets, body, base_dir, table, out.asset_ref,
+                                lazy_images=lazy, hints=hints, icons=icons, placeholders=placeholders)
+            
+            # Wrap in SPA Container
+            # ID needs to match the href exactly (e.g., 'en/about.html')
+            # We replace / with something safe? No, let's keep it simple string matching
+            # But ID can't contain slash safely in CSS selectors sometimes? 
+            # Actually typical custom IDs are fine, but let's prefix
+            safe_id = 'page-' + page_path.replace('\\', '/')
+            
+            if lazy:
+                # Parsed but never rendered until the router hydrates it
+                tpl_id = 'tpl-' + page_path.replace('\\', '/')
+                out.write(f'\n<!-- PAGE: {page_path} -->\n<template id="{tpl_id}" data-locale="{lang}">\n{body}\n</template>\n<!-- /PAGE -->\n')
+                continue
+
+            style = 'display:none;' # Default hidden
+            if page_path == INITIAL_PAGE: style = 'display:block;' # Show home initially? handled by JS
+            
+            out.write(f'\n<!-- PAGE: {page_path} -->\n<div id="{safe_id}" class="spa-page" data-locale="{lang}" style="{style}">\n{body}\n</div>\n<!-- /PAGE -->\n')
+
+        for lang, parts in chrome.items():
+            out.write(f'\n<!-- FOOTER: {lang} -->\n<div {parts["attrs"]}>\n{parts["footer"]}\n</div>\n')
+
+        # Every page has drawn its icons by now, so the sprite is complete
+        if icons:
+            out.write('\n' + icons.sprite() + '\n')
+
+        # 5. The asset table can only be written once every page has
+        # registered its assets, so it follows the pages
+        if table:
+            out.write('\n' + table.render_script() + '\n<script>daamHydrateAssets();</script>\n')
+
+        out.write(f"""
+<script>
+    /* Global Embedded JS */
+    {js_content}
+</script>
+
+{ROUTER_SCRIPT % {'initial': INITIAL_PAGE, 'counterparts': json.dumps(counterparts())}}
+
+</body>
+</html>""")
+
+    manifest.record(OUTPUT_FILE, inputs, options)
+    manifest.save()
+    forget_outputs(os.path.dirname(OUTPUT_FILE) or '.', [OUTPUT_FILE])
+        
+    print(f"Done! {OUTPUT_FILE} created ({os.path.getsize(OUTPUT_FILE)//1024} KB).")
+    if table:
+        print(table.summary())
+    if icons:
+        print(icons.summary())
+    if placeholders:
+        print(placeholders.summary())
+    if args.compress:
+        print(writer.summary())
+    if optimizer:
+        print(f"Image optimization saved {optimizer.saved_bytes // 1024} KB before encoding.")
+    if args.precompress:
+        precompress_outputs(os.path.dirname(OUTPUT_FILE) or '.', [OUTPUT_FILE], args.brotli, pipeline)
+    print(pipeline.report())
+    return report_build('spa', OUTPUT_FILE, args.budgets)
+
+def main(argv=None):
+    args = parse_args(argv)
+    with Profiling('spa', args.profile, args.cprofile):
+        return build(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
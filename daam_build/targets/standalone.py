@@ -0,0 +1,133 @@
+import os
+import sys
+import argparse
+
+from daam_build.budget import BUDGET_FILE, report_build
+from daam_build.compress import FORMATS, CompressedStreamWriter
+from daam_build.css import page_tokens
+from daam_build.dimensions import ImageHints
+from daam_build.embed import embed_all
+from daam_build.icons import IconSprite
+from daam_build.placeholders import Placeholders, enable_placeholders
+from daam_build.images import enable_optimization
+from daam_build.manifest import BuildManifest, toolchain_files
+from daam_build.precompress import forget_outputs, precompress_outputs
+from daam_build.pipeline import Pipeline
+from daam_build.refgraph import get_graph
+from daam_build.stream import StreamWriter
+from daam_build.tracing import TRACE_DIR, Profiling, span
+
+# Configuration
+SOURCE_FILE = 'index.html'
+OUTPUT_FILE = 'daam_standalone.html'
+ASSETS_DIR = 'assets'
+
+def build_inputs():
+    """Every file the standalone page is built from."""
+    return get_graph().inputs(SOURCE_FILE) + toolchain_files(__file__)
+
+def read_source(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m daam_build standalone',
+                                     description=f"Build a standalone copy of {SOURCE_FILE}.")
+    parser.add_argument('--optimize-images', action='store_true',
+                        help="embed downscaled WebP variants of raster images (needs Pillow)")
+    parser.add_argument('--avif', action='store_true',
+                        help="also try AVIF when optimizing images")
+    parser.add_argument('--prune-css', action='store_true',
+                        help="drop CSS rules that match nothing on the page, and minify the rest")
+    parser.add_argument('--image-hints', action='store_true',
+                        help="add width/height to images, and lazy loading below the hero")
+    parser.add_argument('--hero-priority', action='store_true',
+                        help="with --image-hints, fetch the hero image first")
+    parser.add_argument('--placeholders', action='store_true',
+                        help="show a blurred preview of each large image until it has loaded (needs Pillow)")
+    parser.add_argument('--icon-sprite', action='store_true',
+                        help="draw Font Awesome icons from an inline SVG sprite instead of the CDN webfont")
+    parser.add_argument('--compress', choices=sorted(FORMATS),
+                        help="ship the page compressed, inflated in the browser on open")
+    parser.add_argument('--precompress', action='store_true',
+                        help="write .gz siblings and an ETag manifest for serving")
+    parser.add_argument('--brotli', action='store_true',
+                        help="with --precompress, also write .br siblings (needs brotli)")
+    parser.add_argument('--budgets', default=BUDGET_FILE,
+                        help=f"size budgets to check the output against (default: {BUDGET_FILE})")
+    parser.add_argument('--profile', action='store_true',
+                        help=f"write a Chrome/Perfetto trace of the build to {TRACE_DIR}/")
+    parser.add_argument('--cprofile', action='store_true',
+                        help="also profile the build with cProfile and list the hottest functions")
+    parser.add_argument('--force', action='store_true',
+                        help="rebuild even if no input changed since the last build")
+    return parser.parse_args(argv)
+
+def build(args):
+    """Runs the build parse_args(argv) describes; returns the exit code."""
+    manifest = BuildManifest('standalone')
+    options = {'optimize_images': args.optimize_images, 'avif': args.avif,
+               'prune_css': args.prune_css, 'compress': args.compress,
+               'image_hints': args.image_hints, 'hero_priority': args.hero_priority,
+               'placeholders': args.placeholders, 'icon_sprite': args.icon_sprite}
+    inputs = build_inputs()
+    if not args.force and manifest.is_fresh(OUTPUT_FILE, inputs, options):
+        print(f"{OUTPUT_FILE} is up to date.")
+        if args.precompress:
+            precompress_outputs(os.path.dirname(OUTPUT_FILE) or '.', [OUTPUT_FILE], args.brotli)
+        return report_build('standalone', OUTPUT_FILE, args.budgets)
+
+    optimizer = enable_optimization(args.avif) if args.optimize_images else None
+    pipeline = Pipeline('standalone')
+
+    print(f"Building standalone file from {SOURCE_FILE}...")
+    get_graph().warn_broken(SOURCE_FILE)
+
+    with span(SOURCE_FILE, 'page'):
+        html = pipeline.run('load', read_source, SOURCE_FILE)
+        base_dir = os.path.dirname(os.path.abspath(SOURCE_FILE))
+        tokens = pipeline.run('transform', page_tokens, html, base_dir) if args.prune_css else None
+        hints = ImageHints(base_dir, args.hero_priority) if args.image_hints else None
+        icons = IconSprite().scan(html) if args.icon_sprite else None
+        placeholders = Placeholders(base_dir) if args.placeholders and enable_placeholders() else None
+
+        # Images are embedded as placeholders while rewriting and only
+        # expanded to base64, chunk by chunk, while the file is written
+        # (and deflated along with the rest of the page under --compress)
+        if args.compress:
+            writer = CompressedStreamWriter(OUTPUT_FILE, args.compress, pipeline=pipeline)
+        else:
+            writer = StreamWriter(OUTPUT_FILE, pipeline=pipeline)
+        with writer as out:
+            # 1. Embed CSS, images and JS in one pass
+            print("Embedding CSS, images and JS...")
+            html = pipeline.run('rewrite', embed_all, html, base_dir, out.asset_ref, tokens, hints, icons,
+                                placeholders)
+
+            # 2. Write output, expanding the data URIs as it streams to disk
+            out.write(html)
+    manifest.record(OUTPUT_FILE, inputs, options)
+    manifest.save()
+    forget_outputs(os.path.dirname(OUTPUT_FILE) or '.', [OUTPUT_FILE])
+
+    print(f"Success! {OUTPUT_FILE} created ({os.path.getsize(OUTPUT_FILE) // 1024} KB).")
+    if args.compress:
+        print(writer.summary())
+    if icons:
+        print(icons.summary())
+    if placeholders:
+        print(placeholders.summary())
+    if optimizer:
+        print(f"Image optimization saved {optimizer.saved_bytes // 1024} KB before encoding.")
+    if args.precompress:
+        precompress_outputs(os.path.dirname(OUTPUT_FILE) or '.', [OUTPUT_FILE], args.brotli, pipeline)
+    print(pipeline.report())
+    return report_build('standalone', OUTPUT_FILE, args.budgets)
+
+def main(argv=None):
+    args = parse_args(argv)
+    with Profiling('standalone', args.profile, args.cprofile):
+        return build(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
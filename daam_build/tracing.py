@@ -0,0 +1,204 @@
+"""Build profiling: spans as a Chrome/Perfetto trace, plus cProfile.
+
+    python -m daam_build site --profile              build_reports/site.trace.json
+    python -m daam_build spa --profile --cprofile    ... plus spa.prof and the hottest functions
+
+Open a trace at https://ui.perfetto.dev or chrome://tracing: every page,
+rewrite pass, asset encode and file write is a span, on the process and
+thread that ran it.  Off by default, and then span() hands out one shared
+do-nothing object, so builds pay a function call per span and nothing
+else.
+"""
+import os
+import json
+import time
+import pstats
+import cProfile
+import threading
+
+# Configuration
+TRACE_DIR = 'build_reports'
+TOP_N = 20
+
+_tracer = None
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """One timed block; set() adds args (sizes, cache hits) before it ends."""
+
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'started')
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.add(self.name, self.cat, self.started, time.perf_counter() - self.started, self.args)
+        return False
+
+    def set(self, **args):
+        self.args.update(args)
+
+
+class Tracer:
+    """Collects complete ("X") trace events for this process.
+
+    Timestamps come from perf_counter, which is one clock for every
+    process on the machine, so events from worker processes line up with
+    the parent's once merged.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.pid = os.getpid()
+
+    def add(self, name, cat, started, seconds, args=None):
+        event = {'name': name, 'cat': cat, 'ph': 'X', 'ts': started * 1e6, 'dur': seconds * 1e6,
+                 'pid': self.pid, 'tid': threading.get_native_id()}
+        if args:
+            event['args'] = args
+        self.events.append(event)
+
+    def span(self, name, cat, args):
+        return Span(self, name, cat, args)
+
+    def save(self, path, label):
+        """Writes the events, with process names, as a trace-event JSON file."""
+        names = [{'name': 'process_name', 'ph': 'M', 'pid': pid,
+                  'args': {'name': label if pid == self.pid else f'worker {pid}'}}
+                 for pid in sorted({e['pid'] for e in self.events} | {self.pid})]
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': names + sorted(self.events, key=lambda e: e['ts']),
+                       'displayTimeUnit': 'ms'}, f)
+
+
+def start_tracing():
+    """Turns tracing on for this process (e.g. in a worker's initializer).
+
+    A forked worker starts its own tracer rather than adding to the copy
+    of the parent's it inherited.
+    """
+    global _tracer
+    if _tracer is None or _tracer.pid != os.getpid():
+        _tracer = Tracer()
+    return _tracer
+
+
+def stop_tracing():
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def span(name, cat='build', **args):
+    """Times the with-block as one trace event; a no-op unless tracing is on."""
+    if _tracer is None:
+        return _NULL_SPAN
+    return _tracer.span(name, cat, args)
+
+
+def spans(items, cat='build'):
+    """Yields items, each inside its own span: the span stays open while
+    the loop body runs, so `for page in spans(pages, 'page')` times every
+    iteration without re-indenting it."""
+    for item in items:
+        with span(str(item), cat):
+            yield item
+
+
+def complete(name, cat, started, seconds, **args):
+    """Records work already timed by the caller (started from perf_counter)."""
+    if _tracer is not None:
+        _tracer.add(name, cat, started, seconds, args)
+
+
+def take_events():
+    """This process's events so far, removed from it: how a worker hands
+    its spans back to the parent.  [] when tracing is off."""
+    if _tracer is None:
+        return []
+    events, _tracer.events = _tracer.events, []
+    return events
+
+
+def add_events(events):
+    """Merges events taken in another process."""
+    if _tracer is not None:
+        _tracer.events.extend(events)
+
+
+def hot_functions(profiler, top=TOP_N):
+    """The top functions by own time, one formatted line each."""
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: -item[1][2])[:top]
+    lines = [f"  {'own':>9} {'total':>9} {'calls':>9}  function"]
+    for (filename, line, func), (_, calls, own, total, _) in rows:
+        if filename == '~':             # built-in
+            where = ''
+        else:
+            rel = os.path.relpath(filename)
+            where = f"{filename if rel.startswith('..') else rel}:{line}"
+        lines.append(f"  {own * 1000:>7.0f}ms {total * 1000:>7.0f}ms {calls:>9}  {func} {where}".rstrip())
+    return '\n'.join(lines)
+
+
+class Profiling:
+    """What --profile and --cprofile turn on around one build.
+
+    On exit the trace goes to <out_dir>/<target>.trace.json and the
+    cProfile data to <target>.prof, followed by the top hot functions.
+    cProfile sees this process only; worker processes still show up in
+    the trace.
+    """
+
+    def __init__(self, target, trace=False, cprofile=False, top=TOP_N, out_dir=TRACE_DIR):
+        self.target = target
+        self.trace = trace
+        self.cprofile = cprofile
+        self.top = top
+        self.out_dir = out_dir
+        self.profiler = None
+
+    def __enter__(self):
+        if self.trace:
+            start_tracing()
+        if self.cprofile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self.profiler is not None:
+            self.profiler.disable()
+            path = os.path.join(self.out_dir, f'{self.target}.prof')
+            os.makedirs(self.out_dir, exist_ok=True)
+            self.profiler.dump_stats(path)
+            print(f"\nHottest functions (cProfile data in {path}):")
+            print(hot_functions(self.profiler, self.top))
+        if self.trace:
+            tracer = stop_tracing()
+            path = os.path.join(self.out_dir, f'{self.target}.trace.json')
+            tracer.save(path, f'daam_build {self.target}')
+            print(f"Trace of {len(tracer.events)} span(s) written to {path} (open in ui.perfetto.dev).")
+        return False
@@ -0,0 +1,272 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import mimetypes
+from urllib.parse import unquote, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from daam_build.asset_cache import file_to_base64
+from daam_build.css import page_tokens
+from daam_build.embed import embed_all
+from daam_build.pages import find_pages
+from daam_build.refgraph import get_graph
+
+# Configuration
+SOURCE_DIR = '.'
+POLL_INTERVAL = 0.1         # seconds between stat sweeps
+PAGE_SCAN_INTERVAL = 1.0    # seconds between looks for added or removed pages
+HEARTBEAT = 15              # seconds between keep-alive comments on the event stream
+EVENTS_PATH = '/__livereload'
+CHANGE_HISTORY = 64         # changes kept for event streams that fall behind
+
+# Injected before </body>: reloads the page when the server says it changed
+RELOAD_SCRIPT = """<script>
+(function () {
+    var page = decodeURIComponent(location.pathname.replace(/^\\//, '').replace(/(^|\\/)$/, '$1index.html'));
+    new EventSource('%s').onmessage = function (e) {
+        var changed = JSON.parse(e.data);
+        if (changed.indexOf(page) >= 0 || changed.indexOf('*') >= 0) location.reload();
+    };
+})();
+</script>
+""" % EVENTS_PATH
+
+
+class PageCache:
+    """Offline-site pages built in memory, with the inputs each depends on.
+
+    Pages are built on first request.  refresh() stats every input once
+    and rebuilds just the built pages that depend on a changed file; the
+    asset cache's memo keeps every unchanged image encoded, so a rebuild
+    only re-reads what was edited.
+    """
+
+    def __init__(self, source_dir=SOURCE_DIR, prune=False):
+        self.source_dir = source_dir
+        self.prune = prune
+        self.pages = {}         # rel_path -> (full path, built bytes or None)
+        self.inputs = {}        # rel_path -> inputs of the last build
+        self.mtimes = {}        # input path -> mtime_ns (None when missing)
+        self.lock = threading.Lock()
+        self.scan_pages()
+
+    def scan_pages(self):
+        """Picks up added and removed pages; returns their rel_paths."""
+        found = {rel.replace('\\', '/'): full for full, rel in find_pages(self.source_dir)}
+        changed = set(found) ^ set(self.pages)
+        for rel in set(self.pages) - set(found):
+            del self.pages[rel]
+            self.inputs.pop(rel, None)
+        for rel in set(found) - set(self.pages):
+            self.pages[rel] = (found[rel], None)
+        return changed
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def build(self, rel):
+        full_path, _ = self.pages[rel]
+        started = time.perf_counter()
+        with open(full_path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        base_dir = os.path.dirname(full_path)
+        inputs = get_graph(self.source_dir).inputs(full_path)
+        tokens = page_tokens(html, base_dir) if self.prune else None
+        html = embed_all(html, base_dir, file_to_base64, tokens)
+        end = html.lower().rfind('</body>')
+        html = html[:end] + RELOAD_SCRIPT + html[end:] if end >= 0 else html + RELOAD_SCRIPT
+        body = html.encode('utf-8')
+        self.pages[rel] = (full_path, body)
+        self.inputs[rel] = inputs
+        for path in inputs:
+            self.mtimes.setdefault(path, self._mtime(path))
+        print(f"Built {rel} in {(time.perf_counter() - started) * 1000:.0f} ms ({len(body) // 1024} KB)")
+        return body
+
+    def get(self, rel):
+        """Returns the page's bytes, building it if needed; None if unknown."""
+        with self.lock:
+            if rel not in self.pages:
+                return None
+            body = self.pages[rel][1]
+            return body if body is not None else self.build(rel)
+
+    def refresh(self, rescan=False):
+        """Rebuilds built pages whose inputs changed; returns changed rel_paths.
+
+        A page whose rebuild fails is left out, and stays watched: the
+        save that fixes it rebuilds it and reports it then.
+        """
+        with self.lock:
+            changed_pages = self.scan_pages() if rescan else set()
+            changed_files = set()
+            for path, old in list(self.mtimes.items()):
+                new = self._mtime(path)
+                if new != old:
+                    self.mtimes[path] = new
+                    changed_files.add(path)
+            if rescan or changed_files:
+                # Edited pages and stylesheets may reference other files now
+                get_graph(self.source_dir).refresh()
+            for rel, inputs in list(self.inputs.items()):
+                if changed_files.intersection(inputs):
+                    changed_pages.add(rel)
+            for rel in sorted(changed_pages):
+                if rel in self.inputs:
+                    # Unbuilt pages are simply built on their next request
+                    try:
+                        self.build(rel)
+                    except Exception as e:
+                        print(f"Error rebuilding {rel}: {type(e).__name__}: {e}")
+                        self.pages[rel] = (self.pages[rel][0], None)
+                        changed_pages.discard(rel)
+            self._prune_mtimes()
+            return sorted(changed_pages)
+
+    def _prune_mtimes(self):
+        """Stops watching files that no built page depends on any more."""
+        used = set()
+        for inputs in self.inputs.values():
+            used.update(inputs)
+        for path in set(self.mtimes) - used:
+            del self.mtimes[path]
+
+
+class Broadcaster:
+    """Hands each change to every open event stream.
+
+    The last CHANGE_HISTORY changes are kept, so a stream that wakes up
+    after several gets all the pages they touched; one that fell further
+    behind gets ['*'], which reloads every page.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.version = 0
+        self.history = []       # (version, changed rel_paths), oldest first
+
+    def publish(self, changed):
+        with self.condition:
+            self.version += 1
+            self.history = self.history[1 - CHANGE_HISTORY:] + [(self.version, changed)]
+            self.condition.notify_all()
+
+    def wait(self, version, timeout):
+        """Blocks until a change newer than version; returns (version, every
+        page changed since, or None on timeout)."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            if self.version == version:
+                return version, None
+            if self.history[0][0] > version + 1:
+                return self.version, ['*']
+            return self.version, sorted({rel for v, changed in self.history if v > version for rel in changed})
+
+
+def watch_loop(cache, broadcaster, stop, interval=POLL_INTERVAL):
+    last_scan = time.monotonic()
+    while not stop.wait(interval):
+        rescan = time.monotonic() - last_scan >= PAGE_SCAN_INTERVAL
+        if rescan:
+            last_scan = time.monotonic()
+        changed = cache.refresh(rescan)
+        if changed:
+            broadcaster.publish(changed)
+
+
+def make_handler(cache, broadcaster, source_dir=SOURCE_DIR):
+    root = os.path.abspath(source_dir)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            path = unquote(urlsplit(self.path).path)
+            if path == EVENTS_PATH:
+                return self.stream_events()
+            rel = path.lstrip('/')
+            if rel == '' or rel.endswith('/'):
+                rel += 'index.html'
+            body = cache.get(rel)
+            if body is not None:
+                return self.send_bytes(body, 'text/html; charset=utf-8')
+            full = os.path.abspath(os.path.join(root, rel))
+            if not full.startswith(root + os.sep) or not os.path.isfile(full):
+                return self.send_error(404)
+            with open(full, 'rb') as f:
+                data = f.read()
+            self.send_bytes(data, mimetypes.guess_type(full)[0] or 'application/octet-stream')
+
+        def send_bytes(self, body, content_type):
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def stream_events(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-store')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+            version = broadcaster.version
+            try:
+                while True:
+                    version, changed = broadcaster.wait(version, HEARTBEAT)
+                    message = f'data: {json.dumps(changed)}\n\n' if changed is not None else ': ping\n\n'
+                    self.wfile.write(message.encode('utf-8'))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    return Handler
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m daam_build watch',
+                                     description="Serve the offline-site pages, rebuilt in memory as sources change.")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--prune-css', action='store_true',
+                        help="drop CSS rules that match nothing on the page, and minify the rest")
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL,
+                        help="seconds between checks for changed files")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    cache = PageCache(SOURCE_DIR, args.prune_css)
+    broadcaster = Broadcaster()
+    stop = threading.Event()
+    watcher = threading.Thread(target=watch_loop, args=(cache, broadcaster, stop, args.interval), daemon=True)
+    watcher.start()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(cache, broadcaster))
+    server.daemon_threads = True
+    print(f"Watching {len(cache.pages)} page(s); serving on http://{args.host}:{args.port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())